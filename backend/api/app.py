@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+HTTP service for scrape and analyze jobs.
+
+  POST   /jobs                          submit a job, returns it with status "queued"
+  GET    /jobs?offset=&limit=           jobs, oldest first
+  GET    /jobs/{id}                     status, timings and result counts
+  POST   /jobs/{id}/cancel              cancel a queued or running job
+  GET    /jobs/{id}/results/{name}      one page of a result list (followers, following,
+                                        they_dont_follow_back, you_dont_follow_back)
+
+Jobs run on the server's event loop over one shared BrowserPool. set the pool size and the target host with
+environment variables, e.g. against the local fixture (benchmarks/fixture_server.py):
+
+  HB_BASE_URL=http://127.0.0.1:8765 HB_BROWSERS=1 HB_CONTEXTS=4 \\
+      uvicorn backend.api.app:app --port 8000
+
+Analyze jobs only read lists under HB_INPUT_DIR or HB_OUTPUT (earlier jobs' results).
+"""
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Query
+from pydantic import BaseModel
+
+from backend.services.instagram_scraper.account_scrape import INSTAGRAM_URL
+from backend.services.instagram_scraper.batch_orchestrator import BrowserPool
+from backend.services.instagram_scraper.utils_logger import make_logger
+from .jobs import JobManager, JobNotFound, JOB_KINDS, RESULT_FILES
+
+MAX_PAGE_SIZE = 1_000
+
+
+class JobRequest(BaseModel):
+    username: str
+    kind: str = "scrape"
+    # y = live scraper, n = parse once, net = network responses, r = refresh new followers only
+    mode: str = "y"
+    concurrent_lists: bool = True
+    # json, ndjson, ndjson.gz or csv
+    output_format: str = "json"
+    # analyze jobs only, paths under HB_INPUT_DIR or HB_OUTPUT
+    followers_path: Optional[str] = None
+    following_path: Optional[str] = None
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    return default if value is None else value.lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from playwright.async_api import async_playwright
+
+    log = make_logger(name="api", to_console=True, level=os.environ.get("HB_LOG_LEVEL", "INFO"))
+    browsers = int(os.environ.get("HB_BROWSERS", "1"))
+    contexts = int(os.environ.get("HB_CONTEXTS", "2"))
+    async with async_playwright() as p:
+        pool = BrowserPool(
+            p,
+            browsers=browsers,
+            contexts_per_browser=contexts,
+            headless=_env_flag("HB_HEADLESS", True),
+            lean=_env_flag("HB_LEAN", False),
+            use_daemon=_env_flag("HB_DAEMON", False),
+            logger=log,
+        )
+        await pool.start()
+        manager = JobManager(
+            pool,
+            workers=pool.size,
+            output_root=os.environ.get("HB_OUTPUT", "api_runs"),
+            snapshot_db=os.environ.get("HB_SNAPSHOT_DB") or None,
+            base_url=os.environ.get("HB_BASE_URL") or INSTAGRAM_URL,
+            input_root=os.environ.get("HB_INPUT_DIR") or None,
+            logger=log,
+        )
+        await manager.start()
+        app.state.manager = manager
+        try:
+            yield
+        finally:
+            await manager.close()
+            await pool.close()
+
+
+app = FastAPI(title="HollywoodBuster", lifespan=lifespan)
+
+
+def _manager() -> JobManager:
+    return app.state.manager
+
+
+def _job_or_404(job_id: str):
+    try:
+        return _manager().get(job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail=f"no job {job_id}")
+
+
+@app.get("/health")
+async def health():
+    manager = _manager()
+    running = sum(job.status == "running" for job in manager.jobs.values())
+    queued = sum(job.status == "queued" for job in manager.jobs.values())
+    return {"ok": True, "running": running, "queued": queued, "workers": manager.workers}
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    if request.kind not in JOB_KINDS:
+        raise HTTPException(status_code=422, detail=f"kind must be one of {JOB_KINDS}")
+    try:
+        job = _manager().submit(
+            request.kind,
+            request.username,
+            mode=request.mode,
+            concurrent_lists=request.concurrent_lists,
+            output_format=request.output_format,
+            followers_path=request.followers_path,
+            following_path=request.following_path,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return job.to_dict()
+
+
+@app.get("/jobs")
+async def list_jobs(offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE)):
+    manager = _manager()
+    return {
+        "offset": offset,
+        "total": len(manager.jobs),
+        "items": [job.to_dict() for job in manager.list_jobs(offset, limit)],
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    return _job_or_404(job_id).to_dict()
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    _job_or_404(job_id)
+    return _manager().cancel(job_id).to_dict()
+
+
+@app.get("/jobs/{job_id}/results/{name}")
+async def job_results(job_id: str, name: str, offset: int = Query(0, ge=0),
+                      limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE)):
+    _job_or_404(job_id)
+    if name not in RESULT_FILES:
+        raise HTTPException(status_code=404, detail=f"unknown result {name}, expected one of {list(RESULT_FILES)}")
+    try:
+        return await _manager().page(job_id, name, offset, limit)
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=os.environ.get("HB_HOST", "127.0.0.1"), port=int(os.environ.get("HB_PORT", "8000")))
@@ -0,0 +1,328 @@
+import asyncio
+import json
+import re
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+
+from backend.services.instagram_scraper.account_scrape import INSTAGRAM_URL
+from backend.services.instagram_scraper.batch_orchestrator import BrowserPool, BatchOrchestrator
+from backend.services.instagram_scraper.record_io import (
+    OUTPUT_FORMATS, check_format, iter_records, sniff_format, with_format,
+)
+from backend.services.instagram_scraper.streaming_analyzer import StreamingFollowerAnalyzer
+
+JOB_KINDS = ("scrape", "analyze")
+
+# instagram's own username rules. the name becomes a directory under output_root, so nothing else gets through
+USERNAME_RE = re.compile(r"[A-Za-z0-9._]{1,30}")
+
+# files a finished job leaves in its output directory, by result name. the extension changes with the
+# output format, _find_results looks for every one of them
+RESULT_FILES = {
+    "followers": "followers.json",
+    "following": "following.json",
+    "they_dont_follow_back": "they_dont_follow_back.json",
+    "you_dont_follow_back": "you_dont_follow_back.json",
+}
+# a finished result keeps the byte offset of every PAGE_STRIDE-th record, a page read seeks to the one at or
+# before its offset and skips less than PAGE_STRIDE lines
+PAGE_STRIDE = 256
+
+
+class JobNotFound(KeyError):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    username: str
+    mode: str = "y"
+    base_url: str = INSTAGRAM_URL
+    concurrent_lists: bool = True
+    output_format: str = "json"
+    # analyze jobs: the lists to compare
+    followers_path: Optional[str] = None
+    following_path: Optional[str] = None
+
+    status: str = "queued"
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    output_dir: Optional[str] = None
+    counts: Dict[str, int] = field(default_factory=dict)
+    # result name -> ndjson file pages are read from, and the byte offset of every PAGE_STRIDE-th record in it.
+    # built once the job has finished, pages are read from disk on request
+    result_files: Dict[str, str] = field(default_factory=dict, repr=False)
+    result_offsets: Dict[str, List[int]] = field(default_factory=dict, repr=False)
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "username": self.username,
+            "mode": self.mode,
+            "base_url": self.base_url,
+            "output_format": self.output_format,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "output_dir": self.output_dir,
+            "counts": dict(self.counts),
+            "results": sorted(self.result_files),
+        }
+
+
+class JobManager:
+    """
+    Runs scrape / analyze jobs on the current event loop.
+
+    Jobs wait in a queue and `workers` of them run at a time, scrape jobs additionally wait for a free context
+    in the BrowserPool. everything a status poll reads lives on the Job object, so polling never touches the
+    browser or the disk. finished jobs only remember where their results are, how long they are and where every
+    PAGE_STRIDE-th record starts, a result page seeks there and reads on from the file. only the newest
+    `keep_finished` finished jobs are retained.
+    """
+    def __init__(self, pool: Optional[BrowserPool], workers: int = 2, output_root: str = "api_runs",
+                 snapshot_db: Optional[str] = None, keep_finished: int = 100, base_url: str = INSTAGRAM_URL,
+                 input_root: Optional[str] = None, logger=None) -> None:
+        self.pool = pool
+        self.workers = max(1, workers)
+        self.output_root = Path(output_root)
+        # every scrape job targets this host. it is server config, never part of a request: anything other than
+        # instagram is scraped without a login check
+        self.base_url = base_url
+        # analyze jobs may read lists from here and from earlier jobs' outputs, nowhere else
+        self.input_root = Path(input_root) if input_root else None
+        self.snapshot_db = snapshot_db
+        self.keep_finished = keep_finished
+        self.log = logger
+
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._closing = False
+
+    async def start(self) -> None:
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        self._closing = True
+        for job in self.jobs.values():
+            if not job.done:
+                self.cancel(job.id)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # --------------------------
+    # Public API
+    # --------------------------
+
+    def submit(self, kind: str, username: str, **options) -> Job:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"unknown job kind {kind!r}, expected one of {JOB_KINDS}")
+        if kind == "scrape" and self.pool is None:
+            raise ValueError("this server has no browser pool, only analyze jobs can run")
+        if not USERNAME_RE.fullmatch(username or ""):
+            raise ValueError(f"invalid username {username!r}")
+        if kind == "scrape" and options.get("mode", "y").strip().lower() == "r" and not self.snapshot_db:
+            # every job writes to a new directory, the previous scrape can only come from the snapshot history
+            raise ValueError("refresh jobs need a snapshot database (HB_SNAPSHOT_DB)")
+        if kind == "analyze":
+            if not (options.get("followers_path") and options.get("following_path")):
+                raise ValueError("analyze jobs need followers_path and following_path")
+            options["followers_path"] = self._input_path(options["followers_path"])
+            options["following_path"] = self._input_path(options["following_path"])
+        check_format(options.get("output_format", "json"))
+        job = Job(id=uuid.uuid4().hex[:12], kind=kind, username=username, base_url=self.base_url, **options)
+        job.output_dir = str(self.output_root / username / job.id)
+        self.jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def _input_path(self, path: str) -> str:
+        """the resolved path of an analyze input, ValueError unless it lies under input_root or output_root"""
+        resolved = Path(path).resolve()
+        roots = [self.output_root] + ([self.input_root] if self.input_root else [])
+        if not any(resolved.is_relative_to(root.resolve()) for root in roots):
+            raise ValueError(f"{path} is outside the directories analyze jobs may read")
+        if not resolved.is_file():
+            raise ValueError(f"{path} does not exist")
+        return str(resolved)
+
+    def get(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise JobNotFound(job_id)
+        return job
+
+    def list_jobs(self, offset: int = 0, limit: int = 50) -> List[Job]:
+        jobs = list(self.jobs.values())
+        return jobs[offset:offset + limit]
+
+    def cancel(self, job_id: str) -> Job:
+        job = self.get(job_id)
+        if job.done:
+            return job
+        if job.task is not None:
+            # the scrape unwinds through the pool, which closes its context
+            job.task.cancel()
+        else:
+            # still queued, the worker that picks it up skips it
+            self._finish(job, "cancelled")
+        return job
+
+    async def page(self, job_id: str, result: str, offset: int = 0, limit: int = 100) -> Dict:
+        job = self.get(job_id)
+        if result not in RESULT_FILES:
+            raise KeyError(result)
+        path = job.result_files.get(result)
+        if path is None:
+            raise LookupError(f"job {job_id} has no {result} results (status: {job.status})")
+        items = await asyncio.to_thread(_read_page, path, job.result_offsets[result], offset, limit)
+        total = job.counts[result]
+        next_offset = offset + len(items)
+        return {
+            "job_id": job_id,
+            "result": result,
+            "offset": offset,
+            "limit": limit,
+            "total": total,
+            "next_offset": next_offset if next_offset < total else None,
+            "items": items,
+        }
+
+    # --------------------------
+    # Workers
+    # --------------------------
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status != "queued":
+                    continue
+                job.status = "running"
+                job.started_at = time.time()
+                job.task = asyncio.create_task(self._run(job))
+                try:
+                    await job.task
+                    self._finish(job, "failed" if job.error else "succeeded")
+                except asyncio.CancelledError:
+                    if not job.task.done():
+                        job.task.cancel()
+                    self._finish(job, "cancelled")
+                    # the worker itself is being shut down
+                    if self._closing:
+                        raise
+                except Exception as e:
+                    job.error = f"{type(e).__name__}: {e}"
+                    self._finish(job, "failed")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        out_dir = Path(job.output_dir)
+        if job.kind == "scrape":
+            orchestrator = BatchOrchestrator(
+                self.pool, mode=job.mode, concurrent_lists=job.concurrent_lists, output_root=str(self.output_root),
+                snapshot_db=self.snapshot_db, base_url=job.base_url, output_format=job.output_format, logger=self.log,
+            )
+            result = await orchestrator.run_job(job.username, out_dir)
+            if not result.ok:
+                job.error = result.error
+                return
+        else:
+            analyzer = StreamingFollowerAnalyzer(
+                job.followers_path, job.following_path, str(out_dir), logger=self.log, output_format=job.output_format,
+            )
+            await asyncio.to_thread(out_dir.mkdir, parents=True, exist_ok=True)
+            await asyncio.to_thread(analyzer.compute_they_dont_follow_back)
+            await asyncio.to_thread(analyzer.compute_you_dont_follow_back)
+        job.result_files, job.counts, job.result_offsets = await asyncio.to_thread(_find_results, out_dir)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        job.task = None
+        if self.log:
+            self.log.info(f"Job {job.id} ({job.kind} {job.username}) {status}" + (f": {job.error}" if job.error else ""))
+        self._evict()
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job_id]
+
+
+def _find_results(out_dir: Path) -> Tuple[Dict[str, str], Dict[str, int], Dict[str, List[int]]]:
+    """result name -> pageable file, record count and page offsets, one streaming pass per result"""
+    files, counts, offsets = {}, {}, {}
+    for name, filename in RESULT_FILES.items():
+        for fmt in OUTPUT_FORMATS:
+            path = with_format(out_dir / filename, fmt)
+            if path.exists():
+                files[name], counts[name], offsets[name] = _index_result(path)
+                break
+    return files, counts, offsets
+
+
+def _index_result(path: Path) -> Tuple[str, int, List[int]]:
+    """
+    Plain ndjson is indexed in place. json, csv and ndjson.gz can't be entered in the middle, they are copied
+    once to <file>.pages.ndjson, indexed while writing
+    """
+    offsets, count = [], 0
+    if sniff_format(path) == "ndjson":
+        with open(path, "rb") as f:
+            pos = 0
+            for line in f:
+                if line.strip():
+                    if count % PAGE_STRIDE == 0:
+                        offsets.append(pos)
+                    count += 1
+                pos += len(line)
+        return str(path), count, offsets
+
+    pages = path.with_name(path.name + ".pages.ndjson")
+    with open(pages, "wb") as out:
+        for record in iter_records(path):
+            if count % PAGE_STRIDE == 0:
+                offsets.append(out.tell())
+            out.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            count += 1
+    return str(pages), count, offsets
+
+
+def _read_page(path: str, offsets: List[int], offset: int, limit: int) -> List[Dict]:
+    stride, skip = divmod(offset, PAGE_STRIDE)
+    if stride >= len(offsets):
+        return []
+    items = []
+    with open(path, "rb") as f:
+        f.seek(offsets[stride])
+        for line in f:
+            if not line.strip():
+                continue
+            if skip:
+                skip -= 1
+                continue
+            items.append(json.loads(line))
+            if len(items) == limit:
+                break
+    return items
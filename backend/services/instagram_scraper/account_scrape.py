@@ -0,0 +1,115 @@
+import asyncio
+from typing import Optional, Callable, Tuple, Union, Dict
+from .config import ScrapeConfig, Selectors
+from .utils_logger import make_logger
+from .follower_scraper import InstagramFollowerScraper
+from .follower_scraper_live import LiveInstagramFollowerScraper
+from .follower_scraper_network import NetworkInstagramFollowerScraper
+from .follower_scraper_refresh import RefreshInstagramFollowerScraper
+from .follower_store import FollowerStore
+from .record_io import with_format
+
+INSTAGRAM_URL = "https://instagram.com"
+
+# which profile link opens which list
+FOLLOW_LIST_KINDS = ("followers", "following")
+
+
+def pick_scraper_class(mode: str):
+    """y -> live scraper, net -> network responses, r -> refresh the top of the last scrape, anything else -> scroll then parse once"""
+    mode = mode.strip().lower()
+    if mode == "net":
+        return NetworkInstagramFollowerScraper
+    if mode == "r":
+        return RefreshInstagramFollowerScraper
+    return LiveInstagramFollowerScraper if mode == "y" else InstagramFollowerScraper
+
+
+def default_config(kind: str, **overrides) -> ScrapeConfig:
+    output_format = overrides.get("output_format", "json")
+    options = dict(
+        quiet_ms=5_000,
+        scroll_delta=1_000,
+        cooldown_s=0.1,
+        log_to_console=True,
+        log_level="INFO",
+        write_file=str(with_format(f"{kind}.json", output_format)),
+    )
+    options.update(overrides)
+    return ScrapeConfig(**options)
+
+
+async def open_follow_list(page, username: str, kind: str, base_url: str = INSTAGRAM_URL,
+                           selectors: Optional[Selectors] = None) -> None:
+    """navigates to the profile and opens the followers / following modal"""
+    selectors = selectors or Selectors()
+    await page.goto(f"{base_url}/{username}")
+    await page.wait_for_selector(f'[href*="{kind}"]')
+    await page.click(f'[href*="{kind}"]')
+    # wait for the list itself rather than a fixed sleep
+    await page.wait_for_selector(selectors.scroll_container_css)
+
+
+async def scrape_follow_list(page, username: str, kind: str, mode: str, config: Optional[ScrapeConfig] = None,
+                             logger=None, base_url: str = INSTAGRAM_URL,
+                             previous: Optional[list] = None) -> Union[list, FollowerStore]:
+    """
+    Opens one list on the given page and scrapes it.
+    Returns the scraper's FollowerStore when it keeps one (FollowerAnalyzer takes it directly), else the list.
+    `previous` is the last scrape of this list for the refresh mode, by default it is read back from write_file.
+    """
+    config = config or default_config(kind)
+    # make_logger resets the handlers of the named logger, concurrent accounts must not share one
+    logger = logger or make_logger(
+        name=f"{kind}_scraper_{username}", to_console=config.log_to_console, level=config.log_level
+    )
+
+    ScraperClass = pick_scraper_class(mode)
+    if ScraperClass is RefreshInstagramFollowerScraper:
+        scraper = ScraperClass(page, config=config, logger=logger, previous=previous)
+    else:
+        scraper = ScraperClass(page, config=config, logger=logger)
+    if isinstance(scraper, NetworkInstagramFollowerScraper):
+        # listen before the modal opens so the first page of the list is captured too
+        scraper.attach()
+
+    await open_follow_list(page, username, kind, base_url)
+    logger.info(f"Opened {kind} of {username}")
+
+    result = await scraper.run()
+    if isinstance(scraper, (LiveInstagramFollowerScraper, NetworkInstagramFollowerScraper)):
+        return scraper.store
+    return result
+
+
+async def scrape_account(context, username: str, mode: str, concurrent: bool = True,
+                         make_config: Callable[[str], ScrapeConfig] = default_config,
+                         base_url: str = INSTAGRAM_URL,
+                         previous: Optional[Dict[str, list]] = None) -> Tuple[Union[list, FollowerStore], Union[list, FollowerStore]]:
+    """
+    Scrapes followers and following of one account inside an authenticated browser context.
+    With concurrent=True each list gets its own page and both scrapes run at the same time,
+    so a full run takes about as long as the slower list. `previous` maps a list kind to its last scrape
+    for the refresh mode.
+    """
+    previous = previous or {}
+    if concurrent:
+        pages = [await context.new_page() for _ in FOLLOW_LIST_KINDS]
+        try:
+            followers, following = await asyncio.gather(*[
+                scrape_follow_list(page, username, kind, mode, make_config(kind), base_url=base_url,
+                                   previous=previous.get(kind))
+                for page, kind in zip(pages, FOLLOW_LIST_KINDS)
+            ])
+        finally:
+            for page in pages:
+                await page.close()
+        return followers, following
+
+    # one page, one list after the other
+    page = context.pages[0] if context.pages else await context.new_page()
+    followers = await scrape_follow_list(page, username, "followers", mode, make_config("followers"), base_url=base_url,
+                                         previous=previous.get("followers"))
+    following = await scrape_follow_list(page, username, "following", mode, make_config("following"), base_url=base_url,
+                                         previous=previous.get("following"))
+    return followers, following
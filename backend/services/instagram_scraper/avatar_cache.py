@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Downloads the profile pictures of a scraped list into a content-addressed disk cache.
+
+Every image is stored once under objects/<first 2 hex>/<sha256><ext>, however many urls point at it, and
+url_map.json maps each url to its file. instagram's cdn urls carry signed, expiring query parameters, so the
+map is keyed by the url without its query string: a picture cached from yesterday's scrape is a hit today even
+though its url was re-signed. cached urls are never requested again.
+
+Downloads run on one pooled httpx client with at most `concurrency` requests in flight.
+
+  python -m backend.services.instagram_scraper.avatar_cache followers.json --cache-dir avatar_cache
+  python -m benchmarks.bench_avatars --avatars 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import time
+from pathlib import Path
+from typing import Optional, Iterable, Dict, Union
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+import httpx
+
+from .record_io import iter_records
+from .utils_logger import make_logger
+
+# statuses worth another try, anything else (403 for an expired signature, 404) fails the url at once
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def url_key(url: str) -> str:
+    """the url without query string and fragment, stable across instagram's re-signed cdn urls"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+
+class AvatarCache:
+    def __init__(self, cache_dir: str = "avatar_cache", concurrency: int = 16, timeout_s: float = 15.0,
+                 retries: int = 2, base_url: Optional[str] = None, logger=None) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.map_file = self.cache_dir / "url_map.json"
+        self.concurrency = max(1, concurrency)
+        self.timeout_s = timeout_s
+        self.retries = retries
+        # relative urls (e.g. from benchmarks/fixture_server.py) are resolved against this
+        self.base_url = base_url
+        self.log = logger or make_logger(name="avatar_cache", to_console=True, level="INFO")
+
+        # url key -> {"sha256", "path" (relative to cache_dir), "bytes", "content_type"}
+        self.url_map: Dict[str, Dict] = {}
+        self._loaded = False
+        # digests written (or found on disk) during this run
+        self._stored = set()
+        self.stats = {"urls": 0, "hits": 0, "downloaded": 0, "deduplicated": 0, "failed": 0, "bytes": 0}
+
+    # --------------------------
+    # Lookups
+    # --------------------------
+
+    def load(self) -> "AvatarCache":
+        if self.map_file.exists():
+            self.url_map = json.loads(self.map_file.read_text(encoding="utf-8"))
+        self._loaded = True
+        return self
+
+    def path_for(self, url: str) -> Optional[Path]:
+        """the cached file for a url, None if it was never downloaded (or its file is gone)"""
+        if not self._loaded:
+            self.load()
+        entry = self.url_map.get(url_key(self._absolute(url)))
+        if entry is None:
+            return None
+        path = self.cache_dir / entry["path"]
+        return path if path.exists() else None
+
+    def _cached_keys(self, keys: Iterable[str]) -> set:
+        """the keys whose file is on disk. every object is stat'ed once, however many urls share it"""
+        exists: Dict[str, bool] = {}
+        cached = set()
+        for key in keys:
+            entry = self.url_map.get(key)
+            if entry is None:
+                continue
+            if entry["path"] not in exists:
+                exists[entry["path"]] = (self.cache_dir / entry["path"]).exists()
+            if exists[entry["path"]]:
+                cached.add(key)
+        return cached
+
+    def _absolute(self, url: str) -> str:
+        return urljoin(self.base_url, url) if self.base_url else url
+
+    def save(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.map_file.with_name(self.map_file.name + ".tmp")
+        tmp.write_text(json.dumps(self.url_map, indent=1), encoding="utf-8")
+        os.replace(tmp, self.map_file)
+
+    # --------------------------
+    # Downloads
+    # --------------------------
+
+    async def fetch_all(self, records: Iterable[Union[Dict, str]]) -> Dict:
+        """
+        Downloads the picture of every record (a follower dict or a plain url) that is not cached yet.
+        returns the run report, see report()
+        """
+        if not self._loaded:
+            await asyncio.to_thread(self.load)
+        await asyncio.to_thread(self.objects_dir.mkdir, parents=True, exist_ok=True)
+        started = time.perf_counter()
+
+        # url key -> url, the same picture listed twice (e.g. in followers and following) is one lookup
+        wanted: Dict[str, str] = {}
+        for record in records:
+            url = record if isinstance(record, str) else record.get("profilePic")
+            if url:
+                url = self._absolute(url)
+                wanted.setdefault(url_key(url), url)
+        self.stats["urls"] += len(wanted)
+        # the map says what is cached, whether the files are still there is checked off the loop
+        cached = await asyncio.to_thread(self._cached_keys, wanted)
+        self.stats["hits"] += len(cached)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for key, url in wanted.items():
+            if key not in cached:
+                queue.put_nowait((key, url))
+
+        if not queue.empty():
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            async with httpx.AsyncClient(limits=limits, timeout=self.timeout_s, follow_redirects=True) as client:
+                workers = [
+                    asyncio.create_task(self._worker(client, queue))
+                    for _ in range(min(self.concurrency, queue.qsize()))
+                ]
+                try:
+                    await asyncio.gather(*workers)
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+                    # keep what was downloaded even if the run was interrupted
+                    await asyncio.to_thread(self.save)
+
+        report = self.report(time.perf_counter() - started)
+        self.log.info(
+            f"{report['urls']} avatars: {report['hits']} cached, {report['downloaded']} downloaded "
+            f"({report['deduplicated']} duplicates), {report['failed']} failed, "
+            f"{report['downloads_per_s']} downloads/s, hit rate {report['hit_rate']}"
+        )
+        return report
+
+    async def _worker(self, client, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            key, url = queue.get_nowait()
+            try:
+                body, content_type = await self._download(client, url)
+                await self._store(key, body, content_type)
+            except Exception as e:
+                self.stats["failed"] += 1
+                self.log.warning(f"Avatar download failed for {key}: {type(e).__name__}: {e}")
+
+    async def _download(self, client, url: str):
+        for attempt in range(self.retries + 1):
+            try:
+                resp = await client.get(url)
+                if resp.status_code not in _RETRY_STATUSES or attempt == self.retries:
+                    resp.raise_for_status()
+                    return resp.content, resp.headers.get("content-type", "")
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def _store(self, key: str, body: bytes, content_type: str) -> None:
+        # avatars are a few kB, hashing on the loop keeps the dedup check free of races between workers
+        digest = hashlib.sha256(body).hexdigest()
+        ext = mimetypes.guess_extension(content_type.split(";")[0].strip()) or ""
+        rel = Path("objects") / digest[:2] / f"{digest}{ext}"
+        if digest in self._stored:
+            # another url already brought these exact bytes in this run
+            self.stats["deduplicated"] += 1
+        else:
+            self._stored.add(digest)
+            if not await asyncio.to_thread(self._write_object, self.cache_dir / rel, body):
+                self.stats["deduplicated"] += 1
+        self.url_map[key] = {"sha256": digest, "path": rel.as_posix(), "bytes": len(body), "content_type": content_type}
+        self.stats["downloaded"] += 1
+        self.stats["bytes"] += len(body)
+
+    @staticmethod
+    def _write_object(path: Path, body: bytes) -> bool:
+        """writes the object unless a previous run already did, returns whether it was written"""
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+        return True
+
+    def report(self, elapsed: float) -> Dict:
+        s = self.stats
+        return {
+            **s,
+            "elapsed_s": round(elapsed, 3),
+            "downloads_per_s": round(s["downloaded"] / elapsed, 1) if elapsed else None,
+            "mb_per_s": round(s["bytes"] / 2**20 / elapsed, 2) if elapsed else None,
+            "hit_rate": round(s["hits"] / s["urls"], 3) if s["urls"] else None,
+            # distinct images on disk for all urls mapped so far
+            "objects": len({entry["sha256"] for entry in self.url_map.values()}),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("snapshot", nargs="+", help="followers / following files in any record_io format")
+    parser.add_argument("--cache-dir", default="avatar_cache")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout-s", type=float, default=15.0)
+    parser.add_argument("--base-url", default=None, help="resolve relative picture urls against this host")
+    args = parser.parse_args()
+
+    def records():
+        for path in args.snapshot:
+            yield from iter_records(path)
+
+    cache = AvatarCache(args.cache_dir, concurrency=args.concurrency, timeout_s=args.timeout_s, base_url=args.base_url)
+    print(json.dumps(asyncio.run(cache.fetch_all(records())), indent=4))
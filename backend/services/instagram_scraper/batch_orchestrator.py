@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Scrape + analyze many instagram accounts in parallel.
+
+Each account is one job: it gets its own browser context (loaded with the account's cookies), its own
+output directory and its own loggers. jobs are spread over a pool of browser contexts, optionally across
+several chromium processes, and at most browsers * contexts_per_browser jobs run at a time.
+
+  python -m backend.services.instagram_scraper.batch_orchestrator usernames.txt --browsers 2 --contexts 3
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional, List, Dict
+
+from .account_scrape import scrape_account, default_config, INSTAGRAM_URL
+from .session_manager import session_manager
+from .browser_daemon import connect_daemon
+from .follower_analyzer import FollowerAnalyzer
+from .record_io import OUTPUT_FORMATS, check_format, with_format
+from .snapshot_store import SnapshotStore
+from .lean_profile import apply_lean_routes, LEAN_CHROMIUM_ARGS
+from .utils_logger import make_logger
+
+# jobs finish on worker threads at the same time, one snapshot write at a time per process instead of
+# racing for sqlite's write lock
+_SNAPSHOT_WRITE_LOCK = threading.Lock()
+
+
+@dataclass
+class JobResult:
+    username: str
+    ok: bool = False
+    error: Optional[str] = None
+    followers: int = 0
+    following: int = 0
+    they_dont_follow_back: int = 0
+    you_dont_follow_back: int = 0
+    elapsed_s: float = 0.0
+    browser: Optional[int] = None
+    output_dir: Optional[str] = None
+
+
+class BrowserPool:
+    """
+    A bounded pool of browser contexts spread over `browsers` chromium processes.
+    every job gets a brand new context (no cookies, storage or cache shared between accounts), the pool only
+    decides which browser it runs in and how many may be open at once.
+    with use_daemon the pool attaches to the running browser_daemon instead of launching its own chromium.
+    """
+    def __init__(self, playwright, browsers: int = 1, contexts_per_browser: int = 2,
+                 headless: bool = True, launch_options: Optional[dict] = None, lean: bool = False,
+                 use_daemon: bool = False, logger=None) -> None:
+        self.p = playwright
+        self.browser_count = max(1, browsers)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.headless = headless
+        # copied, the lean args below must not leak into the caller's dict
+        self.launch_options = dict(launch_options or {})
+        self.lean = lean
+        self.use_daemon = use_daemon
+        if use_daemon:
+            self.browser_count = 1
+        if lean:
+            self.headless = True
+            self.launch_options.setdefault("args", list(LEAN_CHROMIUM_ARGS))
+        self.log = logger
+
+        self.browsers = []
+        self._open = []
+        self._slots = asyncio.Semaphore(self.size)
+
+    @property
+    def size(self) -> int:
+        return self.browser_count * self.contexts_per_browser
+
+    async def start(self) -> None:
+        for _ in range(self.browser_count):
+            if self.use_daemon:
+                browser = await connect_daemon(self.p)
+            else:
+                browser = await self.p.chromium.launch(headless=self.headless, **self.launch_options)
+            self.browsers.append(browser)
+            self._open.append(0)
+        if self.log:
+            self.log.info(f"Browser pool ready: {self.browser_count} browsers x {self.contexts_per_browser} contexts")
+
+    async def close(self) -> None:
+        for browser in self.browsers:
+            await browser.close()
+        self.browsers = []
+        self._open = []
+
+    @asynccontextmanager
+    async def context(self, cookies: Optional[list] = None, **context_options):
+        """yields (browser index, new context). waits for a free slot when the pool is full"""
+        async with self._slots:
+            # least loaded browser, the semaphore guarantees it has room
+            index = min(range(len(self.browsers)), key=lambda b: self._open[b])
+            self._open[index] += 1
+            context = None
+            try:
+                context = await self.browsers[index].new_context(**context_options)
+                if self.lean:
+                    await apply_lean_routes(context)
+                if cookies:
+                    await context.add_cookies(cookies)
+                yield index, context
+            finally:
+                if context is not None:
+                    await context.close()
+                self._open[index] -= 1
+
+
+class BatchOrchestrator:
+    """runs one scrape + analyze job per username over a BrowserPool and collects a JobResult for each"""
+    def __init__(self, pool: BrowserPool, mode: str = "y", concurrent_lists: bool = True,
+                 output_root: str = "runs", snapshot_db: Optional[str] = None, base_url: str = INSTAGRAM_URL,
+                 output_format: str = "json", preflight: bool = True, scrape_options: Optional[Dict] = None,
+                 logger=None) -> None:
+        self.pool = pool
+        # anything other than instagram (e.g. benchmarks/fixture_server.py) may be scraped without a saved login
+        self.base_url = base_url
+        # every job's lists are appended to this snapshot history when set
+        self.snapshot_db = snapshot_db
+        self.lean = pool.lean
+        self.mode = mode
+        self.concurrent_lists = concurrent_lists
+        self.output_root = Path(output_root)
+        # lists and analyzer results are written in this record_io format
+        self.output_format = check_format(output_format)
+        # extra ScrapeConfig fields for every job, e.g. incremental_capture / event_driven / resume
+        self.scrape_options = dict(scrape_options or {})
+        self.log = logger or make_logger(name="batch_orchestrator", to_console=True, level="INFO")
+        # saved logins are checked before a job takes a browser context, a dead session fails in milliseconds.
+        # the manager is shared, so its directory index and pre-flight results are too (across API jobs as well)
+        self.sessions = session_manager(logger=self.log)
+        self.preflight = preflight
+
+    async def run(self, usernames: List[str]) -> List[JobResult]:
+        # the pool's semaphore bounds concurrency, so every job can be scheduled up front
+        return list(await asyncio.gather(*[self.run_job(u) for u in usernames]))
+
+    async def run_job(self, username: str, out_dir: Optional[Path] = None) -> JobResult:
+        result = JobResult(username=username)
+        out_dir = Path(out_dir) if out_dir else self.output_root / username
+        result.output_dir = str(out_dir)
+        started = time.perf_counter()
+        try:
+            # the saved storage state (cookies + localStorage) is preferred, raw cookies are the fallback
+            if self.base_url == INSTAGRAM_URL:
+                session = self.sessions.check(username)
+                if self.preflight:
+                    await self.sessions.preflight(session)
+            else:
+                session = self.sessions.session(username)
+            auth = session.auth_options() if session else {}
+            out_dir.mkdir(parents=True, exist_ok=True)
+            # a refresh starts from the account's last full scrape in the history, not from whatever happens to
+            # be in this job's (possibly brand new) output directory
+            refresh = self.mode.strip().lower() == "r"
+            previous = None
+            if refresh and self.snapshot_db:
+                previous = await asyncio.to_thread(self._previous_snapshots, username)
+
+            # every output of this job, including resume checkpoints, lives in the account's own directory
+            def make_config(kind: str):
+                return default_config(
+                    kind,
+                    log_to_console=False,
+                    write_file=str(with_format(out_dir / f"{kind}.json", self.output_format)),
+                    output_format=self.output_format,
+                    checkpoint_file=str(out_dir / f"{kind}.checkpoint.json"),
+                    metrics_file=str(out_dir / f"{kind}.metrics.json"),
+                    lean_profile=self.lean,
+                    **self.scrape_options,
+                )
+
+            async with self.pool.context(**auth) as (browser_index, context):
+                result.browser = browser_index
+                self.log.info(f"[{username}] started in browser {browser_index}")
+                followers, following = await scrape_account(
+                    context, username, self.mode, concurrent=self.concurrent_lists, make_config=make_config,
+                    base_url=self.base_url, previous=previous,
+                )
+
+            # a refreshed list still holds everyone who unfollowed below the head, as a snapshot it would hide
+            # them from the lost followers report
+            if self.snapshot_db and not refresh:
+                await asyncio.to_thread(self._record_snapshots, username, followers, following)
+
+            # comparing and writing big lists would stall every other job on the loop
+            they_dont_follow_back, you_dont_follow_back = await asyncio.to_thread(
+                self._analyze, followers, following, out_dir
+            )
+
+            result.followers = len(followers)
+            result.following = len(following)
+            result.they_dont_follow_back = they_dont_follow_back
+            result.you_dont_follow_back = you_dont_follow_back
+            result.ok = True
+        except Exception as e:
+            # one broken account must not take the rest of the batch down
+            result.error = f"{type(e).__name__}: {e}"
+            self.log.error(f"[{username}] failed: {result.error}")
+        result.elapsed_s = round(time.perf_counter() - started, 2)
+        if result.ok:
+            self.log.info(f"[{username}] done in {result.elapsed_s}s")
+        return result
+
+    def _analyze(self, followers, following, out_dir: Path):
+        """writes both follow-back results, returns their lengths"""
+        analyzer = FollowerAnalyzer(followers, following, str(out_dir), output_format=self.output_format)
+        they_dont_follow_back = analyzer.compute_they_dont_follow_back()
+        you_dont_follow_back = analyzer.compute_you_dont_follow_back()
+        analyzer._save_json("they_dont_follow_back.json", they_dont_follow_back)
+        analyzer._save_json("you_dont_follow_back.json", you_dont_follow_back)
+        return len(they_dont_follow_back), len(you_dont_follow_back)
+
+    def _previous_snapshots(self, username: str) -> dict:
+        with SnapshotStore(self.snapshot_db) as snapshots:
+            previous = {kind: snapshots.latest_snapshot(username, kind) for kind in ("followers", "following")}
+        return {kind: rows for kind, rows in previous.items() if rows is not None}
+
+    def _record_snapshots(self, username: str, followers, following) -> None:
+        # sqlite connections are per thread, open one for this write
+        with _SNAPSHOT_WRITE_LOCK, SnapshotStore(self.snapshot_db) as snapshots:
+            snapshots.record_snapshot(username, "followers", followers)
+            snapshots.record_snapshot(username, "following", following)
+
+    def write_report(self, results: List[JobResult], path: Optional[str] = None) -> Path:
+        path = Path(path) if path else self.output_root / "batch_report.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "jobs": [asdict(r) for r in results],
+            "succeeded": sum(r.ok for r in results),
+            "failed": sum(not r.ok for r in results),
+        }
+        path.write_text(json.dumps(report, indent=4), encoding="utf-8")
+        return path
+
+
+def print_summary(results: List[JobResult]) -> None:
+    print(f"\n{'account':<30} {'status':<7} {'followers':>9} {'following':>9} {'no-followback':>13} {'time':>8}")
+    for r in results:
+        status = "ok" if r.ok else "FAILED"
+        print(f"{r.username:<30} {status:<7} {r.followers:>9} {r.following:>9} {r.they_dont_follow_back:>13} {r.elapsed_s:>7.1f}s")
+        if r.error:
+            print(f"    {r.error}")
+
+
+def read_usernames(path: str) -> List[str]:
+    """one username per line, blank lines and # comments ignored"""
+    usernames = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line and line not in usernames:
+            usernames.append(line)
+    return usernames
+
+
+async def run_batch(usernames: List[str], browsers: int = 1, contexts_per_browser: int = 2, mode: str = "y",
+                    concurrent_lists: bool = True, output_root: str = "runs", headless: bool = True,
+                    lean: bool = False, use_daemon: bool = False, snapshot_db: Optional[str] = None,
+                    output_format: str = "json", preflight: bool = True,
+                    scrape_options: Optional[Dict] = None) -> List[JobResult]:
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        pool = BrowserPool(p, browsers=browsers, contexts_per_browser=contexts_per_browser, headless=headless, lean=lean,
+                           use_daemon=use_daemon)
+        orchestrator = BatchOrchestrator(pool, mode=mode, concurrent_lists=concurrent_lists, output_root=output_root,
+                                         snapshot_db=snapshot_db, output_format=output_format, preflight=preflight,
+                                         scrape_options=scrape_options)
+        await pool.start()
+        try:
+            results = await orchestrator.run(usernames)
+        finally:
+            await pool.close()
+        report = orchestrator.write_report(results)
+        print_summary(results)
+        print(f"\nreport written to {report}")
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("usernames_file", help="file with one instagram username per line")
+    parser.add_argument("--browsers", type=int, default=1, help="chromium processes to spread contexts over")
+    parser.add_argument("--contexts", type=int, default=2, help="concurrent contexts (jobs) per browser")
+    parser.add_argument("--mode", default="y", help='y = live scraper, n = parse once, net = network responses, r = refresh new followers only')
+    parser.add_argument("--sequential-lists", action="store_true", help="scrape followers then following on one page")
+    parser.add_argument("--output", default="runs", help="root directory for per-account outputs")
+    parser.add_argument("--format", default="json", choices=OUTPUT_FORMATS, help="encoding of the lists and results")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--snapshot-db", default="snapshots.db", help="sqlite snapshot history ('' to disable)")
+    parser.add_argument("--daemon", action="store_true", help="attach to the running browser_daemon instead of launching")
+    parser.add_argument("--lean", action="store_true", help="headless, block images / media / fonts, no smooth scrolling")
+    parser.add_argument("--no-preflight", action="store_true", help="skip the http check that a saved login still works")
+    parser.add_argument("--incremental", action="store_true", help="live mode: capture only the rows added each scroll")
+    parser.add_argument("--event-driven", action="store_true", help="wait on page mutation events instead of polling")
+    parser.add_argument("--resume", action="store_true", help="live mode: continue each account from its checkpoint")
+    args = parser.parse_args()
+
+    asyncio.run(run_batch(
+        read_usernames(args.usernames_file),
+        browsers=args.browsers,
+        contexts_per_browser=args.contexts,
+        mode=args.mode,
+        concurrent_lists=not args.sequential_lists,
+        output_root=args.output,
+        headless=not args.headed,
+        lean=args.lean,
+        use_daemon=args.daemon,
+        snapshot_db=args.snapshot_db or None,
+        output_format=args.format,
+        preflight=not args.no_preflight,
+        scrape_options={"incremental_capture": args.incremental, "event_driven": args.event_driven,
+                        "resume": args.resume},
+    ))
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Long-lived local chromium that scrape jobs attach to instead of cold-launching a browser each run.
+
+The daemon starts chromium once with a remote debugging port and writes the websocket endpoint to
+.browser_daemon/endpoint.json. a BrowserPool started with use_daemon connects over CDP and gives every job a new
+context built from the account's saved session (SessionManager), which takes milliseconds instead of the seconds
+a browser launch and fresh login state cost. those contexts are off the record (in-memory cache, nothing shared
+between accounts), what is saved is the browser start, not the page loads.
+
+Chromium's memory only grows over a long life, so the daemon recycles it (restart with the same profile)
+once it is idle and has exceeded max_rss_mb or max_age_s.
+
+  python -m backend.services.instagram_scraper.browser_daemon --port 9222 --max-rss-mb 2048 --max-age-min 120
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+from .utils_logger import make_logger
+
+DAEMON_DIR = Path.cwd() / ".browser_daemon"
+ENDPOINT_FILE = DAEMON_DIR / "endpoint.json"
+
+
+def fetch_ws_url(port: int, host: str = "127.0.0.1") -> str:
+    """fetch the websocketDebuggerUrl so we can connect to the browser"""
+    resp = requests.get(f"http://{host}:{port}/json/version", timeout=3)
+    resp.raise_for_status()
+    return resp.json()["webSocketDebuggerUrl"]
+
+
+def _process_tree_rss_mb(root_pid: int) -> Optional[float]:
+    """resident memory of a process and all its children (chromium's renderers, gpu, ...). linux only"""
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+    children = {}
+    rss_pages = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            statm = (entry / "statm").read_text()
+        except OSError:
+            continue
+        # the command name may contain spaces, fields after it are space separated
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        pid = int(entry.name)
+        children.setdefault(ppid, []).append(pid)
+        rss_pages[pid] = int(statm.split()[1])
+
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+class BrowserDaemon:
+    def __init__(self, executable: str, port: int = 9222, data_dir: Path = DAEMON_DIR, headless: bool = True,
+                 max_rss_mb: float = 2048, max_age_s: float = 3600, check_interval_s: float = 30,
+                 extra_args: Optional[list] = None, logger=None) -> None:
+        self.executable = executable
+        self.port = port
+        self.data_dir = Path(data_dir)
+        self.headless = headless
+        self.max_rss_mb = max_rss_mb
+        self.max_age_s = max_age_s
+        self.check_interval_s = check_interval_s
+        self.extra_args = extra_args or []
+        self.log = logger or make_logger(name="browser_daemon", to_console=True, level="INFO")
+
+        self.proc = None
+        self.ws_url: Optional[str] = None
+        self.started_at = 0.0
+        self.recycles = 0
+
+    def _args(self) -> list:
+        args = [
+            self.executable,
+            f"--remote-debugging-port={self.port}",
+            # only the default context lives in this profile, job contexts never touch it
+            f"--user-data-dir={self.data_dir / 'profile'}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-background-timer-throttling",
+            "--disable-renderer-backgrounding",
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        return args + self.extra_args + ["about:blank"]
+
+    async def start(self) -> str:
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.proc = await asyncio.create_subprocess_exec(
+            *self._args(), stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                self.ws_url = await asyncio.to_thread(fetch_ws_url, self.port)
+                break
+            except Exception:
+                if self.proc.returncode is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"chromium did not come up on port {self.port}")
+                await asyncio.sleep(0.1)
+        self.started_at = time.monotonic()
+        ENDPOINT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        ENDPOINT_FILE.write_text(json.dumps({"ws_url": self.ws_url, "port": self.port, "pid": self.proc.pid}))
+        self.log.info(f"Chromium {self.proc.pid} listening on {self.ws_url}")
+        return self.ws_url
+
+    async def stop(self) -> None:
+        if self.proc and self.proc.returncode is None:
+            self.proc.terminate()
+            try:
+                await asyncio.wait_for(self.proc.wait(), 10)
+            except asyncio.TimeoutError:
+                self.proc.kill()
+                await self.proc.wait()
+        self.proc = None
+        ENDPOINT_FILE.unlink(missing_ok=True)
+
+    def needs_recycle(self) -> Optional[str]:
+        age = time.monotonic() - self.started_at
+        if age > self.max_age_s:
+            return f"age {age / 60:.0f} min"
+        rss = _process_tree_rss_mb(self.proc.pid) if self.proc else None
+        if rss is not None and rss > self.max_rss_mb:
+            return f"rss {rss:.0f} MiB"
+        return None
+
+    async def _open_job_contexts(self, browser) -> int:
+        # contexts created by other CDP clients are only visible through the Target domain
+        session = await browser.new_browser_cdp_session()
+        try:
+            result = await session.send("Target.getBrowserContexts")
+            return len(result.get("browserContextIds", []))
+        finally:
+            await session.detach()
+
+    async def serve_forever(self, playwright) -> None:
+        await self.start()
+        try:
+            while True:
+                await asyncio.sleep(self.check_interval_s)
+                if self.proc.returncode is not None:
+                    self.log.warning("Chromium exited, restarting")
+                    await self.start()
+                    continue
+                reason = self.needs_recycle()
+                if not reason:
+                    continue
+                browser = await playwright.chromium.connect_over_cdp(self.ws_url)
+                try:
+                    busy = await self._open_job_contexts(browser)
+                finally:
+                    await browser.close()
+                if busy:
+                    # never pull the browser out from under a running job, try again next check
+                    self.log.info(f"Recycle due ({reason}) but {busy} job contexts are open")
+                    continue
+                self.log.info(f"Recycling chromium: {reason}")
+                await self.stop()
+                await self.start()
+                self.recycles += 1
+        finally:
+            await self.stop()
+
+
+def daemon_ws_url() -> Optional[str]:
+    """endpoint of a running daemon, or None"""
+    try:
+        return json.loads(ENDPOINT_FILE.read_text(encoding="utf-8"))["ws_url"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+async def connect_daemon(playwright, ws_url: Optional[str] = None):
+    ws_url = ws_url or daemon_ws_url()
+    if not ws_url:
+        raise RuntimeError("no browser daemon running, start it with python -m backend.services.instagram_scraper.browser_daemon")
+    return await playwright.chromium.connect_over_cdp(ws_url)
+
+
+async def main(args) -> None:
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        daemon = BrowserDaemon(
+            p.chromium.executable_path,
+            port=args.port,
+            headless=not args.headed,
+            max_rss_mb=args.max_rss_mb,
+            max_age_s=args.max_age_min * 60,
+            check_interval_s=args.check_interval_s,
+        )
+        await daemon.serve_forever(p)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9222)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--max-rss-mb", type=float, default=2048, help="recycle chromium once its processes use more")
+    parser.add_argument("--max-age-min", type=float, default=120, help="recycle chromium after this many minutes")
+    parser.add_argument("--check-interval-s", type=float, default=30)
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Command line entry point.
+
+  python main.py scrape my_handle --mode y --lean
+  python main.py analyze --followers followers.json --following following.json
+  python main.py diff my_handle --report lost --since 2024-01-31
+  python main.py                      # no command: the interactive prompts
+
+Only `scrape` needs a browser. playwright and the scraper modules are imported inside the commands that use
+them, so analyze / diff start in a fraction of the time (python -m benchmarks.bench_cli_startup).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# stdlib only (json, csv, gzip), cheap enough to import up front for the --format choices
+from .record_io import OUTPUT_FORMATS
+
+_MODES_HELP = "y = live scraper, n = parse once, net = network responses, r = refresh new followers only"
+_DIFF_REPORTS = ("new", "lost", "they-dont-follow-back", "you-dont-follow-back", "snapshots")
+
+
+# --------------------------
+# scrape
+# --------------------------
+
+async def _scrape(username: str, mode: str = "y", concurrent: bool = True, lean: bool = False,
+                  output_dir: str = ".", output_format: str = "json", snapshot_db: str = "snapshots.db",
+                  base_url: str = None, analyze: bool = True, preflight: bool = True, incremental: bool = False,
+                  event_driven: bool = False, resume: bool = False) -> None:
+    from .account_scrape import INSTAGRAM_URL
+    from .session_manager import session_manager
+
+    # a missing, expired or rejected login raises SessionError here, before chromium is even started
+    sessions = session_manager()
+    if not base_url or base_url == INSTAGRAM_URL:
+        session = sessions.check(username)
+        if preflight:
+            await sessions.preflight(session)
+    else:
+        session = sessions.session(username)
+
+    from playwright.async_api import async_playwright
+    from .account_scrape import scrape_account, default_config
+    from .lean_profile import launch_options, apply_lean_routes
+    from .record_io import with_format
+
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # a refresh starts from the last full scrape in the history when there is one, else from the files in out_dir
+    refresh = mode.strip().lower() == "r"
+    previous = None
+    if refresh and snapshot_db and Path(snapshot_db).exists():
+        from .snapshot_store import SnapshotStore
+
+        with SnapshotStore(snapshot_db) as snapshots:
+            previous = {kind: snapshots.latest_snapshot(username, kind) for kind in ("followers", "following")}
+        previous = {kind: rows for kind, rows in previous.items() if rows is not None}
+
+    def make_config(kind: str):
+        return default_config(
+            kind,
+            lean_profile=lean,
+            output_format=output_format,
+            write_file=str(with_format(out_dir / f"{kind}.json", output_format)),
+            incremental_capture=incremental,
+            event_driven=event_driven,
+            # live runs always checkpoint, only --resume picks an interrupted run back up
+            checkpoint_file=str(out_dir / f"{kind}.checkpoint.json"),
+            resume=resume,
+        )
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**launch_options(make_config("followers")))
+        # the saved storage state (cookies + localStorage) is preferred, raw cookies are the fallback
+        auth = session.auth_options() if session else {}
+        context = await browser.new_context(storage_state=auth.get("storage_state"))
+        if lean:
+            # profile pic urls are still read from img.src, only the downloads are skipped
+            await apply_lean_routes(context)
+        if auth.get("cookies"):
+            print(f"Loaded {len(auth['cookies'])} cookies from {session.path}")
+            await context.add_cookies(auth["cookies"])
+
+        # followers and following each get their own page, logger, config and output file when run concurrently
+        followers, following = await scrape_account(
+            context, username, mode, concurrent=concurrent, make_config=make_config, base_url=base_url or INSTAGRAM_URL,
+            previous=previous,
+        )
+        await browser.close()
+    print(f"wrote {make_config('followers').write_file} and {make_config('following').write_file}")
+
+    if snapshot_db and refresh:
+        # the merged list keeps everyone who unfollowed below the head, recorded as a snapshot it would hide them
+        # from `diff --report lost`
+        print("refresh results are partial, not recorded in the snapshot history")
+    elif snapshot_db:
+        from .snapshot_store import SnapshotStore
+
+        # keep every scrape so later runs can answer "who unfollowed since X"
+        with SnapshotStore(snapshot_db) as snapshots:
+            snapshots.record_snapshot(username, "followers", followers)
+            snapshots.record_snapshot(username, "following", following)
+
+    if analyze:
+        from .follower_analyzer import FollowerAnalyzer
+
+        analyzer = FollowerAnalyzer(followers, following, str(out_dir), output_format=output_format)
+        analyzer._save_json("they_dont_follow_back.json", analyzer.compute_they_dont_follow_back())
+        analyzer._save_json("you_dont_follow_back.json", analyzer.compute_you_dont_follow_back())
+
+
+def _run_scrape(**options) -> int:
+    import asyncio
+    from .session_manager import SessionError
+
+    try:
+        asyncio.run(_scrape(**options))
+    except SessionError as e:
+        print(f"[error] {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_scrape(args) -> int:
+    return _run_scrape(
+        username=args.username,
+        mode=args.mode,
+        concurrent=not args.sequential_lists,
+        lean=args.lean,
+        output_dir=args.output_dir,
+        output_format=args.format,
+        snapshot_db=args.snapshot_db or None,
+        base_url=args.base_url,
+        analyze=not args.no_analyze,
+        preflight=not args.no_preflight,
+        incremental=args.incremental,
+        event_driven=args.event_driven,
+        resume=args.resume,
+    )
+
+
+def cmd_interactive() -> int:
+    """the original prompt-driven flow of main.py"""
+    username = input('type in your instagram username.')
+    mode = input('live scrape mode? y/n (or "net" to read followers from network responses, "r" to only fetch new followers since the last run)')
+    concurrent = input('scrape followers and following at the same time? y/n').strip().lower() == "y"
+    lean = input('lean profile? headless, no images/fonts/media y/n').strip().lower() == "y"
+    return _run_scrape(username=username, mode=mode, concurrent=concurrent, lean=lean)
+
+
+# --------------------------
+# analyze
+# --------------------------
+
+def cmd_analyze(args) -> int:
+    """compares two saved lists, no browser involved"""
+    for path in (args.followers, args.following):
+        if not Path(path).exists():
+            print(f"[error] {path} does not exist", file=sys.stderr)
+            return 1
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+
+    if args.streaming:
+        from .streaming_analyzer import StreamingFollowerAnalyzer
+
+        analyzer = StreamingFollowerAnalyzer(
+            args.followers, args.following, args.output_dir, memory_cap_mb=args.memory_cap_mb,
+            output_format=args.format,
+        )
+        they = analyzer.compute_they_dont_follow_back()
+        you = analyzer.compute_you_dont_follow_back()
+    else:
+        from .follower_analyzer import FollowerAnalyzer
+        from .follower_store import FollowerStore
+        from .record_io import iter_records
+
+        analyzer = FollowerAnalyzer(
+            FollowerStore(iter_records(args.followers)), FollowerStore(iter_records(args.following)),
+            args.output_dir, output_format=args.format,
+        )
+        they = analyzer.compute_they_dont_follow_back()
+        you = analyzer.compute_you_dont_follow_back()
+        analyzer._save_json("they_dont_follow_back.json", they)
+        analyzer._save_json("you_dont_follow_back.json", you)
+        they, you = len(they), len(you)
+    print(f"[summary] they don't follow you back: {they}, you don't follow them back: {you}")
+    return 0
+
+
+# --------------------------
+# diff
+# --------------------------
+
+def cmd_diff(args) -> int:
+    """answers history questions from the snapshot database, no browser involved"""
+    import json
+
+    if not Path(args.db).exists():
+        print(f"[error] no snapshot database at {args.db}", file=sys.stderr)
+        return 1
+    from .snapshot_store import SnapshotStore
+
+    with SnapshotStore(args.db) as snapshots:
+        if args.report == "snapshots":
+            rows = snapshots.snapshots(args.username)
+        elif args.report == "new":
+            rows = snapshots.new_followers(args.username, since=args.since)
+        elif args.report == "lost":
+            rows = snapshots.lost_followers(args.username, since=args.since)
+        elif args.report == "they-dont-follow-back":
+            rows = snapshots.they_dont_follow_back(args.username, as_of=args.as_of)
+        else:
+            rows = snapshots.you_dont_follow_back(args.username, as_of=args.as_of)
+
+    if args.json or args.report == "snapshots":
+        print(json.dumps(rows, indent=4, ensure_ascii=False))
+    else:
+        # one username per line, easy to pipe into other tools
+        for row in rows:
+            print(row["username"])
+    return 0
+
+
+# --------------------------
+# Parser
+# --------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    scrape = commands.add_parser("scrape", help="scrape followers and following of an account (needs a browser)")
+    scrape.add_argument("username")
+    scrape.add_argument("--mode", default="y", help=_MODES_HELP)
+    scrape.add_argument("--sequential-lists", action="store_true", help="scrape followers then following on one page")
+    scrape.add_argument("--lean", action="store_true", help="headless, block images / media / fonts, no smooth scrolling")
+    scrape.add_argument("--output-dir", default=".")
+    scrape.add_argument("--format", default="json", choices=OUTPUT_FORMATS, help="encoding of the lists and results")
+    scrape.add_argument("--snapshot-db", default="snapshots.db", help="sqlite snapshot history ('' to disable)")
+    scrape.add_argument("--base-url", default=None, help="scrape another host, e.g. benchmarks/fixture_server.py")
+    scrape.add_argument("--no-analyze", action="store_true", help="only scrape, skip the follow-back comparison")
+    scrape.add_argument("--no-preflight", action="store_true", help="skip the http check that the saved login still works")
+    scrape.add_argument("--incremental", action="store_true", help="live mode: capture only the rows added each scroll")
+    scrape.add_argument("--event-driven", action="store_true", help="wait on page mutation events instead of polling")
+    scrape.add_argument("--resume", action="store_true", help="live mode: continue from the checkpoint in --output-dir")
+    scrape.set_defaults(func=cmd_scrape)
+
+    analyze = commands.add_parser("analyze", help="compare saved followers / following lists (no browser)")
+    analyze.add_argument("--followers", default="followers.json", help="any record_io format")
+    analyze.add_argument("--following", default="following.json", help="any record_io format")
+    analyze.add_argument("--output-dir", default=".")
+    analyze.add_argument("--format", default="json", choices=OUTPUT_FORMATS, help="encoding of the results")
+    analyze.add_argument("--streaming", action="store_true", help="out-of-core comparison for very large lists")
+    analyze.add_argument("--memory-cap-mb", type=float, default=256, help="with --streaming")
+    analyze.set_defaults(func=cmd_analyze)
+
+    diff = commands.add_parser("diff", help="changes between snapshots in the history database (no browser)")
+    diff.add_argument("username")
+    diff.add_argument("--report", default="lost", choices=_DIFF_REPORTS)
+    diff.add_argument("--since", default=None, help="new / lost: compare against this date instead of the previous run")
+    diff.add_argument("--as-of", default=None, help="follow-back reports: as of this date instead of the latest run")
+    diff.add_argument("--db", default="snapshots.db")
+    diff.add_argument("--json", action="store_true", help="full records instead of one username per line")
+    diff.set_defaults(func=cmd_diff)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        return cmd_interactive()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,9 +7,54 @@ class ScrapeConfig:
     max_scrolls: int = 25_000
     scroll_delta: int = 1_000
     cooldown_s: float = 0.1
+    # time the page gets to react to a scroll before the fused step reads the loading graphic
+    step_settle_ms: int = 16
     write_file: Optional[str] = "followers.json"
+    # how write_file is encoded: json (indented array), ndjson, ndjson.gz or csv, see record_io.py.
+    # every reader in the package detects the format from the file itself
+    output_format: str = "json"
     log_to_console: bool = False          
     log_level: str = "INFO"               
+    # headless, no images / media / fonts, no smooth scrolling (see lean_profile.py)
+    lean_profile: bool = False
+    # await mutation events pushed from the page instead of polling every cooldown_s, and finish once a scroll
+    # goes unanswered for a quiet window learned from this run's load latencies (capped by quiet_ms)
+    event_driven: bool = False
+    adaptive_quiet_floor_ms: int = 250
+    adaptive_quiet_factor: float = 2.0
+    # unanswered scrolls in a row needed before the list is considered fully loaded
+    quiet_confirmations: int = 2
+    # live scraper only: buffer newly added rows in the page and drain just the delta each scroll
+    incremental_capture: bool = False
+    # live scraper only: new rows are appended to <write_file>.ndjson in the background and compacted at the end
+    journal_flush_interval_s: float = 1.0
+    journal_flush_records: int = 500
+    # live scraper only: save scroll progress every checkpoint_every scrolls (records are in the journal).
+    # with resume=True a run picks up from an existing checkpoint, fast-scrolling past the rows it already has
+    checkpoint_file: Optional[str] = None
+    checkpoint_every: int = 25
+    resume: bool = False
+    resume_scroll_delta: int = 5_000
+    # refresh scraper only: stop once this many rows in a row were already in the previous snapshot
+    refresh_known_run: int = 20
+    # live scraper with incremental_capture only: once python has confirmed captured rows, stop rendering them
+    # (fixed height, content-visibility: hidden) so renderer memory and layout cost stay flat on very long lists.
+    # the newest prune_keep_last rows are left alone
+    prune_captured_rows: bool = False
+    prune_keep_last: int = 50
+    # tune scroll_delta / cooldown_s during the run from rows per scroll, loading frequency and load latency
+    # (see scroll_pacer.py). scroll_delta and cooldown_s are the starting point, scrolls that can trigger a
+    # request to instagram are never sent faster than max_requests_per_s (0 = no limit)
+    adaptive_pacing: bool = False
+    pacing_min_delta: int = 400
+    pacing_max_delta: int = 6_000
+    pacing_min_cooldown_s: float = 0.02
+    pacing_max_cooldown_s: float = 1.0
+    max_requests_per_s: float = 4.0
+    # per-phase timings, counters, rows over time and bytes written (see metrics.py).
+    # written as a JSON run report and / or prometheus text at the end of the run, off when both are None
+    metrics_file: Optional[str] = None
+    metrics_prom_file: Optional[str] = None
 
 @dataclass(frozen=True)
 class Selectors:
@@ -50,3 +95,42 @@ class Selectors:
         'x1fj9vlw.x13faqbe.x1vvkbs.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.'
         'x1943h6x.x1i0vuye.xvs91rp.xo1l8bm.x1roi4f4.x10wh9bi.xpm28yp.x8viiok.x1o7cslx'
     )
+
+    # heading text of the "suggested" section appended below the real follower list.
+    # rows after this heading are not followers and must be skipped
+    suggested_heading_text: str = "Suggested for you"
+
+@dataclass(frozen=True)
+class UnfollowConfig:
+    # token bucket: actions refill at max_per_hour, at most burst can be spent back to back.
+    # instagram starts blocking actions well before ~60 an hour / ~200 a day on most accounts, stay far below
+    max_per_hour: float = 30
+    burst: int = 2
+    daily_cap: int = 100
+    # extra random wait (0..jitter_s) before every action so the spacing is not perfectly regular
+    jitter_s: float = 5.0
+    # one line per finished target, a restart skips everything already in it (and counts today's unfollows).
+    # {account} is the acting account, every account has its own ledger and daily cap
+    ledger_file: str = "unfollow_ledger_{account}.ndjson"
+    report_file: Optional[str] = "unfollow_report_{account}.json"
+    # stop the run after this many failed targets in a row, something is wrong with the session or the page
+    max_consecutive_failures: int = 3
+    action_timeout_ms: int = 10_000
+
+@dataclass(frozen=True)
+class UnfollowSelectors:
+    # the follow button in the profile header shows one of these texts
+    profile_header_css: str = "header"
+    following_text: str = "Following"
+    requested_text: str = "Requested"
+    follow_texts: tuple = ("Follow", "Follow Back")
+    # confirmation dialog opened by clicking "Following"
+    confirm_dialog_css: str = '[role="dialog"]'
+    confirm_unfollow_text: str = "Unfollow"
+    # instagram's rate limit dialog, the run has to stop when it shows up
+    action_blocked_text: str = "Try Again Later"
+    # profile page of an account that no longer exists
+    not_found_text: str = "Sorry, this page isn't available."
+    # only logged out pages have a login form or link. a logged out profile shows "Follow" as well, so
+    # "not following" means nothing without this check
+    logged_out_css: str = 'input[name="password"], a[href^="/accounts/login"]'
@@ -0,0 +1,30 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+# where instagram_cookie_fetcher.py saves the users cookie or login session
+COOKIES_DIR = Path.cwd() / "cookies"
+
+
+def find_user_cookies(username: str, cookies_dir: Path = COOKIES_DIR) -> Optional[Path]:
+    """Find the most recent cookie file for the given username."""
+    # the session manager keeps an index of the directory, no glob + stat of every file per lookup
+    from .session_manager import session_manager
+
+    latest = session_manager(cookies_dir).find(username, "cookies")
+    if latest is None:
+        print(f"No cookie files found for username: {username}")
+        return None
+    print(f"Found cookie file: {latest}")
+    return latest
+
+
+def load_cookies(cookie_file: Path) -> list[dict]:
+    return json.loads(cookie_file.read_text(encoding="utf-8"))
+
+
+def find_user_state(username: str, cookies_dir: Path = COOKIES_DIR) -> Optional[Path]:
+    """Find the most recent storage state (cookies + localStorage) saved for the given username."""
+    from .session_manager import session_manager
+
+    return session_manager(cookies_dir).find(username, "state")
@@ -1,22 +1,40 @@
+import asyncio
+from collections import deque
+from typing import Optional
+
+
 class DomActivityObserver:
     """
     Attaches a Mutation Observer to a given HTML element. 
     """
     def __init__(self, quiet_ms: int, logger=None) -> None:
+        """
+        Attaches a Mutation Observer to a given HTML element. 
+        This is used to detect inactivity within the Instagram Follower list.
+        If the scrolling event does not produce more followers (aka mutation) in the dom for a prolonged period, then likely the full follower list has been loaded.
+        In such cases, that indicates we do not need to scroll anymore. however, if we detect activity after scroll, lazy loading is not complete. 
+        Marks the DOM as 'quiet' after no mutations for `quiet_ms`.
+        Exposes is_stable() to check if the dom has been stable for X amount of seconds.
+        """
         self.quiet_ms = quiet_ms
         self.log = logger
-    """
-    Attaches a Mutation Observer to a given HTML element. 
-    This is used to detect inactivity within the Instagram Follower list.
-    If the scrolling event does not produce more followers (aka mutation) in the dom for a prolonged period, then likely the full follower list has been loaded.
-    In such cases, that indicates we do not need to scroll anymore. however, if we detect activity after scroll, lazy loading is not complete. 
-    Marks the DOM as 'quiet' after no mutations for `quiet_ms`.
-    Exposes is_stable() to check if the dom has been stable for X amount of seconds.
-    """
-    async def start(self, page, anchor_selector: str) -> None:
+
+        # event mode: the page calls back into python on every mutation batch instead of python polling the page
+        self.activity_count = 0
+        self.last_activity_at: Optional[float] = None
+        self._activity = asyncio.Event()
+        self._binding_name: Optional[str] = None
+    async def start(self, page, anchor_selector: str, activity_selector: Optional[str] = None) -> None:
+        """
+        activity_selector: when given, mutation batches under this element are pushed to python as they happen
+        (see wait_for_activity). used by the event driven scroll loop.
+        """
         if self.log:
             self.log.debug(f"Starting DOM observer on search element: {anchor_selector}")
 
+        if activity_selector:
+            await self._expose_binding(page)
+
         await page.evaluate(
             """({selector, quietMs}) => {
                 window.__domActivityQuietDone = false;
@@ -50,6 +68,79 @@ class DomActivityObserver:
             {"selector": anchor_selector, "quietMs": self.quiet_ms},
         )
 
+        if activity_selector:
+            await page.evaluate(
+                """({selector, binding}) => {
+                    const prev = window.__domActivityEvents;
+                    if (prev) prev.disconnect();
+
+                    const el = document.querySelector(selector);
+                    const target = el?.closest('[role="dialog"]') || el || document.body;
+                    let count = 0;
+                    // one callback per mutation batch, not per mutation
+                    const observer = new MutationObserver(() => {
+                        count += 1;
+                        if (window[binding]) window[binding](count);
+                    });
+                    observer.observe(target, { childList: true, subtree: true });
+                    window.__domActivityEvents = observer;
+                }""",
+                {"selector": activity_selector, "binding": self._binding_name},
+            )
+
     async def is_stable(self, page) -> bool:
         # check the global context to see if the dom activity is quiet
         return await page.evaluate("() => Boolean(window.__domActivityQuietDone)")
+
+    async def wait_for_activity(self, since: int, timeout_s: float) -> bool:
+        """
+        Waits until the page has reported a mutation batch newer than `since` (a previous activity_count).
+        Returns False if nothing arrived within timeout_s.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_s
+        while self.activity_count <= since:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            self._activity.clear()
+            try:
+                await asyncio.wait_for(self._activity.wait(), remaining)
+            except asyncio.TimeoutError:
+                return self.activity_count > since
+        return True
+
+    async def _expose_binding(self, page) -> None:
+        if self._binding_name:
+            return
+        # bindings can't be registered twice on a page, and the same page is reused for followers and following
+        self._binding_name = f"__domActivityEvent_{id(self)}"
+
+        def on_activity(source, count) -> None:
+            self.activity_count += 1
+            self.last_activity_at = asyncio.get_running_loop().time()
+            self._activity.set()
+
+        await page.expose_binding(self._binding_name, on_activity)
+
+
+class AdaptiveQuietWindow:
+    """
+    Learns how long the page takes to react to a scroll (scroll -> first mutation batch) during a run,
+    and derives how long a scroll may go unanswered before the list is considered fully loaded.
+    Until a latency has been observed the full quiet_ms is used.
+    """
+    def __init__(self, quiet_ms: int, floor_ms: int = 250, factor: float = 2.0, history: int = 20) -> None:
+        self.quiet_s = quiet_ms / 1000
+        self.floor_s = floor_ms / 1000
+        self.factor = factor
+        self.latencies = deque(maxlen=history)
+
+    def record(self, latency_s: float) -> None:
+        self.latencies.append(max(latency_s, 0.0))
+
+    @property
+    def window_s(self) -> float:
+        if not self.latencies:
+            return self.quiet_s
+        return min(self.quiet_s, max(self.floor_s, self.factor * max(self.latencies)))
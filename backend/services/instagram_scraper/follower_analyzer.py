@@ -1,18 +1,38 @@
-import json
 from pathlib import Path
+from typing import Union
+from .follower_store import FollowerStore
+from .record_io import write_records, with_format, check_format
+
+
+def _usernames(rows):
+    # a FollowerStore is already keyed by username, no need to build another set
+    if isinstance(rows, FollowerStore):
+        return rows.usernames()
+    return {item["username"] for item in rows}
+
+
+def _iter_rows(rows):
+    if isinstance(rows, FollowerStore):
+        return rows.iter_dicts()
+    return iter(rows)
+
 
 class FollowerAnalyzer:
     """
+    followers / following can be lists of follower dicts or a FollowerStore straight from the live scraper.
+    results are saved in output_format (json, ndjson, ndjson.gz or csv), the extension of the file name follows it.
     """
 
-    def __init__(self, followers: list[dict], following: list[dict], output_dir: str = "."):
+    def __init__(self, followers: Union[list[dict], FollowerStore], following: Union[list[dict], FollowerStore], output_dir: str = ".",
+                 output_format: str = "json"):
         self.followers = followers
         self.following = following
         self.output_dir = Path(output_dir)
+        self.output_format = check_format(output_format)
 
         # Precompute username sets for quick comparison
-        self.followers_usernames = {item["username"] for item in followers}
-        self.following_usernames = {item["username"] for item in following}
+        self.followers_usernames = _usernames(followers)
+        self.following_usernames = _usernames(following)
 
         # Containers for computed results
         self.they_dont_follow_back = []
@@ -26,7 +46,7 @@ class FollowerAnalyzer:
     def compute_they_dont_follow_back(self):
         """Find accounts you follow that don't follow you back."""
         self.they_dont_follow_back = [
-            user for user in self.following if user["username"] not in self.followers_usernames
+            user for user in _iter_rows(self.following) if user["username"] not in self.followers_usernames
         ]
         print(f"[info] They don't follow you back: {len(self.they_dont_follow_back)}")
         return self.they_dont_follow_back
@@ -34,7 +54,7 @@ class FollowerAnalyzer:
     def compute_you_dont_follow_back(self):
         """Find accounts that follow you, but you don't follow back."""
         self.you_dont_follow_back = [
-            user for user in self.followers if user["username"] not in self.following_usernames
+            user for user in _iter_rows(self.followers) if user["username"] not in self.following_usernames
         ]
         # print(f"[info] You don't follow them back: {len(self.you_dont_follow_back)}")
         return self.you_dont_follow_back
@@ -53,14 +73,13 @@ class FollowerAnalyzer:
     # --------------------------
 
     def _save_json(self, filename: str, data: list[dict]):
-        """Internal helper to safely write JSON output."""
-        file_path = self.output_dir / filename
+        """Internal helper to safely write the output, in output_format."""
+        file_path = with_format(self.output_dir / filename, self.output_format)
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
-            print(f"[ok] Wrote {len(data)} records to {filename}")
+            write_records(file_path, data, self.output_format)
+            print(f"[ok] Wrote {len(data)} records to {file_path.name}")
         except Exception as e:
-            print(f"[error] Failed to write {filename}: {e}")
+            print(f"[error] Failed to write {file_path.name}: {e}")
 
     def save_all(self):
         """Save all computed results to disk."""
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Optional, List, Dict
+from .metrics import NULL_METRICS
+from .record_io import write_records
+
+
+class FollowerJournal:
+    """
+    Append-only NDJSON journal for scrape output.
+    Records are buffered in memory and appended to `<write_file>.ndjson` by a background task, either every
+    flush_interval_s or as soon as flush_records are waiting, so the scroll loop never blocks on disk I/O.
+    close() flushes what is left and compacts the journal into the final file (in output_format) via an atomic
+    rename, so a crash mid-scrape leaves the journal behind but never a truncated write_file.
+    with compact=False close() only flushes and leaves the journal in place, for callers that write write_file
+    themselves (the refresh scraper merges the journaled head into the previous snapshot).
+    """
+    def __init__(self, write_file: str, flush_interval_s: float = 1.0, flush_records: int = 500, logger=None,
+                 metrics=None, output_format: str = "json", compact: bool = True) -> None:
+        self.write_file = Path(write_file)
+        self.output_format = output_format
+        self.compact_on_close = compact
+        self.journal_file = self.write_file.with_name(self.write_file.name + ".ndjson")
+        self.flush_interval_s = flush_interval_s
+        self.flush_records = flush_records
+        self.log = logger
+        self.metrics = metrics or NULL_METRICS
+
+        self.bytes_written = 0
+        self._buffer: List[Dict] = []
+        self._fh = None
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def start(self, resume: bool = False) -> None:
+        """opens the journal, truncating any journal left from a previous run unless resume is set"""
+        mode = "a" if resume else "w"
+        self._fh = await asyncio.to_thread(open, self.journal_file, mode, encoding="utf-8")
+        self._task = asyncio.create_task(self._flush_loop())
+
+    def append(self, records: List[Dict]) -> None:
+        if not records:
+            return
+        self._buffer.extend(records)
+        if len(self._buffer) >= self.flush_records:
+            self._wake.set()
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._buffer or self._fh is None:
+                return
+            records, self._buffer = self._buffer, []
+            data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+            try:
+                with self.metrics.phase("write"):
+                    await asyncio.to_thread(self._write, data)
+                size = len(data.encode("utf-8"))
+                self.bytes_written += size
+                self.metrics.add_bytes(size)
+            except Exception as e:
+                # keep the records so the next flush retries them
+                self._buffer = records + self._buffer
+                if self.log:
+                    self.log.error(f"Journal flush to {self.journal_file} failed: {e}")
+
+    def _write(self, data: str) -> None:
+        self._fh.write(data)
+        self._fh.flush()
+
+    async def stop(self) -> None:
+        """flushes what is buffered and closes the journal, leaving it in place for a resume"""
+        self._closing = True
+        self._wake.set()
+        if self._task:
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._fh is not None:
+            await asyncio.to_thread(self._fh.close)
+            self._fh = None
+
+    async def close(self) -> int:
+        """flushes the journal and compacts it into write_file. returns the number of records written (0 without compaction)"""
+        await self.stop()
+        if not self.compact_on_close:
+            return 0
+        with self.metrics.phase("write"):
+            return await asyncio.to_thread(self.compact)
+
+    def compact(self) -> int:
+        records = read_journal(self.journal_file)
+        tmp = self.write_file.with_name(self.write_file.name + ".tmp")
+        self.metrics.add_bytes(write_records(tmp, records, self.output_format, fsync=True))
+        os.replace(tmp, self.write_file)
+        self.journal_file.unlink(missing_ok=True)
+        if self.log:
+            self.log.info(f"Compacted {len(records)} records into {self.write_file}")
+        return len(records)
+
+
+def read_journal(path) -> List[Dict]:
+    """
+    Reads an NDJSON journal. later entries for the same username replace earlier ones but keep their position.
+    a torn last line (crash mid-write) is skipped.
+    """
+    records: Dict[str, Dict] = {}
+    unkeyed: List[Dict] = []
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            username = record.get("username")
+            if username is None:
+                unkeyed.append(record)
+            else:
+                records[username] = record
+    return list(records.values()) + unkeyed
@@ -0,0 +1,214 @@
+from typing import List, Dict, Iterable, Optional
+
+
+class FollowerRowCapture:
+    """
+    Attaches a Mutation Observer to the follower dialog which buffers every newly added follower row in the page.
+    Instead of re-serializing the whole follower list after each scroll, the scraper calls drain() and only
+    receives the rows added since the last drain. the cursor is passed back to the page so rows python has
+    already received are dropped from the in-page buffer, keeping both sides flat as the list grows.
+
+    With prune_keep_last set, rows python has confirmed are also hidden on the next drain: the row keeps its
+    rendered height (so the scroll position and instagram's load-more trigger don't move) but its content, avatar
+    included, is no longer rendered (content-visibility: hidden). the nodes themselves belong to react and are
+    left in place. only the newest prune_keep_last captured rows stay visible.
+    """
+    def __init__(self, selectors, logger=None, prune_keep_last: Optional[int] = None) -> None:
+        self.sel = selectors
+        self.log = logger
+        self.prune_keep_last = prune_keep_last
+        # absolute index of the next row we have not received yet
+        self.cursor = 0
+        self.pruned = 0
+
+    async def start(self, page, skip_usernames: Optional[Iterable[str]] = None) -> None:
+        """skip_usernames: rows for these users are never buffered, e.g. followers captured before a resume"""
+        if self.log:
+            self.log.debug(f"Starting row capture on follower items: {self.sel.follower_item_css}")
+
+        self.cursor = 0
+        self.pruned = 0
+        sel = self.sel
+        await page.evaluate(
+            """
+            ({ itemSel, linkSel, nameSel, verifySel, suggestedText, scrollSel, skipUsernames }) => {
+                const prev = window.__followerCapture;
+                if (prev && prev.observer) prev.observer.disconnect();
+
+                const state = {
+                    buffer: [],
+                    // absolute index of buffer[0]
+                    base: 0,
+                    // rows already pushed into the buffer (or known to be suggested accounts)
+                    seen: new WeakSet(),
+                    // rows that were added before their link was rendered, retried on drain
+                    pending: new Set(),
+                    // [cursor python must have acknowledged, row element] in capture order, for pruning
+                    captured: [],
+                    observer: null,
+                };
+                const skip = new Set(skipUsernames || []);
+
+                // observe the dialog holding the list rather than the whole document where possible
+                const scroller = document.querySelector(scrollSel);
+                const root = scroller?.closest('[role="dialog"]') || document.body;
+
+                // only the dialog's own heading ends the list, an h4 elsewhere on the page says nothing about it.
+                // once found it stays put, so it is only searched for again if it is gone
+                let heading = null;
+                const suggestedHeading = () => {
+                    if (heading && heading.isConnected) return heading;
+                    heading = null;
+                    for (const h of root.querySelectorAll('h4')) {
+                        if (h.textContent.includes(suggestedText)) return (heading = h);
+                    }
+                    return null;
+                };
+
+                const extract = (el) => {
+                    const a = el.querySelector(linkSel);
+                    const nameEl = el.querySelector(nameSel);
+                    const isVerified = !!el.querySelector(verifySel);
+                    const img =
+                        a?.querySelector?.('img') ??
+                        // if the instagram user is verified their profile pic is in a span tag
+                        el.querySelector('span[role="link"] img') ??
+                        null;
+
+                    let username = null;
+                    if (a) {
+                        const href = a.getAttribute('href') || "";
+                        // trim the forward slash at the begging and end
+                        username = href.replace(/^\\/+|\\/+$/g, '');
+                    }
+
+                    return {
+                        username,
+                        name: nameEl ? nameEl.textContent.trim() : null,
+                        profilePic: img ? img.src : null,
+                        verified: isVerified
+                    };
+                };
+
+                const capture = (el, stopEl) => {
+                    if (state.seen.has(el)) return;
+                    // rows below the "Suggested for you" heading are not followers
+                    if (stopEl && (stopEl.compareDocumentPosition(el) & Node.DOCUMENT_POSITION_FOLLOWING)) {
+                        state.seen.add(el);
+                        state.pending.delete(el);
+                        return;
+                    }
+                    const row = extract(el);
+                    if (!row.username) {
+                        state.pending.add(el);
+                        return;
+                    }
+                    state.pending.delete(el);
+                    state.seen.add(el);
+                    const next = state.base + state.buffer.length;
+                    if (skip.has(row.username)) {
+                        // python already has this row, it can go as soon as it is pruned
+                        state.captured.push([next, el]);
+                    } else {
+                        state.buffer.push(row);
+                        state.captured.push([next + 1, el]);
+                    }
+                };
+
+                const scan = (nodes) => {
+                    const stopEl = suggestedHeading();
+                    for (const node of nodes) {
+                        if (node.nodeType !== Node.ELEMENT_NODE) continue;
+                        if (node.matches(itemSel)) capture(node, stopEl);
+                        for (const el of node.querySelectorAll(itemSel)) capture(el, stopEl);
+                    }
+                };
+
+                state.retryPending = () => {
+                    if (!state.pending.size) return;
+                    const stopEl = suggestedHeading();
+                    for (const el of Array.from(state.pending)) {
+                        if (!el.isConnected) { state.pending.delete(el); continue; }
+                        capture(el, stopEl);
+                    }
+                };
+
+                state.observer = new MutationObserver((mutations) => {
+                    const added = [];
+                    for (const m of mutations) {
+                        for (const n of m.addedNodes) added.push(n);
+                    }
+                    if (added.length) scan(added);
+                });
+                state.observer.observe(root, { childList: true, subtree: true });
+
+                // rows that were already rendered before we attached
+                scan([root]);
+
+                window.__followerCapture = state;
+            }
+            """,
+            {
+                "itemSel": sel.follower_item_css,
+                "linkSel": sel.follower_link_css,
+                "nameSel": sel.follower_name_css,
+                "verifySel": sel.verified_bage_css,
+                "suggestedText": sel.suggested_heading_text,
+                "scrollSel": sel.scroll_container_css,
+                "skipUsernames": list(skip_usernames) if skip_usernames else None,
+            },
+        )
+
+    async def drain(self, page) -> List[Dict]:
+        """Returns the follower rows captured since the previous drain."""
+        result = await page.evaluate(
+            """
+            ({ cursor, keepLast }) => {
+                const s = window.__followerCapture;
+                if (!s) return { rows: [], cursor, pruned: 0 };
+                // everything before the cursor has been received by python, drop it
+                const ack = cursor - s.base;
+                if (ack > 0) {
+                    s.buffer.splice(0, ack);
+                    s.base = cursor;
+                }
+
+                let pruned = 0;
+                if (keepLast !== null) {
+                    let n = 0;
+                    const limit = s.captured.length - keepLast;
+                    while (n < limit && s.captured[n][0] <= s.base) n++;
+                    const rows = s.captured.splice(0, n).map(([, el]) => el).filter((el) => el.isConnected);
+                    // read every height before the first write so layout is computed once, not once per row
+                    const heights = rows.map((el) => el.offsetHeight);
+                    // style only: react keeps its nodes, and no childList mutation reaches the activity observer
+                    rows.forEach((el, i) => {
+                        el.style.height = heights[i] + 'px';
+                        el.style.contentVisibility = 'hidden';
+                    });
+                    pruned = rows.length;
+                }
+
+                s.retryPending();
+                return { rows: s.buffer.slice(), cursor: s.base + s.buffer.length, pruned };
+            }
+            """,
+            {"cursor": self.cursor, "keepLast": self.prune_keep_last},
+        )
+        self.cursor = result["cursor"]
+        self.pruned += result["pruned"]
+        rows = result["rows"]
+        if self.log and rows:
+            self.log.debug(f"Drained {len(rows)} captured rows (cursor={self.cursor}, pruned={self.pruned})")
+        return rows
+
+    async def stop(self, page) -> None:
+        await page.evaluate(
+            """
+            () => {
+                const s = window.__followerCapture;
+                if (s && s.observer) s.observer.disconnect();
+                window.__followerCapture = null;
+            }
+            """
+        )
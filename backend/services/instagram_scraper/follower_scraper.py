@@ -1,9 +1,12 @@
-import json
+import asyncio
 from typing import Optional, List, Dict
 from .config import ScrapeConfig, Selectors
-from .dom_activity_observer import DomActivityObserver
-from .mouse_event_scroller import WheelEventScroller
+from .dom_activity_observer import DomActivityObserver, AdaptiveQuietWindow
 from .loading_detector import LoadingDetector
+from .metrics import make_metrics, export_metrics
+from .record_io import write_records
+from .scroll_step import ScrollStepper, StepStatus
+from .scroll_pacer import AdaptiveScrollPacer
 
 class InstagramFollowerScraper:
     """
@@ -17,10 +20,32 @@ class InstagramFollowerScraper:
 
         self.log = logger 
 
-        self.scroller = WheelEventScroller(logger=self.log)
+        # scroll + loading poll + stability check in one round trip
+        self.stepper = ScrollStepper(
+            self.selectors, self.config.step_settle_ms, smooth=not self.config.lean_profile, logger=self.log
+        )
         self.loading = LoadingDetector(self.selectors, self.config.cooldown_s, logger=self.log)
         self.dom_observer = DomActivityObserver(self.config.quiet_ms, logger=self.log)
+        self.quiet_window = AdaptiveQuietWindow(
+            self.config.quiet_ms,
+            floor_ms=self.config.adaptive_quiet_floor_ms,
+            factor=self.config.adaptive_quiet_factor,
+        )
+        self.pacer = None
+        if self.config.adaptive_pacing:
+            self.pacer = AdaptiveScrollPacer(
+                self.config.scroll_delta,
+                self.config.cooldown_s,
+                min_delta=self.config.pacing_min_delta,
+                max_delta=self.config.pacing_max_delta,
+                min_cooldown_s=self.config.pacing_min_cooldown_s,
+                max_cooldown_s=self.config.pacing_max_cooldown_s,
+                max_requests_per_s=self.config.max_requests_per_s,
+                logger=self.log,
+            )
         self.follower_list = []
+        # no-op unless metrics_file / metrics_prom_file is set
+        self.metrics = make_metrics(self.config, name=self.config.write_file or "scrape")
 
     
 
@@ -28,47 +53,171 @@ class InstagramFollowerScraper:
         self.log.info("Starting follower scrape")
         # Attach observer to the search-area anchor. this is used to determine when lazy loading is complete
         await self._focus_anchor_if_present()
-        await self.dom_observer.start(self.page, self.selectors.search_area_anchor_css)
+        await self._start_dom_observer()
 
-        for i in range(self.config.max_scrolls):
-            # attempt a scroll
-            await self.scroller.scroll(self.page, self.selectors, self.config.scroll_delta)
-
-            # throttle scrolling while loading graphic is visible (NOT a stop condition)
-            loading = await self.loading.poll_once(self.page)
-            # if we detect loading spinlock until loading is complete then scroll again
-            if loading is True:
-                for _ in range(50):  # ~5s if cooldown_s=0.1
-                    if await self.dom_observer.is_stable(self.page):
-                        break
-                    # if it was loading and it no longer loaded, we can scroll again
-                    if await self.loading.poll_once(self.page) is not True:
-                        break
-                    await self.loading.wait_small()
-            
-            if await self.dom_observer.is_stable(self.page):
-                self.log.info(f"DOM stabilized after {i+1} scrolls")
-                break
-
-            await self.loading.wait_small()
+        await self._scroll_until_stable()
         
         # fetches all the followers via JS manipulation
-        data = await self._parse_followers()
+        with self.metrics.phase("parse"):
+            data = await self._parse_followers()
         self.log.info(f"Parsed {len(data)} followers")
+        self.metrics.set_rows(len(data))
 
 
         if self.config.write_file:
             try:
-                with open(self.config.write_file, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=4, ensure_ascii=False)
-                    self.log.info(f"Wrote {len(data)} records to {self.config.write_file}")
+                with self.metrics.phase("write"):
+                    self.metrics.add_bytes(write_records(self.config.write_file, data, self.config.output_format))
+                self.log.info(f"Wrote {len(data)} records to {self.config.write_file}")
             except Exception as e:
                 self.log.error(f"Write failed: {e}")
                 print(f" write failed: {e}")
         
         self.follower_list = data
+        export_metrics(self.metrics, self.config, self.log)
         return data
 
+    async def _start_dom_observer(self) -> None:
+        # in event mode the follower list itself pushes mutation batches back to python
+        activity_selector = self.selectors.scroll_container_css if self.config.event_driven else None
+        await self.dom_observer.start(self.page, self.selectors.search_area_anchor_css, activity_selector)
+
+    async def _scroll_until_stable(self) -> int:
+        """Scrolls the follower list until the DOM has been quiet for quiet_ms. Returns the number of scrolls made."""
+        if self.config.event_driven:
+            return await self._scroll_until_quiet_events()
+
+        loop = asyncio.get_running_loop()
+        metrics = self.metrics
+        pacer = self.pacer
+        row_count = 0
+        for i in range(self.config.max_scrolls):
+            # attempt a scroll, the same call reports the loading graphic and dom stability
+            scrolled_at = loop.time()
+            with metrics.phase("scroll"):
+                status = await self.stepper.step(self.page, self._scroll_delta())
+            metrics.incr("scrolls")
+
+            # throttle scrolling while loading graphic is visible (NOT a stop condition)
+            # if we detect loading spinlock until loading is complete then scroll again
+            loading_seen = status.loading is True
+            if loading_seen:
+                metrics.incr("loading_seen")
+                with metrics.phase("loading_wait"):
+                    for _ in range(50):  # ~5s if cooldown_s=0.1
+                        # if it was loading and it no longer loaded, we can scroll again
+                        if status.stable or status.loading is not True:
+                            break
+                        await self.loading.wait_small()
+                        status = await self.stepper.probe(self.page)
+
+            if pacer:
+                load_latency = loop.time() - scrolled_at if loading_seen else None
+                pacer.record(status.row_count - row_count, loading_seen, load_latency)
+            row_count = status.row_count
+
+            await self._after_scroll(i, status)
+            metrics.set_rows(self._rows_captured(status))
+
+            if status.stable:
+                self.log.info(f"DOM stabilized after {i+1} scrolls")
+                return i + 1
+            if self._should_stop():
+                self.log.info(f"Stopped by {type(self).__name__} after {i+1} scrolls")
+                return i + 1
+
+            # the observer's quiet timer runs while we wait between scrolls
+            with metrics.phase("quiet_wait"):
+                if pacer:
+                    await pacer.wait_before_scroll()
+                else:
+                    await self.loading.wait_small()
+        return self.config.max_scrolls
+
+    async def _scroll_until_quiet_events(self) -> int:
+        """
+        Event driven version of _scroll_until_stable. after each scroll we await the next mutation batch from
+        the page instead of sleeping cooldown_s, and scroll again as soon as the batch has finished loading.
+        the list is complete once the DOM is stable, or quiet_confirmations scrolls in a row went unanswered for the
+        adaptive quiet window and the loading graphic is gone.
+        """
+        loop = asyncio.get_running_loop()
+        observer = self.dom_observer
+        metrics = self.metrics
+        unanswered = 0
+        row_count = 0
+
+        for i in range(self.config.max_scrolls):
+            if self.pacer:
+                # mutation events replace the cooldown here, the pacer only caps the request rate
+                await self.pacer.wait_before_scroll(cooldown=False)
+            since = observer.activity_count
+            scrolled_at = loop.time()
+            with metrics.phase("scroll"):
+                status = await self.stepper.step(self.page, self._scroll_delta())
+            metrics.incr("scrolls")
+
+            # rows that showed up while the step was settling already count as an answer
+            answered = status.row_count > row_count
+            if not answered:
+                with metrics.phase("quiet_wait"):
+                    answered = await observer.wait_for_activity(since, self.quiet_window.window_s)
+                if answered:
+                    self.quiet_window.record(observer.last_activity_at - scrolled_at)
+                    status = await self.stepper.probe(self.page)
+
+            loading_seen = status.loading is True
+            if answered:
+                unanswered = 0
+                # the batch is still arriving, wake up on each mutation batch until the loading graphic is gone
+                if loading_seen:
+                    metrics.incr("loading_seen")
+                    with metrics.phase("loading_wait"):
+                        for _ in range(50):
+                            if status.loading is not True or status.stable:
+                                break
+                            if not await observer.wait_for_activity(observer.activity_count, self.quiet_window.window_s):
+                                break
+                            status = await self.stepper.probe(self.page)
+            else:
+                unanswered += 1
+                metrics.incr("unanswered_scrolls")
+
+            if self.pacer:
+                load_latency = loop.time() - scrolled_at if loading_seen else None
+                self.pacer.record(status.row_count - row_count, loading_seen, load_latency)
+            row_count = status.row_count
+            await self._after_scroll(i, status)
+            metrics.set_rows(self._rows_captured(status))
+
+            # quiet scrolls alone are not the end of the list while the loading graphic is still up, a slow page
+            # can take longer than the quiet window to answer
+            quiet = unanswered >= self.config.quiet_confirmations and status.loading is not True
+            if status.stable or quiet:
+                self.log.info(
+                    f"DOM quiet after {i+1} scrolls (quiet window {self.quiet_window.window_s * 1000:.0f} ms)"
+                )
+                return i + 1
+            if self._should_stop():
+                self.log.info(f"Stopped by {type(self).__name__} after {i+1} scrolls")
+                return i + 1
+        return self.config.max_scrolls
+
+    async def _after_scroll(self, i: int, status: StepStatus) -> None:
+        """Hook for subclasses which need to do work after every scroll."""
+        pass
+
+    def _should_stop(self) -> bool:
+        """Hook for subclasses which can end the scroll before the list is fully loaded."""
+        return False
+
+    def _scroll_delta(self) -> int:
+        return self.pacer.delta if self.pacer else self.config.scroll_delta
+
+    def _rows_captured(self, status: StepStatus) -> int:
+        # nothing is captured until the final parse, report the rows rendered so far
+        return status.row_count
+
     async def _focus_anchor_if_present(self):
         el = await self.page.query_selector(self.selectors.search_area_anchor_css)
         if el:
@@ -87,22 +236,26 @@ class InstagramFollowerScraper:
         # this will go through each row of followers and grab username, pic, name, and whether they are verified
         return await self.page.evaluate(
     """
-    ({ itemSel, linkSel, nameSel, verifySel }) => {
-        // Grab all elements in DOM order
-        const allEls = Array.from(document.querySelectorAll('*'));
+    ({ itemSel, linkSel, nameSel, verifySel, suggestedText, scrollSel }) => {
+        // only look inside the follower dialog, the rest of the page is never a follower row
+        const scroller = document.querySelector(scrollSel);
+        const root = scroller?.closest('[role="dialog"]') || document;
 
-        // Find the index of the first <h4> that contains "Suggested for you"
-        const stopIndex = allEls.findIndex(
-            el => el.tagName.toLowerCase() === 'h4' && el.textContent.includes('Suggested for you')
-        );
-
-        // If not found, take everything
-        const limit = stopIndex !== -1 ? stopIndex : allEls.length;
+        // Find the first <h4> that contains "Suggested for you"
+        let stopEl = null;
+        for (const h of root.querySelectorAll('h4')) {
+            if (h.textContent.includes(suggestedText)) {
+                stopEl = h;
+                break;
+            }
+        }
 
-        // Take only itemSel elements before that point as we do not want suggested followers
-        const beforeSuggested = allEls.slice(0, limit).filter(el => el.matches(itemSel));
+        const rows = [];
+        // querySelectorAll returns rows in DOM order, so the first row past the heading ends the list.
+        // we do not want suggested followers
+        for (const el of root.querySelectorAll(itemSel)) {
+            if (stopEl && (stopEl.compareDocumentPosition(el) & Node.DOCUMENT_POSITION_FOLLOWING)) break;
 
-        return beforeSuggested.map(el => {
             const a = el.querySelector(linkSel);
             const nameEl = el.querySelector(nameSel);
             const isVerified = !!el.querySelector(verifySel);
@@ -119,13 +272,14 @@ class InstagramFollowerScraper:
                 username = href.replace(/^\\/+|\\/+$/g, '');
             }
 
-            return {
+            rows.push({
                 username,
                 name: nameEl ? nameEl.textContent.trim() : null,
                 profilePic: img ? img.src : null,
                 verified: isVerified
-            };
-        });
+            });
+        }
+        return rows;
     }
     """,
     {
@@ -133,7 +287,7 @@ class InstagramFollowerScraper:
         "linkSel": sel.follower_link_css,
         "nameSel": sel.follower_name_css,
         "verifySel": sel.verified_bage_css,
+        "suggestedText": sel.suggested_heading_text,
+        "scrollSel": sel.scroll_container_css,
     },
 )
-
-
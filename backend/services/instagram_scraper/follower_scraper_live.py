@@ -1,107 +1,199 @@
-import json
+import asyncio
 from .follower_scraper import InstagramFollowerScraper
 from typing import Optional, List, Dict
 from .config import ScrapeConfig, Selectors
-from .dom_activity_observer import DomActivityObserver
-from .mouse_event_scroller import WheelEventScroller
-from .loading_detector import LoadingDetector
+from .scroll_step import StepStatus
+from .follower_row_capture import FollowerRowCapture
+from .follower_journal import FollowerJournal, read_journal
+from .follower_store import FollowerStore
+from .scrape_checkpoint import ScrapeCheckpoint
+from .metrics import export_metrics
 
 # inherits from the basic instagram scraper and overrides the scrape method to extract and update follower list in real time
 class LiveInstagramFollowerScraper(InstagramFollowerScraper):
 
     def __init__(self, page, config: Optional[ScrapeConfig] = None, selectors: Optional[Selectors] = None, logger=None):
-        self.follower_list = []
-        # keep track of the followers retrieved from the dom in a set, that way we can detect duplicates in constant time
-        self.follower_set = set()
+        # followers retrieved from the dom keyed by username, that way we can detect duplicates in constant time
+        self.store = FollowerStore()
         super().__init__(page, config, selectors , logger)
-    
+        prune_keep_last = None
+        if self.config.incremental_capture and self.config.prune_captured_rows:
+            prune_keep_last = self.config.prune_keep_last
+        self.row_capture = FollowerRowCapture(self.selectors, logger=self.log, prune_keep_last=prune_keep_last)
+        self.journal = None
+        if self.config.write_file:
+            self.journal = FollowerJournal(
+                self.config.write_file,
+                flush_interval_s=self.config.journal_flush_interval_s,
+                flush_records=self.config.journal_flush_records,
+                logger=self.log,
+                metrics=self.metrics,
+                output_format=self.config.output_format,
+            )
+        # checkpoints point into the journal, so they need a write_file too
+        self.checkpoint = None
+        if self.journal and self.config.checkpoint_file:
+            self.checkpoint = ScrapeCheckpoint(self.config.checkpoint_file, logger=self.log)
+        self._resumed_scrolls = 0
+
+    @property
+    def follower_list(self) -> List[Dict]:
+        return self.store.to_dicts()
+
+    @follower_list.setter
+    def follower_list(self, rows: List[Dict]) -> None:
+        self.store = FollowerStore(rows)
+
+    def _rows_captured(self, status: StepStatus) -> int:
+        return len(self.store)
 
     def reset_follower_scrape(self):
-        self.follower_list = []
-        self.follower_set = set()
+        self.store = FollowerStore()
 
-    
     def add_unique_follower(self, f):
-        key = json.dumps(f, sort_keys=True)
-        if key not in self.follower_set:
-            self.follower_set.add(key)
-            self.follower_list.append(f)
-            return True
-        return False
+        # a profile seen again with a new name or picture is updated in place, and re-journaled so the final file has it
+        return self.store.add(f) is not None
 
     def write_followers_to_disk(self, new_followers=None):
+        # only the new records are appended to the journal, the background writer flushes them to disk
         if not self.config.write_file:
             self.log.warning("No write_file path configured; skipping write.")
             return
-        try:
-            with open(self.config.write_file, "w", encoding="utf-8") as f:
-                json.dump(self.follower_list, f, indent=4, ensure_ascii=False)
-            if new_followers and len(new_followers) > 0:
-                self.log.info(f"Added {len(new_followers)} new followers to the follower list.")
-        except Exception as e:
-            self.log.error(f"Failed to write followers to disk: {e}")
-            print(f"Write failed: {e}")
-
-    async def run(self) -> List[Dict]:
-        self.log.info("Starting follower scrape")
-        # Attach observer to the search-area anchor. this is used to determine when lazy loading is complete
-        await self._focus_anchor_if_present()
-        await self.dom_observer.start(self.page, self.selectors.search_area_anchor_css)
-
-        for i in range(self.config.max_scrolls):
-            # attempt a scroll
-            await self.scroller.scroll(self.page, self.selectors, self.config.scroll_delta)
-
-            # throttle scrolling while loading graphic is visible (NOT a stop condition)
-            loading = await self.loading.poll_once(self.page)
-            # if we detect loading spinlock until loading is complete then scroll again
-            if loading is True:
-                for _ in range(50):  # ~5s if cooldown_s=0.1
-                    if await self.dom_observer.is_stable(self.page):
-                        break
-                    # if it was loading and loading animation does not exist, we can scroll again
-                    if await self.loading.poll_once(self.page) is not True:
-                        break
-                    await self.loading.wait_small()
-            
-            current_followers_list = await self._parse_followers()
-
-            new_followers = []
-            # after we scroll down, the dom will have followers which were added previously, 
-            # so add only unique followers that aren't already captured in memory
-            for follower in current_followers_list:
-                is_follower_new = self.add_unique_follower(follower)
-                if is_follower_new:
-                    new_followers.append(follower)
-            
-
-            self.write_followers_to_disk(new_followers)
-            
-            if await self.dom_observer.is_stable(self.page):
-                self.log.info(f"DOM stabilized after {i+1} scrolls")
-                break
-
-            await self.loading.wait_small()
-        
+        if not new_followers:
+            return
+        self.journal.append(new_followers)
+        self.log.info(f"Added {len(new_followers)} new followers to the follower list.")
 
-        # after dom stablization parse the follower list once again
-        current_followers_list = await self._parse_followers()
+    async def _fetch_rows(self) -> List[Dict]:
+        # in incremental mode only the rows added since the last call come back over CDP
+        with self.metrics.phase("parse"):
+            if self.config.incremental_capture:
+                return await self.row_capture.drain(self.page)
+            return await self._parse_followers()
 
+    def _merge_rows(self, rows: List[Dict]) -> List[Dict]:
         new_followers = []
-
-        for follower in current_followers_list:
-            is_it_unique = self.add_unique_follower(follower)
-            if is_it_unique:
+        for follower in rows:
+            if self.add_unique_follower(follower):
                 new_followers.append(follower)
-        
+        return new_followers
 
-        self.write_followers_to_disk(new_followers)
+    async def _after_scroll(self, i: int, status: StepStatus) -> None:
+        current_followers_list = await self._fetch_rows()
 
+        # after we scroll down, the dom will have followers which were added previously, 
+        # so add only unique followers that aren't already captured in memory
+        new_followers = self._merge_rows(current_followers_list)
 
-        return self.follower_list
-
-        
+        self.write_followers_to_disk(new_followers)
+        self.metrics.incr("rows_new", len(new_followers))
 
+        if self.checkpoint and (i + 1) % self.config.checkpoint_every == 0:
+            await self._save_checkpoint(self._resumed_scrolls + i + 1, status.row_count)
 
-        self.log.info(f"Scraped a total of {len(self.follower_list)} followers")
+    async def _save_checkpoint(self, scrolls: int, row_count: int) -> None:
+        # the journal holds the records, flush it first so the checkpoint never points past what is on disk
+        await self.journal.flush()
+        try:
+            await asyncio.to_thread(
+                self.checkpoint.save, self.journal.journal_file, scrolls, row_count, len(self.store)
+            )
+            self.log.debug(f"Checkpoint saved after {scrolls} scrolls ({len(self.store)} followers)")
+            self.metrics.incr("checkpoints")
+        except Exception as e:
+            self.log.warning(f"Checkpoint save failed (non-fatal): {e}")
+
+    def _load_checkpoint(self) -> Optional[Dict]:
+        if not (self.checkpoint and self.config.resume):
+            return None
+        state = self.checkpoint.load(self.journal.journal_file)
+        if state is None:
+            return None
+        for record in read_journal(self.journal.journal_file):
+            self.store.add(record)
+        self.log.info(
+            f"Resuming from checkpoint: {len(self.store)} followers, {state['row_count']} rows after {state['scrolls']} scrolls"
+        )
+        return state
+
+    async def _fast_scroll_to(self, target_rows: int) -> None:
+        # rows above the checkpoint were captured by the previous attempt, scroll past them without parsing
+        status = await self.stepper.probe(self.page)
+        scrolls = 0
+        while status.row_count < target_rows and scrolls < self.config.max_scrolls:
+            if self.pacer:
+                # skipping rows still requests pages from instagram, max_requests_per_s holds here too
+                await self.pacer.wait_before_scroll(cooldown=False)
+            row_count = status.row_count
+            status = await self.stepper.step(self.page, self.config.resume_scroll_delta)
+            scrolls += 1
+            if status.stable:
+                break
+            # the scroll brought no rows (yet) or a page is still loading: give the list the cooldown before
+            # scrolling on, whether or not the loading graphic showed up in time for the step to see it
+            if status.loading is True or status.row_count <= row_count:
+                if self.pacer:
+                    await self.pacer.wait_before_scroll()
+                else:
+                    await self.loading.wait_small()
+        self.log.info(f"Fast-scrolled past {status.row_count} of {target_rows} checkpointed rows in {scrolls} scrolls")
 
+    async def run(self) -> List[Dict]:
+        self.log.info("Starting follower scrape")
+        resume_state = self._load_checkpoint()
+        self._resumed_scrolls = resume_state["scrolls"] if resume_state else 0
+        if self.checkpoint and resume_state is None:
+            # the journal starts over below, an old checkpoint would point a later resume into the new journal
+            self.checkpoint.clear()
+        if self.journal:
+            await self.journal.start(resume=resume_state is not None)
+        capturing = False
+        finished = False
+        try:
+            # Attach observer to the search-area anchor. this is used to determine when lazy loading is complete
+            await self._focus_anchor_if_present()
+            await self._start_dom_observer()
+
+            if resume_state:
+                await self._fast_scroll_to(resume_state["row_count"])
+            if self.config.incremental_capture:
+                # rows the previous attempt already captured are skipped in the page and never sent back
+                skip = list(self.store.usernames()) if resume_state else None
+                capturing = True
+                await self.row_capture.start(self.page, skip_usernames=skip)
+
+            # followers are extracted and written after every scroll in _after_scroll
+            await self._scroll_until_stable()
+
+            # after dom stablization parse the follower list once again
+            current_followers_list = await self._fetch_rows()
+            new_followers = self._merge_rows(current_followers_list)
+            self.write_followers_to_disk(new_followers)
+            finished = True
+        finally:
+            # also on errors and cancellation: the page observer is detached and every journaled row reaches disk
+            if capturing:
+                try:
+                    await self.row_capture.stop(self.page)
+                    self.metrics.incr("rows_pruned", self.row_capture.pruned)
+                except Exception as e:
+                    # the page may be gone already
+                    self.log.debug(f"Row capture stop failed (non-fatal): {e}")
+            if self.journal and not finished:
+                # the journal and checkpoint stay behind, the next run resumes from them
+                await self.journal.stop()
+
+        if self.journal:
+            try:
+                await self.journal.close()
+                # the run finished, nothing left to resume
+                if self.checkpoint:
+                    self.checkpoint.clear()
+            except Exception as e:
+                self.log.error(f"Failed to write followers to disk: {e}")
+                print(f"Write failed: {e}")
+
+        self.log.info(f"Scraped a total of {len(self.store)} followers")
+        self.metrics.set_rows(len(self.store))
+        export_metrics(self.metrics, self.config, self.log)
+        return self.follower_list
@@ -0,0 +1,217 @@
+import asyncio
+import re
+from typing import Optional, List, Dict, Tuple
+from .follower_scraper import InstagramFollowerScraper
+from .config import ScrapeConfig, Selectors
+from .follower_store import FollowerStore
+from .metrics import export_metrics
+from .record_io import write_records
+
+# the follower modal pages through these endpoints as it scrolls:
+#   /api/v1/friendships/<user id>/followers/?count=12&max_id=...
+#   /api/v1/friendships/<user id>/following/?count=12&max_id=...
+#   /graphql/query (edge_followed_by / edge_follow)
+FOLLOW_LIST_URL_PATTERN = r"/api/v1/friendships/\d+/(followers|following)/|/graphql/query"
+
+
+def _to_record(user: Dict) -> Tuple[Optional[str], Dict]:
+    """maps an instagram user object onto the same record shape the DOM parser produces"""
+    user_id = user.get("pk") or user.get("pk_id") or user.get("id")
+    return (
+        str(user_id) if user_id is not None else None,
+        {
+            "username": user.get("username"),
+            "name": user.get("full_name"),
+            "profilePic": user.get("profile_pic_url"),
+            "verified": bool(user.get("is_verified")),
+        },
+    )
+
+
+def decode_follower_page(payload: Dict) -> Optional[Tuple[List[Tuple[Optional[str], Dict]], bool]]:
+    """
+    Decodes one paginated follower/following response.
+    Returns ([(user id, record), ...], has_more). has_more is False once instagram reports the last page.
+    Payloads that are not follower pages (other graphql queries share the endpoint) decode to None.
+    """
+    if not isinstance(payload, dict):
+        return None
+
+    # REST: {"users": [...], "next_max_id": "...", "big_list": bool}
+    if isinstance(payload.get("users"), list):
+        users = [_to_record(u) for u in payload["users"] if isinstance(u, dict)]
+        has_more = bool(payload.get("next_max_id")) or bool(payload.get("has_more"))
+        return users, has_more
+
+    # graphql: {"data": {"user": {"edge_followed_by": {"page_info": {...}, "edges": [{"node": {...}}]}}}}
+    user = (payload.get("data") or {}).get("user") or {}
+    for edge_name in ("edge_followed_by", "edge_follow"):
+        edge = user.get(edge_name)
+        if isinstance(edge, dict):
+            users = [_to_record(e["node"]) for e in edge.get("edges", []) if isinstance(e, dict) and "node" in e]
+            has_more = bool((edge.get("page_info") or {}).get("has_next_page"))
+            return users, has_more
+
+    return None
+
+
+class NetworkInstagramFollowerScraper(InstagramFollowerScraper):
+    """
+    Reads the follower list from the paginated JSON responses the modal fetches while it scrolls,
+    instead of parsing rows out of the DOM. scrolling is only the trigger for the next page,
+    and the scrape ends as soon as instagram returns the last page.
+
+    Call attach() before opening the follower modal so the first page is captured as well,
+    otherwise run() seeds the list from the rows already rendered.
+    """
+    def __init__(self, page, config: Optional[ScrapeConfig] = None, selectors: Optional[Selectors] = None,
+                 logger=None, url_pattern: str = FOLLOW_LIST_URL_PATTERN):
+        # followers keyed by username, counting them in the scroll loop is free
+        self.store = FollowerStore()
+        super().__init__(page, config, selectors, logger)
+        self.url_pattern = re.compile(url_pattern)
+
+        # dedup by instagram user id as well, the store's usernames cover rows seeded from the DOM which have no id
+        self._ids = set()
+        self.pages_seen = 0
+        self.exhausted = False
+
+        self._batch = asyncio.Event()
+        self._pending = set()
+        self._attached = False
+
+    @property
+    def follower_list(self) -> List[Dict]:
+        return self.store.to_dicts()
+
+    @follower_list.setter
+    def follower_list(self, rows: List[Dict]) -> None:
+        self.store = FollowerStore(rows)
+
+    def attach(self) -> None:
+        if self._attached:
+            return
+        self.page.on("response", self._on_response)
+        self._attached = True
+
+    def detach(self) -> None:
+        if not self._attached:
+            return
+        self.page.remove_listener("response", self._on_response)
+        self._attached = False
+
+    def _on_response(self, response) -> None:
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return
+        if not self.url_pattern.search(response.url):
+            return
+        # the response body is read asynchronously, keep a reference so the task can be awaited on shutdown
+        task = asyncio.ensure_future(self._consume(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _consume(self, response) -> None:
+        try:
+            if not response.ok:
+                self.log.debug(f"Skipping follower page {response.url}: HTTP {response.status}")
+                return
+            payload = await response.json()
+        except Exception as e:
+            self.log.debug(f"Could not decode follower page {response.url}: {e}")
+            return
+
+        with self.metrics.phase("parse"):
+            decoded = decode_follower_page(payload)
+            if decoded is None:
+                return
+            users, has_more = decoded
+            new = self.add_users(users)
+        self.pages_seen += 1
+        if not has_more:
+            self.exhausted = True
+        self.log.debug(f"Follower page {self.pages_seen}: {new} new, has_more={has_more}")
+        self._batch.set()
+
+    def add_users(self, users: List[Tuple[Optional[str], Dict]]) -> int:
+        added = 0
+        for user_id, record in users:
+            username = record.get("username")
+            if not username or username in self.store or (user_id and user_id in self._ids):
+                continue
+            if user_id:
+                self._ids.add(user_id)
+            self.store.add(record)
+            added += 1
+        return added
+
+    async def _wait_for_batch(self, since: int, timeout_s: float) -> bool:
+        """waits until more than `since` follower pages have been decoded"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_s
+        while self.pages_seen <= since:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            self._batch.clear()
+            try:
+                await asyncio.wait_for(self._batch.wait(), remaining)
+            except asyncio.TimeoutError:
+                return self.pages_seen > since
+        return True
+
+    async def run(self) -> List[Dict]:
+        self.log.info("Starting follower scrape (network capture)")
+        if not self._attached:
+            # the first page was fetched before we were listening, take it from the rendered rows
+            self.attach()
+            self.add_users([(None, row) for row in await self._parse_followers()])
+
+        await self._focus_anchor_if_present()
+        await self._start_dom_observer()
+
+        scrolls = 0
+        for i in range(self.config.max_scrolls):
+            if self.exhausted:
+                break
+            scrolls = i + 1
+            # scrolling only triggers the next page request, the rows themselves come from the responses
+            if self.pacer:
+                await self.pacer.wait_before_scroll(cooldown=False)
+            pages, rows = self.pages_seen, len(self.store)
+            scrolled_at = asyncio.get_running_loop().time()
+            with self.metrics.phase("scroll"):
+                status = await self.stepper.step(self.page, self._scroll_delta())
+            self.metrics.incr("scrolls")
+            with self.metrics.phase("quiet_wait"):
+                got_batch = await self._wait_for_batch(pages, self.config.cooldown_s)
+            self.metrics.set_rows(len(self.store))
+            if self.pacer:
+                # an answered scroll was a page request, its latency is the load latency. whether the loading
+                # graphic was up is what the step saw, a fast answer never shows it
+                latency = asyncio.get_running_loop().time() - scrolled_at if got_batch else None
+                self.pacer.record(len(self.store) - rows, status.loading is True, latency)
+            if got_batch:
+                continue
+            if status.stable:
+                self.log.info("DOM stabilized before instagram reported the last page")
+                break
+
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+        self.detach()
+        self.log.info(f"Captured {len(self.store)} followers from {self.pages_seen} pages in {scrolls} scrolls")
+        self.metrics.incr("pages", self.pages_seen)
+        self.metrics.set_rows(len(self.store))
+
+        if self.config.write_file:
+            try:
+                with self.metrics.phase("write"):
+                    written = write_records(self.config.write_file, self.store.iter_dicts(), self.config.output_format)
+                    self.metrics.add_bytes(written)
+                self.log.info(f"Wrote {len(self.store)} records to {self.config.write_file}")
+            except Exception as e:
+                self.log.error(f"Write failed: {e}")
+                print(f" write failed: {e}")
+
+        export_metrics(self.metrics, self.config, self.log)
+        return self.follower_list
@@ -0,0 +1,110 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Optional, List, Dict, Union
+from .config import ScrapeConfig, Selectors
+from .follower_scraper_live import LiveInstagramFollowerScraper
+from .follower_store import FollowerStore
+from .record_io import iter_records, write_records
+
+
+class RefreshInstagramFollowerScraper(LiveInstagramFollowerScraper):
+    """
+    Instagram lists the newest followers first, so a refresh only has to read the top of the list.
+
+    Loads the previous scrape of the same list (`previous`, or by default whatever is in write_file from the
+    last run), scrolls until refresh_known_run rows in a row are already known, then writes the new head
+    followed by the previous snapshot back to write_file. known rows seen in the head refresh their name /
+    picture in the merged list. the head is only journaled while scrolling, the merged write is the one and
+    only replace of write_file.
+
+    Only additions are picked up, someone who unfollowed below the head stays in the merged list until
+    the next full scrape. without a previous snapshot this is a normal live scrape.
+    """
+    def __init__(self, page, config: Optional[ScrapeConfig] = None, selectors: Optional[Selectors] = None,
+                 logger=None, previous: Union[List[Dict], FollowerStore, None] = None):
+        super().__init__(page, config, selectors, logger)
+        self.previous = previous if previous is None or isinstance(previous, FollowerStore) else FollowerStore(previous)
+        # a refresh is over in seconds, there is nothing worth resuming
+        self.checkpoint = None
+        if self.journal:
+            # compacting the head into write_file would replace the previous snapshot with a few rows before
+            # the merge below has read it back
+            self.journal.compact_on_close = False
+        self.known_run = 0
+        self.head_complete = False
+        # usernames of the head rows in list order, including the known ones that ended it
+        self.head: List[str] = []
+
+    def _load_previous(self) -> FollowerStore:
+        path = Path(self.config.write_file) if self.config.write_file else None
+        if path is None or not path.exists():
+            return FollowerStore()
+        try:
+            return FollowerStore(iter_records(path))
+        except (OSError, ValueError) as e:
+            self.log.warning(f"Could not read previous snapshot {path}, doing a full scrape: {e}")
+            return FollowerStore()
+
+    def _merge_rows(self, rows: List[Dict]) -> List[Dict]:
+        if self.head_complete:
+            return []
+        head_rows = []
+        for row in rows:
+            username = row.get("username")
+            # rows re-read by a full parse were counted the first time they were seen
+            if not username or username in self.store:
+                continue
+            self.known_run = self.known_run + 1 if username in self.previous else 0
+            self.head.append(username)
+            head_rows.append(row)
+            if self.known_run >= self.config.refresh_known_run:
+                self.head_complete = True
+                break
+        return super()._merge_rows(head_rows)
+
+    def _should_stop(self) -> bool:
+        return self.head_complete
+
+    def merged(self) -> FollowerStore:
+        """new followers from the head, then the previous snapshot in its order"""
+        merged = FollowerStore()
+        for username in self.head:
+            if username not in self.previous:
+                merged.add(self.store.get(username).to_dict())
+        for record in self.previous:
+            fresh = self.store.get(record.username)
+            merged.add((fresh or record).to_dict())
+        return merged
+
+    def _write_merged(self, merged: FollowerStore) -> None:
+        path = Path(self.config.write_file)
+        tmp = path.with_name(path.name + ".tmp")
+        write_records(tmp, merged.iter_dicts(), self.config.output_format, fsync=True)
+        os.replace(tmp, path)
+        # the head is in write_file now. a failed write keeps the journal around instead
+        self.journal.journal_file.unlink(missing_ok=True)
+
+    async def run(self) -> List[Dict]:
+        if self.previous is None:
+            self.previous = await asyncio.to_thread(self._load_previous)
+        self.log.info(f"Refreshing against a previous snapshot of {len(self.previous)} followers")
+
+        await super().run()
+        new = sum(username not in self.previous for username in self.head)
+        if self.head_complete:
+            self.log.info(f"Reached {self.known_run} known followers in a row after {len(self.head)} rows, {new} new")
+        else:
+            self.log.info(f"List ended before {self.config.refresh_known_run} known followers in a row, {new} new")
+
+        merged = self.merged()
+        if self.config.write_file:
+            try:
+                with self.metrics.phase("write"):
+                    await asyncio.to_thread(self._write_merged, merged)
+                self.log.info(f"Wrote {len(merged)} merged records to {self.config.write_file}")
+            except Exception as e:
+                self.log.error(f"Write failed: {e}")
+                print(f" write failed: {e}")
+        self.store = merged
+        return self.follower_list
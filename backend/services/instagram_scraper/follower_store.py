@@ -0,0 +1,89 @@
+import sys
+from typing import Optional, Dict, Iterator, List
+
+
+class FollowerRecord:
+    """one follower row. __slots__ keeps a record to a fraction of the size of the equivalent dict"""
+    __slots__ = ("username", "name", "profile_pic", "verified")
+
+    def __init__(self, username: str, name: Optional[str], profile_pic: Optional[str], verified: bool) -> None:
+        self.username = username
+        self.name = name
+        self.profile_pic = profile_pic
+        self.verified = verified
+
+    def to_dict(self) -> Dict:
+        # same shape the scrapers have always written to disk
+        return {
+            "username": self.username,
+            "name": self.name,
+            "profilePic": self.profile_pic,
+            "verified": self.verified,
+        }
+
+
+class FollowerStore:
+    """
+    Follower records keyed by (interned) username, in the order they were first seen.
+    A username is stored once, if the same profile shows up again with a different name or picture url
+    the existing record is updated in place instead of adding a second entry.
+    """
+    NEW = "new"
+    UPDATED = "updated"
+
+    def __init__(self, rows=None) -> None:
+        self._records: Dict[str, FollowerRecord] = {}
+        if rows:
+            for row in rows:
+                self.add(row)
+
+    def add(self, row: Dict) -> Optional[str]:
+        """
+        Returns:
+            FollowerStore.NEW     -> username was not in the store
+            FollowerStore.UPDATED -> username known, but name / picture / verified changed
+            None                  -> nothing changed (or the row has no username)
+        """
+        username = row.get("username")
+        if not username:
+            return None
+
+        name = row.get("name")
+        profile_pic = row.get("profilePic")
+        verified = bool(row.get("verified"))
+
+        record = self._records.get(username)
+        if record is None:
+            username = sys.intern(username)
+            self._records[username] = FollowerRecord(username, name, profile_pic, verified)
+            return self.NEW
+
+        if record.name == name and record.profile_pic == profile_pic and record.verified == verified:
+            return None
+        record.name = name
+        record.profile_pic = profile_pic
+        record.verified = verified
+        return self.UPDATED
+
+    def get(self, username: str) -> Optional[FollowerRecord]:
+        return self._records.get(username)
+
+    def usernames(self):
+        """a live set-like view of the usernames, supports `in` without building a new set"""
+        return self._records.keys()
+
+    def iter_dicts(self) -> Iterator[Dict]:
+        for record in self._records.values():
+            yield record.to_dict()
+
+    def to_dicts(self) -> List[Dict]:
+        return list(self.iter_dicts())
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, username) -> bool:
+        return username in self._records
+
+    def __iter__(self) -> Iterator[FollowerRecord]:
+        return iter(self._records.values())
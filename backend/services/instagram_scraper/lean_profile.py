@@ -0,0 +1,37 @@
+import re
+
+from .config import ScrapeConfig
+
+# the scraper only reads img.src strings, the bytes behind them are never needed.
+# aborting the request leaves the src attribute (the profile pic url) untouched in the DOM
+LEAN_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+# only requests matching this are routed at all: files with an image / media / font extension and instagram's
+# user content cdn hosts (scontent-*, profile pics and videos). everything else, the page's xhr / fetch calls
+# included, never makes the round trip through python
+LEAN_BLOCKED_URLS = re.compile(
+    r"\.(?:jpe?g|png|gif|webp|avif|heic|svg|ico|bmp|mp4|m4v|m4a|webm|mp3|ogg|woff2?|ttf|otf|eot)(?:[?#]|$)"
+    r"|^https?://scontent[^/]*\.(?:cdninstagram\.com|fbcdn\.net)/",
+    re.IGNORECASE,
+)
+
+# instant scrolling, no smooth-scroll animation frames to render for every wheel step
+LEAN_CHROMIUM_ARGS = ["--disable-smooth-scrolling"]
+
+
+def launch_options(config: ScrapeConfig) -> dict:
+    """kwargs for chromium.launch() matching the config's scrape profile"""
+    if config.lean_profile:
+        return {"headless": True, "args": list(LEAN_CHROMIUM_ARGS)}
+    return {"headless": False}
+
+
+async def _abort_heavy_resources(route) -> None:
+    if route.request.resource_type in LEAN_BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def apply_lean_routes(target) -> None:
+    """blocks images, media and fonts for a BrowserContext or Page"""
+    await target.route(LEAN_BLOCKED_URLS, _abort_heavy_resources)
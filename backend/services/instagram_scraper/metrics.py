@@ -0,0 +1,238 @@
+import json
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Optional, Dict, List
+
+# upper bounds (seconds) of the latency histogram buckets, prometheus style. the last bucket is +Inf
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# phases of the scrape loop the scrapers time
+PHASES = ("scroll", "loading_wait", "quiet_wait", "parse", "write")
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, buckets=LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """estimated from the buckets, good enough to tell 10 ms from 100 ms"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.buckets[i] if i < len(self.buckets) else self.max, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total_s": round(self.sum, 6),
+            "mean_s": round(self.sum / self.count, 6) if self.count else None,
+            "min_s": self.min,
+            "max_s": self.max,
+            "p50_s": self.quantile(0.5),
+            "p95_s": self.quantile(0.95),
+            "buckets": {str(b): n for b, n in zip(list(self.buckets) + ["+Inf"], self.counts)},
+        }
+
+
+class _Timer:
+    __slots__ = ("hist", "start")
+
+    def __init__(self, hist: Histogram) -> None:
+        self.hist = hist
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.hist.observe(time.perf_counter() - self.start)
+
+
+class ScrapeMetrics:
+    """
+    Counters, per-phase latency histograms, rows captured over time and bytes written for one scrape run.
+    Exported as a JSON run report (to_dict / write_json) or prometheus text exposition (to_prometheus).
+
+        with metrics.phase("scroll"):
+            status = await stepper.step(page, dy)
+    """
+    enabled = True
+
+    def __init__(self, name: str = "scrape", rows_sample_s: float = 0.5) -> None:
+        self.name = name
+        self.rows_sample_s = rows_sample_s
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.finished_s: Optional[float] = None
+        self.phases: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.bytes_written = 0
+        self.rows = 0
+        # (seconds since start, rows captured), sampled at most every rows_sample_s
+        self.rows_timeline: List[List[float]] = []
+        self._last_sample = float("-inf")
+
+    def phase(self, name: str) -> _Timer:
+        hist = self.phases.get(name)
+        if hist is None:
+            hist = self.phases[name] = Histogram()
+        return _Timer(hist)
+
+    def observe(self, name: str, seconds: float) -> None:
+        hist = self.phases.get(name)
+        if hist is None:
+            hist = self.phases[name] = Histogram()
+        hist.observe(seconds)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_bytes(self, n: int) -> None:
+        self.bytes_written += n
+
+    def set_rows(self, rows: int) -> None:
+        self.rows = rows
+        elapsed = time.perf_counter() - self._t0
+        if elapsed - self._last_sample >= self.rows_sample_s:
+            self._last_sample = elapsed
+            self.rows_timeline.append([round(elapsed, 3), rows])
+
+    def finish(self) -> None:
+        self.finished_s = time.perf_counter() - self._t0
+        if not self.rows_timeline or self.rows_timeline[-1][1] != self.rows:
+            self.rows_timeline.append([round(self.finished_s, 3), self.rows])
+
+    # --------------------------
+    # Export
+    # --------------------------
+
+    def to_dict(self) -> Dict:
+        elapsed = self.finished_s if self.finished_s is not None else time.perf_counter() - self._t0
+        timed = sum(h.sum for h in self.phases.values())
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "elapsed_s": round(elapsed, 3),
+            "rows": self.rows,
+            "rows_per_s": round(self.rows / elapsed, 2) if elapsed else None,
+            "bytes_written": self.bytes_written,
+            "counters": dict(self.counters),
+            "phases": {name: hist.to_dict() for name, hist in self.phases.items()},
+            # time not spent in any timed phase: python side bookkeeping, logging, hooks
+            "untimed_s": round(max(0.0, elapsed - timed), 3),
+            "rows_timeline": self.rows_timeline,
+        }
+
+    def to_prometheus(self, prefix: str = "instagram_scrape") -> str:
+        label = f'scrape="{self.name}"'
+        lines = [
+            f"# TYPE {prefix}_rows gauge",
+            f"{prefix}_rows{{{label}}} {self.rows}",
+            f"# TYPE {prefix}_bytes_written_total counter",
+            f"{prefix}_bytes_written_total{{{label}}} {self.bytes_written}",
+        ]
+        if self.counters:
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{prefix}_events_total{{{label},event="{name}"}} {value}')
+        if self.phases:
+            metric = f"{prefix}_phase_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for name, hist in sorted(self.phases.items()):
+                labels = f'{label},phase="{name}"'
+                cumulative = 0
+                for bound, n in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{labels}}} {hist.sum}")
+                lines.append(f"{metric}_count{{{labels}}} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=4), encoding="utf-8")
+
+    def write_prometheus(self, path) -> None:
+        Path(path).write_text(self.to_prometheus(), encoding="utf-8")
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class NullMetrics:
+    """drop-in for ScrapeMetrics when metrics are off, every call is a no-op and no timer is ever read"""
+    enabled = False
+    bytes_written = 0
+    rows = 0
+
+    def phase(self, name: str) -> _NullTimer:
+        return _NULL_TIMER
+
+    def observe(self, name: str, seconds: float) -> None:
+        pass
+
+    def incr(self, name: str, n: int = 1) -> None:
+        pass
+
+    def add_bytes(self, n: int) -> None:
+        pass
+
+    def set_rows(self, rows: int) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def make_metrics(config, name: str = "scrape"):
+    """a ScrapeMetrics when the config asks for a report, else the shared no-op"""
+    if config.metrics_file or config.metrics_prom_file:
+        return ScrapeMetrics(name)
+    return NULL_METRICS
+
+
+def export_metrics(metrics, config, logger=None) -> None:
+    if not metrics.enabled:
+        return
+    metrics.finish()
+    try:
+        if config.metrics_file:
+            metrics.write_json(config.metrics_file)
+        if config.metrics_prom_file:
+            metrics.write_prometheus(config.metrics_prom_file)
+    except Exception as e:
+        # a lost report never fails the scrape
+        if logger:
+            logger.warning(f"Writing metrics failed (non-fatal): {e}")
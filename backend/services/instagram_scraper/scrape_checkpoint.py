@@ -0,0 +1,47 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional, Dict
+
+
+class ScrapeCheckpoint:
+    """
+    Small JSON file recording how far a live scrape got: scrolls made, follower rows rendered in the modal and
+    how many records were collected. the records themselves live in the scraper's NDJSON journal, which is
+    flushed before every save, so a checkpoint stays a few hundred bytes no matter how big the list is.
+    """
+    def __init__(self, path: str, logger=None) -> None:
+        self.path = Path(path)
+        self.log = logger
+
+    def load(self, journal_file) -> Optional[Dict]:
+        """returns the saved state, or None if there is nothing to resume for this journal"""
+        if not self.path.exists():
+            return None
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            if self.log:
+                self.log.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+        if state.get("journal") != str(journal_file) or not Path(journal_file).exists():
+            if self.log:
+                self.log.warning(f"Checkpoint {self.path} does not match journal {journal_file}, starting over")
+            return None
+        return state
+
+    def save(self, journal_file, scrolls: int, row_count: int, records: int) -> None:
+        state = {
+            "journal": str(journal_file),
+            "scrolls": scrolls,
+            "row_count": row_count,
+            "records": records,
+            "updated_at": time.time(),
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+
+class AdaptiveScrollPacer:
+    """
+    Tunes scroll_delta and the cooldown between scrolls from what the list did after the last few scrolls,
+    instead of the fixed values in ScrapeConfig.
+
+      - a scroll brought new rows without the loading graphic showing: rows are arriving faster than we ask
+        for them, scroll further and wait less
+      - the loading graphic showed: the backend is the bottleneck, wait about as long as a load takes and
+        stop growing the delta
+      - nothing happened: the scroll was wasted, back off the cooldown
+
+    A scroll that triggers a load is also a request to instagram, so scrolls are never spaced closer
+    than 1 / max_requests_per_s no matter how fast the list answers.
+    """
+    def __init__(self, delta: int, cooldown_s: float, min_delta: int = 400, max_delta: int = 6_000,
+                 min_cooldown_s: float = 0.02, max_cooldown_s: float = 1.0, max_requests_per_s: float = 4.0,
+                 history: int = 8, logger=None) -> None:
+        self.min_delta = min_delta
+        self.max_delta = max_delta
+        self.min_cooldown_s = min_cooldown_s
+        self.max_cooldown_s = max_cooldown_s
+        self.min_interval_s = 1 / max_requests_per_s if max_requests_per_s > 0 else 0.0
+        self.log = logger
+
+        self._delta = float(min(max(delta, min_delta), max_delta))
+        self._cooldown_s = min(max(cooldown_s, min_cooldown_s), max_cooldown_s)
+        # per scroll: (new rows, loading graphic seen)
+        self.outcomes = deque(maxlen=history)
+        self.load_latencies = deque(maxlen=history)
+        self._last_scroll_at: Optional[float] = None
+
+    @property
+    def delta(self) -> int:
+        return int(self._delta)
+
+    @property
+    def cooldown_s(self) -> float:
+        return self._cooldown_s
+
+    @property
+    def loading_rate(self) -> float:
+        """share of recent scrolls that showed the loading graphic"""
+        if not self.outcomes:
+            return 0.0
+        return sum(loading for _, loading in self.outcomes) / len(self.outcomes)
+
+    @property
+    def rows_per_scroll(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(rows for rows, _ in self.outcomes) / len(self.outcomes)
+
+    def record(self, new_rows: int, loading_seen: bool, load_latency_s: Optional[float] = None) -> None:
+        """feeds back the outcome of one scroll: rows added, whether it loaded and how long the load took"""
+        self.outcomes.append((max(new_rows, 0), bool(loading_seen)))
+        if load_latency_s is not None:
+            self.load_latencies.append(load_latency_s)
+
+        if loading_seen:
+            # waiting less than a load takes only produces scrolls that find the graphic still spinning
+            if self.load_latencies:
+                target = sum(self.load_latencies) / len(self.load_latencies) / 2
+                self._cooldown_s = (self._cooldown_s + target) / 2
+            if self.loading_rate > 0.5:
+                self._delta *= 0.9
+        elif new_rows > 0:
+            self._delta *= 1.25
+            self._cooldown_s *= 0.7
+        else:
+            self._cooldown_s *= 1.5
+
+        self._delta = min(max(self._delta, self.min_delta), self.max_delta)
+        self._cooldown_s = min(max(self._cooldown_s, self.min_cooldown_s), self.max_cooldown_s)
+        if self.log:
+            self.log.debug(
+                f"Pacing: delta {self.delta}px, cooldown {self._cooldown_s * 1000:.0f} ms, "
+                f"{self.rows_per_scroll:.1f} rows/scroll, loading {self.loading_rate:.0%}"
+            )
+
+    async def wait_before_scroll(self, cooldown: bool = True) -> None:
+        """sleeps the current cooldown (when asked), stretched if needed to respect max_requests_per_s"""
+        wait = self._cooldown_s if cooldown else 0.0
+        if self._last_scroll_at is not None and self.min_interval_s:
+            wait = max(wait, self._last_scroll_at + self.min_interval_s - time.monotonic())
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_scroll_at = time.monotonic()
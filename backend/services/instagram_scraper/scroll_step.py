@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class StepStatus:
+    # False if the scroll container was not found in the page
+    scrolled: bool
+    # True -> loading graphic visible, False -> not visible, None -> loading row missing / can't tell
+    loading: Optional[bool]
+    # True once the DomActivityObserver has seen quiet_ms of silence
+    stable: bool
+    # follower rows currently rendered in the scroll container
+    row_count: int
+
+
+class ScrollStepper:
+    """
+    Fuses a scroll, the loading graphic poll and the DOM stability check into a single page.evaluate.
+    Every CDP call is a round trip to the browser, and over a remote or busy browser those round trips
+    are what limits scrape speed, so one scroll iteration should cost one call.
+    """
+    def __init__(self, selectors, settle_ms: int = 16, smooth: bool = True, logger=None) -> None:
+        self.sel = selectors
+        # how long to let the page react to the wheel event before reading the loading graphic
+        self.settle_ms = settle_ms
+        self.smooth = smooth
+        self.log = logger
+
+    async def step(self, page, delta_y: int) -> StepStatus:
+        """Scroll the follower list by delta_y and report the resulting page state."""
+        if self.log:
+            self.log.debug(f"Scroll step on {self.sel.scroll_container_css} by {delta_y}")
+        return await self._evaluate(page, delta_y)
+
+    async def probe(self, page) -> StepStatus:
+        """Report the page state without scrolling."""
+        return await self._evaluate(page, 0)
+
+    async def _evaluate(self, page, delta_y: int) -> StepStatus:
+        sel = self.sel
+        result = await page.evaluate(
+            """
+            async ({ scrollSel, rowSel, loadingSel, itemSel, dy, settleMs, behavior }) => {
+                const el = document.querySelector(scrollSel);
+                if (el && dy) {
+                    el.dispatchEvent(new WheelEvent('wheel', {deltaY: dy, bubbles: true, cancelable: true}));
+                    el.scrollBy({ top: dy, behavior });
+                    if (settleMs > 0) await new Promise(resolve => setTimeout(resolve, settleMs));
+                }
+
+                // rendered rows are counted by a MutationObserver from the rows added / removed since the last
+                // step, re-running querySelectorAll over the whole list every step costs O(rows) per scroll
+                let counter = window.__stepRowCounter;
+                if (el && (!counter || counter.el !== el)) {
+                    if (counter) counter.observer.disconnect();
+                    const rows = new Set(el.querySelectorAll(itemSel));
+                    const apply = (records) => {
+                        for (const r of records) {
+                            for (const n of r.addedNodes) {
+                                if (n.nodeType !== 1 || !el.contains(n)) continue;
+                                if (n.matches(itemSel)) rows.add(n);
+                                for (const m of n.querySelectorAll(itemSel)) rows.add(m);
+                            }
+                            for (const n of r.removedNodes) {
+                                if (n.nodeType !== 1 || el.contains(n)) continue;
+                                rows.delete(n);
+                                for (const m of n.querySelectorAll(itemSel)) rows.delete(m);
+                            }
+                        }
+                    };
+                    const observer = new MutationObserver(apply);
+                    observer.observe(el, { childList: true, subtree: true });
+                    counter = window.__stepRowCounter = { el, rows, observer, apply };
+                }
+                // mutations not delivered to the observer yet (e.g. right after a probe without settling)
+                if (el) counter.apply(counter.observer.takeRecords());
+
+                const row = document.querySelector(rowSel);
+                return {
+                    scrolled: !!el,
+                    loading: row ? !!row.querySelector(loadingSel) : null,
+                    stable: Boolean(window.__domActivityQuietDone),
+                    rowCount: el ? counter.rows.size : 0,
+                };
+            }
+            """,
+            {
+                "scrollSel": sel.scroll_container_css,
+                "rowSel": sel.follower_row_css,
+                "loadingSel": sel.loading_graphic_element,
+                "itemSel": sel.follower_item_css,
+                "dy": delta_y,
+                "settleMs": self.settle_ms,
+                "behavior": "smooth" if self.smooth else "instant",
+            },
+        )
+        status = StepStatus(
+            scrolled=result["scrolled"],
+            loading=result["loading"],
+            stable=result["stable"],
+            row_count=result["rowCount"],
+        )
+        if self.log:
+            self.log.debug(f"Step status: {status}")
+        return status
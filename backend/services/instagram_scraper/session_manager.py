@@ -0,0 +1,201 @@
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+
+from .cookie_store import COOKIES_DIR
+
+# the cookie that carries an instagram login, without it (or with it expired) every page is the login wall
+SESSION_COOKIE = "sessionid"
+# cheapest authenticated endpoint: a few hundred bytes of json when logged in, 401/403 or a login redirect when not
+PREFLIGHT_URL = "https://www.instagram.com/api/v1/accounts/current_user/?edit=true"
+# the web client's app id, instagram's private api rejects requests without it
+IG_APP_ID = "936619743392459"
+
+# <username>_<date>_cookies.json / <username>_<date>_state.json as written by instagram_cookie_fetcher.py
+_SESSION_FILE = re.compile(r"^(?P<username>.+)_(?P<date>[^_]+)_(?P<kind>cookies|state)\.json$")
+
+
+class SessionError(RuntimeError):
+    """no usable login for an account, raised before any browser work is done"""
+
+
+@dataclass
+class Session:
+    username: str
+    # the file the cookies came from, a storage state is preferred over raw cookies
+    path: Path
+    kind: str
+    cookies: List[Dict] = field(repr=False)
+
+    @property
+    def session_cookie(self) -> Optional[Dict]:
+        for cookie in self.cookies:
+            if cookie.get("name") == SESSION_COOKIE and "instagram.com" in cookie.get("domain", ""):
+                return cookie
+        return None
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """unix time the sessionid expires, None for a browser-session cookie (or no sessionid at all)"""
+        cookie = self.session_cookie
+        if cookie is None or cookie.get("expires", -1) in (-1, None):
+            return None
+        return float(cookie["expires"])
+
+    def auth_options(self) -> Dict:
+        """kwargs for BrowserPool.context() / browser.new_context()"""
+        if self.kind == "state":
+            return {"storage_state": str(self.path)}
+        return {"cookies": self.cookies}
+
+
+class SessionManager:
+    """
+    Finds and validates saved logins without launching a browser.
+
+    The cookies directory is listed once and indexed per account (newest cookies / state file each), and only
+    listed again when the directory's mtime changes, so looking up many accounts costs one scandir instead of a
+    glob + stat per lookup. parsed cookie files are cached by mtime as well.
+
+    check() fails right away when an account has no saved login or its sessionid expires within min_ttl_s,
+    preflight() additionally asks instagram whether the session is still accepted (a revoked login looks fine
+    locally) with one small http request, remembered for preflight_ttl_s.
+    """
+    def __init__(self, cookies_dir: Path = COOKIES_DIR, min_ttl_s: float = 600, preflight_ttl_s: float = 600,
+                 logger=None) -> None:
+        self.cookies_dir = Path(cookies_dir)
+        self.min_ttl_s = min_ttl_s
+        self.preflight_ttl_s = preflight_ttl_s
+        self.log = logger
+
+        # (username, kind) -> (mtime, path) of the newest file
+        self._index: Dict[Tuple[str, str], Tuple[float, Path]] = {}
+        self._index_mtime: Optional[int] = None
+        # path -> (mtime, cookies)
+        self._cookies: Dict[Path, Tuple[float, List[Dict]]] = {}
+        # username -> (sessionid value, checked at)
+        self._verified: Dict[str, Tuple[str, float]] = {}
+
+    # --------------------------
+    # Index
+    # --------------------------
+
+    def _refresh_index(self) -> None:
+        try:
+            mtime = self.cookies_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._index, self._index_mtime = {}, None
+            return
+        # adding, renaming or deleting a file bumps the directory's mtime. a file rewritten in place keeps its
+        # path, load_cookies notices the new content by the file's own mtime
+        if mtime == self._index_mtime:
+            return
+        index = {}
+        with os.scandir(self.cookies_dir) as entries:
+            for entry in entries:
+                match = _SESSION_FILE.match(entry.name)
+                if not match or not entry.is_file():
+                    continue
+                key = (match["username"], match["kind"])
+                file_mtime = entry.stat().st_mtime
+                if key not in index or file_mtime > index[key][0]:
+                    index[key] = (file_mtime, Path(entry.path))
+        self._index, self._index_mtime = index, mtime
+
+    def find(self, username: str, kind: str = "cookies") -> Optional[Path]:
+        """the newest `kind` ("cookies" or "state") file saved for the account"""
+        self._refresh_index()
+        found = self._index.get((username, kind))
+        return found[1] if found else None
+
+    def load_cookies(self, path: Path) -> List[Dict]:
+        mtime = path.stat().st_mtime
+        cached = self._cookies.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        data = json.loads(path.read_text(encoding="utf-8"))
+        # a storage state wraps the cookie list, a cookies file is the list itself
+        cookies = data.get("cookies", []) if isinstance(data, dict) else data
+        self._cookies[path] = (mtime, cookies)
+        return cookies
+
+    # --------------------------
+    # Checks
+    # --------------------------
+
+    def session(self, username: str) -> Optional[Session]:
+        """the saved login to use for an account, the storage state if there is one, None if nothing is saved"""
+        for kind in ("state", "cookies"):
+            path = self.find(username, kind)
+            if path is not None:
+                return Session(username, path, kind, self.load_cookies(path))
+        return None
+
+    def check(self, username: str) -> Session:
+        """the account's session, or SessionError when it is missing or (about to be) expired. no network"""
+        session = self.session(username)
+        if session is None:
+            raise SessionError(f"no saved login for {username}, run instagram_cookie_fetcher.py for this account")
+        if session.session_cookie is None:
+            raise SessionError(f"{session.path.name} has no {SESSION_COOKIE} cookie, log in again")
+        expires_at = session.expires_at
+        if expires_at is not None and expires_at - time.time() < self.min_ttl_s:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(expires_at))
+            raise SessionError(f"the login in {session.path.name} expired (or expires) at {when}, log in again")
+        return session
+
+    async def preflight(self, session: Session, timeout_s: float = 5.0) -> None:
+        """
+        Raises SessionError when instagram no longer accepts the session. network trouble is only logged,
+        the scrape itself will find out for sure.
+        """
+        import httpx
+
+        value = session.session_cookie["value"]
+        verified = self._verified.get(session.username)
+        if verified and verified[0] == value and time.time() - verified[1] < self.preflight_ttl_s:
+            return
+
+        cookies = {c["name"]: c["value"] for c in session.cookies if "instagram.com" in c.get("domain", "")}
+        headers = {"X-IG-App-ID": IG_APP_ID, "User-Agent": "Mozilla/5.0", "Accept": "application/json"}
+        started = time.perf_counter()
+        try:
+            async with httpx.AsyncClient(cookies=cookies, timeout=timeout_s, follow_redirects=False) as client:
+                resp = await client.get(PREFLIGHT_URL, headers=headers)
+        except httpx.HTTPError as e:
+            if self.log:
+                self.log.warning(f"Session pre-flight for {session.username} failed, continuing: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        # logged out sessions are redirected to the login page or refused outright
+        if resp.status_code in (401, 403) or resp.is_redirect:
+            self._verified.pop(session.username, None)
+            raise SessionError(f"instagram rejected the saved login for {session.username} "
+                               f"(HTTP {resp.status_code}), log in again")
+        if resp.status_code == 200:
+            self._verified[session.username] = (value, time.time())
+            if self.log:
+                self.log.info(f"Session for {session.username} is valid ({elapsed_ms:.0f} ms pre-flight)")
+        elif self.log:
+            # rate limited or instagram having a moment, not proof the session is dead
+            self.log.warning(f"Session pre-flight for {session.username} returned HTTP {resp.status_code}, continuing")
+
+
+# one manager per cookies directory, shared by everything in the process
+_MANAGERS: Dict[Path, SessionManager] = {}
+
+
+def session_manager(cookies_dir: Path = COOKIES_DIR, logger=None) -> SessionManager:
+    """the process-wide manager for a cookies directory. the first caller with a logger gives it its logger"""
+    cookies_dir = Path(cookies_dir)
+    manager = _MANAGERS.get(cookies_dir)
+    if manager is None:
+        manager = _MANAGERS[cookies_dir] = SessionManager(cookies_dir)
+    if manager.log is None and logger is not None:
+        manager.log = logger
+    return manager
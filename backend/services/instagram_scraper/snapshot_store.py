@@ -0,0 +1,223 @@
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Union, Iterable, List, Dict
+from .follower_store import FollowerStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE
+);
+
+-- every instagram user we have ever seen, stored once no matter how many snapshots they appear in
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    name TEXT,
+    profile_pic TEXT,
+    verified INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    kind TEXT NOT NULL CHECK (kind IN ('followers', 'following')),
+    taken_at TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_by_account ON snapshots(account_id, kind, taken_at);
+
+CREATE TABLE IF NOT EXISTS snapshot_members (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    -- index of the user in the scraped list, instagram lists the newest followers first
+    position INTEGER,
+    PRIMARY KEY (snapshot_id, user_id)
+) WITHOUT ROWID;
+"""
+
+# picks one snapshot id of an account: the newest one taken at or before a point in time, skipping `offset`
+_SNAPSHOT_AT = """
+    SELECT s.id FROM snapshots s JOIN accounts a ON a.id = s.account_id
+    WHERE a.username = :account AND s.kind = '{kind}' AND s.taken_at <= :{at}
+    ORDER BY s.taken_at DESC LIMIT 1 OFFSET :{offset}
+"""
+
+# members of snapshot `a` that are not in snapshot `b`
+_DIFF = """
+    SELECT u.username, u.name, u.profile_pic, u.verified
+    FROM snapshot_members m JOIN users u ON u.id = m.user_id
+    WHERE m.snapshot_id = :a
+      AND NOT EXISTS (
+          SELECT 1 FROM snapshot_members o WHERE o.snapshot_id = :b AND o.user_id = m.user_id
+      )
+    ORDER BY u.username
+"""
+
+_END_OF_TIME = "9999-12-31T23:59:59"
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def _as_of(value: Union[str, datetime, None]) -> str:
+    """accepts a datetime, an ISO timestamp or a plain YYYY-MM-DD date (meaning the end of that day)"""
+    if value is None:
+        return _END_OF_TIME
+    if isinstance(value, datetime):
+        if value.tzinfo:
+            value = value.astimezone(timezone.utc)
+        return value.strftime("%Y-%m-%dT%H:%M:%S.%f")
+    if len(value) == 10:
+        return value + "T23:59:59.999999"
+    return value
+
+
+class SnapshotStore:
+    """
+    History of follower / following scrapes per account in an indexed SQLite database.
+    Usernames are normalized into a users table, a snapshot is a set of user ids, so
+    "new followers", "lost followers" and "they don't follow back" are each a single indexed query
+    instead of reloading and rescanning full JSON lists.
+    """
+    def __init__(self, path: str = "snapshots.db", timeout_s: float = 30.0) -> None:
+        self.path = Path(path)
+        # another process (or thread) writing a snapshot holds the lock for a moment, wait for it instead of
+        # failing with "database is locked"
+        self.conn = sqlite3.connect(self.path, timeout=timeout_s)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        # databases created before snapshot_members kept the list order. their snapshots have no position and
+        # read back by username
+        columns = {r["name"] for r in self.conn.execute("PRAGMA table_info(snapshot_members)")}
+        if "position" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE snapshot_members ADD COLUMN position INTEGER")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --------------------------
+    # Writes
+    # --------------------------
+
+    def record_snapshot(self, account: str, kind: str, rows: Union[Iterable[Dict], FollowerStore],
+                        taken_at: Union[str, datetime, None] = None) -> int:
+        """stores one scrape of `kind` ('followers' / 'following') in a single transaction, returns the snapshot id"""
+        if isinstance(rows, FollowerStore):
+            rows = rows.iter_dicts()
+        users = [
+            (r["username"], r.get("name"), r.get("profilePic"), int(bool(r.get("verified"))))
+            for r in rows if r.get("username")
+        ]
+        taken_at = _as_of(taken_at) if taken_at else _utc_now()
+
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO accounts(username) VALUES (?)", (account,))
+            account_id = self.conn.execute("SELECT id FROM accounts WHERE username = ?", (account,)).fetchone()[0]
+
+            # refresh the profile details we keep for each user
+            self.conn.executemany(
+                """
+                INSERT INTO users(username, name, profile_pic, verified) VALUES (?, ?, ?, ?)
+                ON CONFLICT(username) DO UPDATE SET
+                    name = excluded.name, profile_pic = excluded.profile_pic, verified = excluded.verified
+                """,
+                users,
+            )
+            snapshot_id = self.conn.execute(
+                "INSERT INTO snapshots(account_id, kind, taken_at, size) VALUES (?, ?, ?, ?)",
+                (account_id, kind, taken_at, len(users)),
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO snapshot_members(snapshot_id, user_id, position) "
+                "SELECT ?, id, ? FROM users WHERE username = ?",
+                ((snapshot_id, position, u[0]) for position, u in enumerate(users)),
+            )
+        return snapshot_id
+
+    # --------------------------
+    # Queries
+    # --------------------------
+
+    def _snapshot_id(self, account: str, kind: str, at: str, offset: int = 0) -> Optional[int]:
+        row = self.conn.execute(
+            _SNAPSHOT_AT.format(kind=kind, at="at", offset="offset"),
+            {"account": account, "at": at, "offset": offset},
+        ).fetchone()
+        return row["id"] if row else None
+
+    def _diff(self, account: str, a_kind: str, a_at: str, a_offset: int,
+              b_kind: str, b_at: str, b_offset: int) -> List[Dict]:
+        a = self._snapshot_id(account, a_kind, a_at, a_offset)
+        b = self._snapshot_id(account, b_kind, b_at, b_offset)
+        # with nothing to compare against (a single scrape, `since` before the first one) every member would
+        # count as new / lost
+        if a is None or b is None:
+            return []
+        return [
+            {"username": r["username"], "name": r["name"], "profilePic": r["profile_pic"], "verified": bool(r["verified"])}
+            for r in self.conn.execute(_DIFF, {"a": a, "b": b})
+        ]
+
+    def new_followers(self, account: str, since: Union[str, datetime, None] = None) -> List[Dict]:
+        """followers in the latest snapshot that were not in the snapshot as of `since` (default: the previous one)"""
+        if since is None:
+            return self._diff(account, "followers", _END_OF_TIME, 0, "followers", _END_OF_TIME, 1)
+        return self._diff(account, "followers", _END_OF_TIME, 0, "followers", _as_of(since), 0)
+
+    def lost_followers(self, account: str, since: Union[str, datetime, None] = None) -> List[Dict]:
+        """followers in the snapshot as of `since` (default: the previous one) that are gone from the latest"""
+        if since is None:
+            return self._diff(account, "followers", _END_OF_TIME, 1, "followers", _END_OF_TIME, 0)
+        return self._diff(account, "followers", _as_of(since), 0, "followers", _END_OF_TIME, 0)
+
+    def they_dont_follow_back(self, account: str, as_of: Union[str, datetime, None] = None) -> List[Dict]:
+        """accounts followed as of `as_of` (default: now) that did not follow back at that time"""
+        at = _as_of(as_of)
+        return self._diff(account, "following", at, 0, "followers", at, 0)
+
+    def you_dont_follow_back(self, account: str, as_of: Union[str, datetime, None] = None) -> List[Dict]:
+        at = _as_of(as_of)
+        return self._diff(account, "followers", at, 0, "following", at, 0)
+
+    def latest_snapshot(self, account: str, kind: str) -> Optional[List[Dict]]:
+        """members of the newest `kind` snapshot of an account in the scraped order, None if it was never scraped"""
+        snapshot_id = self._snapshot_id(account, kind, _END_OF_TIME)
+        if snapshot_id is None:
+            return None
+        rows = self.conn.execute(
+            """
+            SELECT u.username, u.name, u.profile_pic, u.verified
+            FROM snapshot_members m JOIN users u ON u.id = m.user_id
+            WHERE m.snapshot_id = ? ORDER BY m.position, u.username
+            """,
+            (snapshot_id,),
+        )
+        return [
+            {"username": r["username"], "name": r["name"], "profilePic": r["profile_pic"], "verified": bool(r["verified"])}
+            for r in rows
+        ]
+
+    def snapshots(self, account: str) -> List[Dict]:
+        rows = self.conn.execute(
+            """
+            SELECT s.id, s.kind, s.taken_at, s.size FROM snapshots s JOIN accounts a ON a.id = s.account_id
+            WHERE a.username = ? ORDER BY s.taken_at
+            """,
+            (account,),
+        )
+        return [dict(r) for r in rows]
@@ -0,0 +1,200 @@
+import heapq
+import json
+import math
+import os
+import tempfile
+import zlib
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Iterator, Dict, List
+
+from .record_io import iter_records, open_writer, with_format, check_format, sniff_format
+
+# rough in-memory cost of one username in a python set, relative to the size of its record on disk.
+# a ~200 byte follower record costs ~100 bytes as a set entry, rounded up to stay under the cap
+_SET_BYTES_PER_FILE_BYTE = 0.75
+# follower records compress about 10x, so a gzipped list needs this many times its size
+_GZIP_EXPANSION = 10
+# files open at the same time while merging partial results, far below the usual limit of 1024 descriptors
+_MAX_OPEN_FILES = 64
+# partition lines are buffered and appended one file at a time, so partitioning keeps no file open at all.
+# the buffer takes half the memory cap (the username set is not built yet), within these bounds
+_MIN_PARTITION_BUFFER = 64 * 2**10
+_MAX_PARTITION_BUFFER = 16 * 2**20
+
+
+class StreamingFollowerAnalyzer:
+    """
+    Out-of-core version of FollowerAnalyzer for accounts with millions of followers.
+
+    The inputs are streamed from followers.json / following.json (in any record_io format) and results are written
+    to disk in output_format as they are found, so neither list is ever held in memory as dicts. only the usernames
+    of the list being compared against are kept in a set. if that set would not fit in memory_cap_mb, both inputs
+    are hash-partitioned into temporary files first, each partition is compared on its own, and the partial results
+    are merged back into the original order. the output files are identical to what FollowerAnalyzer._save_json writes.
+    however many partitions there are, at most _MAX_OPEN_FILES files are open at once.
+    """
+
+    def __init__(self, followers_path: str, following_path: str, output_dir: str = ".",
+                 memory_cap_mb: float = 256, tmp_dir: str = None, logger=None, output_format: str = "json"):
+        self.followers_path = Path(followers_path)
+        self.following_path = Path(following_path)
+        self.output_dir = Path(output_dir)
+        self.memory_cap_bytes = memory_cap_mb * 2**20
+        self.tmp_dir = tmp_dir
+        self.log = logger
+        self.output_format = check_format(output_format)
+
+    # --------------------------
+    # Computation Methods
+    # --------------------------
+
+    def compute_they_dont_follow_back(self, filename: str = "they_dont_follow_back.json") -> int:
+        """Find accounts you follow that don't follow you back. returns how many were written"""
+        count = self._anti_join(self.following_path, self.followers_path, self._output_path(filename))
+        print(f"[info] They don't follow you back: {count}")
+        return count
+
+    def compute_you_dont_follow_back(self, filename: str = "you_dont_follow_back.json") -> int:
+        """Find accounts that follow you, but you don't follow back. returns how many were written"""
+        return self._anti_join(self.followers_path, self.following_path, self._output_path(filename))
+
+    def _output_path(self, filename: str) -> Path:
+        return with_format(self.output_dir / filename, self.output_format)
+
+    # --------------------------
+    # Anti join
+    # --------------------------
+
+    def _partitions_for(self, path: Path) -> int:
+        estimated = path.stat().st_size * _SET_BYTES_PER_FILE_BYTE
+        if sniff_format(path) == "ndjson.gz":
+            estimated *= _GZIP_EXPANSION
+        return max(1, math.ceil(estimated / self.memory_cap_bytes))
+
+    def _anti_join(self, left: Path, right: Path, out_path: Path) -> int:
+        """writes every record of `left` whose username is not in `right`, in `left` order"""
+        partitions = self._partitions_for(right)
+        if partitions == 1:
+            exclude = {username for username in map(_username, iter_records(right)) if username}
+            with open_writer(out_path, self.output_format) as out:
+                for record in iter_records(left):
+                    username = _username(record)
+                    if username and username not in exclude:
+                        out.write(record)
+            return out.count
+
+        if self.log:
+            self.log.info(f"{right.name} exceeds the memory cap, comparing in {partitions} partitions")
+        buffer_bytes = int(min(max(self.memory_cap_bytes / 2, _MIN_PARTITION_BUFFER), _MAX_PARTITION_BUFFER))
+        with tempfile.TemporaryDirectory(dir=self.tmp_dir) as tmp:
+            tmp = Path(tmp)
+            right_parts = _PartitionFiles(tmp, "right", partitions, buffer_bytes)
+            for record in iter_records(right):
+                username = _username(record)
+                if username:
+                    right_parts.write(_partition(username, partitions), username + "\n")
+            right_parts.flush()
+            # left records keep their position so the final output can be put back in order
+            left_parts = _PartitionFiles(tmp, "left", partitions, buffer_bytes)
+            for index, record in enumerate(iter_records(left)):
+                username = _username(record)
+                if not username:
+                    continue
+                line = f"{index}\t{json.dumps(record, ensure_ascii=False)}\n"
+                left_parts.write(_partition(username, partitions), line)
+            left_parts.flush()
+
+            results = []
+            for i in range(partitions):
+                with open(tmp / f"right_{i}", "r", encoding="utf-8") as fh:
+                    exclude = {line.rstrip("\n") for line in fh}
+                result_path = tmp / f"result_{i}"
+                with open(tmp / f"left_{i}", "r", encoding="utf-8") as src, \
+                        open(result_path, "w", encoding="utf-8") as dst:
+                    for line in src:
+                        record = json.loads(line.split("\t", 1)[1])
+                        if _username(record) not in exclude:
+                            dst.write(line)
+                exclude = None
+                os.remove(tmp / f"left_{i}")
+                results.append(result_path)
+
+            # every partition's results are already in left order, merge them by the original index
+            results = _merge_runs(results, tmp)
+            with ExitStack() as stack:
+                handles = [stack.enter_context(open(p, "r", encoding="utf-8")) for p in results]
+                with open_writer(out_path, self.output_format) as out:
+                    for _, record in heapq.merge(*[_indexed(fh) for fh in handles], key=lambda pair: pair[0]):
+                        out.write(record)
+            return out.count
+
+
+class _PartitionFiles:
+    """appends lines to tmp/<prefix>_<i>, buffered in memory and written out one file at a time"""
+    def __init__(self, tmp: Path, prefix: str, count: int, buffer_bytes: int) -> None:
+        self.paths = [tmp / f"{prefix}_{i}" for i in range(count)]
+        for path in self.paths:
+            # an empty partition is still read back
+            path.touch()
+        self.buffer_bytes = buffer_bytes
+        self._buffers: List[List[str]] = [[] for _ in range(count)]
+        self._buffered = 0
+
+    def write(self, partition: int, line: str) -> None:
+        self._buffers[partition].append(line)
+        self._buffered += len(line)
+        if self._buffered >= self.buffer_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        for path, buffer in zip(self.paths, self._buffers):
+            if buffer:
+                with open(path, "a", encoding="utf-8") as fh:
+                    fh.writelines(buffer)
+                buffer.clear()
+        self._buffered = 0
+
+
+def _merge_runs(runs: List[Path], tmp: Path) -> List[Path]:
+    """merges index-ordered result files in groups until they can be merged into the output in one go"""
+    # one descriptor of the limit is the file being written
+    fan_in = max(2, _MAX_OPEN_FILES - 1)
+    generation = 0
+    while len(runs) > fan_in:
+        merged = []
+        for start in range(0, len(runs), fan_in):
+            group = runs[start:start + fan_in]
+            path = tmp / f"merged_{generation}_{start}"
+            with ExitStack() as stack:
+                handles = [stack.enter_context(open(p, "r", encoding="utf-8")) for p in group]
+                with open(path, "w", encoding="utf-8") as dst:
+                    # lines are merged as they are, the index in front is all the order needs
+                    dst.writelines(heapq.merge(*handles, key=_line_index))
+            for p in group:
+                os.remove(p)
+            merged.append(path)
+        runs = merged
+        generation += 1
+    return runs
+
+
+def _username(record: Dict):
+    # rows without a username (null, missing, empty) can't be compared, both paths skip them the way
+    # FollowerStore.add does
+    return record.get("username")
+
+
+def _partition(username: str, partitions: int) -> int:
+    # crc32 rather than hash(), which is salted per process
+    return zlib.crc32(username.encode("utf-8")) % partitions
+
+
+def _line_index(line: str) -> int:
+    return int(line.split("\t", 1)[0])
+
+
+def _indexed(fh) -> Iterator:
+    for line in fh:
+        index, payload = line.split("\t", 1)
+        yield int(index), json.loads(payload)
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Unfollows the accounts in they_dont_follow_back.json, within a rate budget, resumable across restarts.
+
+Every target that is finished (unfollowed, already not followed, or gone) is appended to the acting account's
+ledger file. a restart skips everything in the ledger, and today's unfollows in it count against the daily cap,
+so the job can simply be re-run every day until the list is done. failed targets are retried on the next run.
+
+Actions are spent from a token bucket (max_per_hour, burst) plus a random jitter, and the run stops at once
+if instagram shows its "Try Again Later" action block. nothing is done without a logged in page: against
+instagram the account's saved login is checked before the browser starts, and the run stops as soon as a page
+turns out to be logged out (where every profile shows "Follow").
+
+  python -m backend.services.instagram_scraper.unfollow_executor my_handle --targets they_dont_follow_back.json
+  python -m backend.services.instagram_scraper.unfollow_executor me --base-url http://127.0.0.1:8765 --max-per-hour 3600
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Dict, Iterable, Union
+
+from .account_scrape import INSTAGRAM_URL
+from .config import UnfollowConfig, UnfollowSelectors
+from .record_io import iter_records
+from .utils_logger import make_logger
+
+# ledger statuses that mean a target needs no more work
+FINISHED = ("unfollowed", "not_following", "not_found")
+
+
+class ActionBlocked(RuntimeError):
+    """instagram refused the action, continuing would only extend the block"""
+
+
+class LoggedOut(RuntimeError):
+    """the page is not logged in, no profile state can be trusted"""
+
+
+class TokenBucket:
+    def __init__(self, rate_per_s: float, capacity: int) -> None:
+        self.rate_per_s = rate_per_s
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate_per_s)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """takes one token, sleeping until one is available. returns the seconds waited"""
+        waited = 0.0
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            delay = (1 - self.tokens) / self.rate_per_s
+            await asyncio.sleep(delay)
+            waited += delay
+
+
+def _utc_day() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class UnfollowLedger:
+    """
+    append-only NDJSON record of finished (and failed) targets, the persistent half of the work queue.
+    every entry carries the acting account, entries of other accounts in the same file are ignored
+    """
+    def __init__(self, path: str, account: str) -> None:
+        self.path = Path(path)
+        self.account = account
+        # username -> latest entry
+        self.entries: Dict[str, Dict] = {}
+
+    def load(self) -> "UnfollowLedger":
+        if not self.path.exists():
+            return self
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # torn last line from a crash mid-write
+                    continue
+                if entry.get("account") == self.account:
+                    self.entries[entry["username"]] = entry
+        return self
+
+    def finished(self, username: str) -> bool:
+        entry = self.entries.get(username)
+        return entry is not None and entry["status"] in FINISHED
+
+    def count_today(self, status: str = "unfollowed") -> int:
+        today = _utc_day()
+        return sum(e["status"] == status and e["day"] == today for e in self.entries.values())
+
+    def record(self, username: str, status: str, detail: Optional[str] = None) -> Dict:
+        entry = {"account": self.account, "username": username, "status": status, "detail": detail,
+                 "at": time.time(), "day": _utc_day()}
+        # written and synced before moving on, a crash never loses a finished unfollow
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries[username] = entry
+        return entry
+
+
+class UnfollowExecutor:
+    """unfollows targets as `account`, whose logged in session `page` belongs to"""
+    def __init__(self, page, account: str, config: Optional[UnfollowConfig] = None,
+                 selectors: Optional[UnfollowSelectors] = None, base_url: str = INSTAGRAM_URL, logger=None) -> None:
+        self.page = page
+        self.account = account
+        self.config = config or UnfollowConfig()
+        self.sel = selectors or UnfollowSelectors()
+        self.base_url = base_url.rstrip("/")
+        self.log = logger or make_logger(name=f"unfollow_{account}", to_console=True, level="INFO")
+
+        self.ledger = UnfollowLedger(self.config.ledger_file.format(account=account), account)
+        self.bucket = TokenBucket(self.config.max_per_hour / 3600, self.config.burst)
+        self.stats = {"unfollowed": 0, "not_following": 0, "not_found": 0, "failed": 0}
+        self.action_seconds = 0.0
+        self.budget_wait_s = 0.0
+
+    # --------------------------
+    # One target
+    # --------------------------
+
+    async def _profile_state(self) -> str:
+        """following / requested / not_following / not_found / blocked / logged_out / unknown, in one round trip"""
+        sel = self.sel
+        return await self.page.evaluate(
+            """
+            ({ headerSel, followingText, requestedText, followTexts, blockedText, notFoundText, loggedOutSel }) => {
+                if (location.pathname.startsWith("/accounts/login") || document.querySelector(loggedOutSel)) {
+                    return "logged_out";
+                }
+                const body = document.body ? document.body.innerText : "";
+                if (body.includes(blockedText)) return "blocked";
+                if (body.includes(notFoundText)) return "not_found";
+                const header = document.querySelector(headerSel);
+                if (!header) return "unknown";
+                for (const b of header.querySelectorAll('button, [role="button"]')) {
+                    const text = b.innerText.trim();
+                    if (text === followingText) return "following";
+                    if (text === requestedText) return "requested";
+                    if (followTexts.includes(text)) return "not_following";
+                }
+                return "unknown";
+            }
+            """,
+            {
+                "headerSel": sel.profile_header_css,
+                "followingText": sel.following_text,
+                "requestedText": sel.requested_text,
+                "followTexts": list(sel.follow_texts),
+                "blockedText": sel.action_blocked_text,
+                "notFoundText": sel.not_found_text,
+                "loggedOutSel": sel.logged_out_css,
+            },
+        )
+
+    async def logged_in(self) -> bool:
+        """whether the page's session is logged in, checked on the home page"""
+        await self.page.goto(f"{self.base_url}/")
+        return await self._profile_state() != "logged_out"
+
+    async def _wait_for_state(self, states) -> str:
+        deadline = time.monotonic() + self.config.action_timeout_ms / 1000
+        while True:
+            state = await self._profile_state()
+            if state in states or time.monotonic() > deadline:
+                return state
+            await asyncio.sleep(0.1)
+
+    async def _click_following(self) -> None:
+        await self.page.evaluate(
+            """
+            ({ headerSel, followingText }) => {
+                const header = document.querySelector(headerSel);
+                for (const b of header.querySelectorAll('button, [role="button"]')) {
+                    if (b.innerText.trim() === followingText) { b.click(); return; }
+                }
+            }
+            """,
+            {"headerSel": self.sel.profile_header_css, "followingText": self.sel.following_text},
+        )
+
+    async def unfollow(self, username: str) -> str:
+        """returns the ledger status for one target, raises ActionBlocked when instagram refuses"""
+        timeout = self.config.action_timeout_ms
+        await self.page.goto(f"{self.base_url}/{username}/")
+        state = await self._wait_for_state(
+            ("following", "requested", "not_following", "not_found", "blocked", "logged_out")
+        )
+        if state == "blocked":
+            raise ActionBlocked(f"action block shown on {username}'s profile")
+        if state == "logged_out":
+            # without a login every profile shows "Follow", recording that would finish targets never unfollowed
+            raise LoggedOut(f"{username}'s profile was shown logged out")
+        if state in ("not_following", "not_found"):
+            return state
+        if state == "requested":
+            # a pending request to a private account is not a follow, leave it alone
+            return "not_following"
+        if state != "following":
+            raise RuntimeError(f"could not find the follow button on {username}'s profile")
+
+        self.budget_wait_s += await self.bucket.acquire()
+        if self.config.jitter_s:
+            await asyncio.sleep(random.uniform(0, self.config.jitter_s))
+
+        started = time.perf_counter()
+        await self._click_following()
+        confirm = self.page.locator(
+            f"{self.sel.confirm_dialog_css} button", has_text=self.sel.confirm_unfollow_text
+        ).first
+        await confirm.click(timeout=timeout)
+        state = await self._wait_for_state(("not_following", "blocked", "logged_out"))
+        self.action_seconds += time.perf_counter() - started
+        if state == "blocked":
+            raise ActionBlocked(f"action block shown while unfollowing {username}")
+        if state == "logged_out":
+            raise LoggedOut(f"logged out while unfollowing {username}")
+        if state != "not_following":
+            raise RuntimeError(f"{username} still shows {state!r} after confirming the unfollow")
+        return "unfollowed"
+
+    # --------------------------
+    # The queue
+    # --------------------------
+
+    async def run(self, targets: Iterable[Union[Dict, str]]) -> Dict:
+        self.ledger.load()
+        done_today = self.ledger.count_today()
+        started = time.perf_counter()
+        stop_reason = "done"
+        failures_in_row = 0
+        remaining = 0
+
+        if not await self.logged_in():
+            self.log.error(f"The page is not logged in as {self.account}, nothing will be unfollowed")
+            stop_reason = "logged_out"
+
+        for target in targets:
+            username = target if isinstance(target, str) else target.get("username")
+            if not username or self.ledger.finished(username):
+                continue
+            if stop_reason != "done":
+                remaining += 1
+                continue
+            if done_today >= self.config.daily_cap:
+                self.log.info(f"Daily cap of {self.config.daily_cap} unfollows reached, continue tomorrow")
+                stop_reason = "daily_cap"
+                remaining += 1
+                continue
+
+            try:
+                status = await self.unfollow(username)
+                failures_in_row = 0
+                self.ledger.record(username, status)
+                self.stats[status] += 1
+                if status == "unfollowed":
+                    done_today += 1
+                self.log.info(f"{username}: {status} ({done_today}/{self.config.daily_cap} today)")
+            except ActionBlocked as e:
+                self.log.error(f"Stopping, instagram blocked the action: {e}")
+                stop_reason = "action_blocked"
+                remaining += 1
+            except LoggedOut as e:
+                self.log.error(f"Stopping, the session is gone: {e}")
+                stop_reason = "logged_out"
+                remaining += 1
+            except Exception as e:
+                # recorded but not finished, the next run retries it
+                self.ledger.record(username, "failed", f"{type(e).__name__}: {e}")
+                self.stats["failed"] += 1
+                failures_in_row += 1
+                self.log.warning(f"{username}: failed ({e})")
+                if failures_in_row >= self.config.max_consecutive_failures:
+                    self.log.error(f"Stopping after {failures_in_row} failures in a row")
+                    stop_reason = "too_many_failures"
+
+        report = self.report(time.perf_counter() - started, stop_reason, remaining, done_today)
+        if self.config.report_file:
+            report_file = Path(self.config.report_file.format(account=self.account))
+            report_file.write_text(json.dumps(report, indent=4), encoding="utf-8")
+        return report
+
+    def report(self, elapsed: float, stop_reason: str, remaining: int, done_today: int) -> Dict:
+        unfollowed = self.stats["unfollowed"]
+        return {
+            "account": self.account,
+            "stop_reason": stop_reason,
+            "elapsed_s": round(elapsed, 2),
+            **self.stats,
+            "remaining": remaining,
+            "unfollowed_today": done_today,
+            "daily_cap": self.config.daily_cap,
+            "unfollows_per_hour": round(unfollowed / elapsed * 3600, 1) if elapsed else None,
+            # click to confirmed, excluding the budget wait and jitter
+            "mean_action_s": round(self.action_seconds / unfollowed, 3) if unfollowed else None,
+            "budget_wait_s": round(self.budget_wait_s, 2),
+        }
+
+
+async def main(args) -> None:
+    from .session_manager import session_manager, SessionError
+
+    config = UnfollowConfig(
+        max_per_hour=args.max_per_hour, burst=args.burst, daily_cap=args.daily_cap, jitter_s=args.jitter_s,
+        ledger_file=args.ledger, report_file=args.report,
+    )
+    # a missing, expired or rejected login stops here, before chromium is even started
+    sessions = session_manager()
+    try:
+        if args.base_url.rstrip("/") == INSTAGRAM_URL:
+            session = sessions.check(args.username)
+            await sessions.preflight(session)
+        else:
+            session = sessions.session(args.username)
+    except SessionError as e:
+        raise SystemExit(f"[error] {e}")
+
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=not args.headed)
+        auth = session.auth_options() if session else {}
+        context = await browser.new_context(storage_state=auth.get("storage_state"))
+        if auth.get("cookies"):
+            await context.add_cookies(auth["cookies"])
+        page = await context.new_page()
+        executor = UnfollowExecutor(page, args.username, config, base_url=args.base_url)
+        report = await executor.run(iter_records(args.targets))
+        await browser.close()
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("username", help="the account doing the unfollowing (its saved session is used)")
+    parser.add_argument("--targets", default="they_dont_follow_back.json", help="any record_io format")
+    parser.add_argument("--max-per-hour", type=float, default=UnfollowConfig.max_per_hour)
+    parser.add_argument("--burst", type=int, default=UnfollowConfig.burst)
+    parser.add_argument("--daily-cap", type=int, default=UnfollowConfig.daily_cap)
+    parser.add_argument("--jitter-s", type=float, default=UnfollowConfig.jitter_s)
+    parser.add_argument("--ledger", default=UnfollowConfig.ledger_file, help="{account} is replaced by the username")
+    parser.add_argument("--report", default=UnfollowConfig.report_file, help="{account} is replaced by the username")
+    parser.add_argument("--base-url", default=INSTAGRAM_URL)
+    parser.add_argument("--headed", action="store_true")
+    asyncio.run(main(parser.parse_args()))
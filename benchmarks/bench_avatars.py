@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Throughput and cache hit rate of AvatarCache against the local fixture's avatar endpoint.
+
+For every --concurrency value a fresh cache is filled from cold, then the same list is fetched again with
+re-signed urls (a different query string, the way instagram's cdn urls change between scrapes), which should be
+all hits. `--variants` distinct images are spread over the urls, so the number of objects on disk shows the
+dedup at work.
+
+Run from the repo root:
+  python -m benchmarks.bench_avatars --avatars 2000 --variants 500 --avatar-latency-ms 40 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+from pathlib import Path
+
+from backend.services.instagram_scraper.avatar_cache import AvatarCache
+from benchmarks.fixture_server import FixtureConfig, FixtureServer, make_user
+
+
+def snapshot(base_url: str, n: int, signature: str) -> list:
+    records = []
+    for i in range(n):
+        user = make_user("followers", i)
+        records.append({"username": user["username"], "profilePic": f"{base_url}{user['profile_pic_url']}?oe={signature}"})
+    return records
+
+
+async def main(args) -> list:
+    fixture = FixtureConfig(avatar_variants=args.variants, avatar_latency_ms=args.avatar_latency_ms)
+    quiet = logging.getLogger("bench_avatars")
+    quiet.addHandler(logging.NullHandler())
+    quiet.propagate = False
+    results = []
+    with FixtureServer(fixture) as server, tempfile.TemporaryDirectory() as tmp:
+        for concurrency in args.concurrency:
+            cache_dir = Path(tmp) / f"c{concurrency}"
+            cold = await AvatarCache(str(cache_dir), concurrency=concurrency, logger=quiet).fetch_all(
+                snapshot(server.base_url, args.avatars, "first")
+            )
+            # a new instance, so the warm run reads the url map back from disk like a later process would
+            warm = await AvatarCache(str(cache_dir), concurrency=concurrency, logger=quiet).fetch_all(
+                snapshot(server.base_url, args.avatars, "resigned")
+            )
+            objects = sum(1 for p in (cache_dir / "objects").rglob("*") if p.is_file())
+            results.append({"concurrency": concurrency, "cold": cold, "warm": warm, "objects_on_disk": objects})
+
+    print(f"{'conc':>5} {'cold s':>8} {'dl/s':>8} {'MiB/s':>7} {'failed':>6} {'dupes':>6} {'objects':>7} "
+          f"{'warm s':>8} {'warm hit':>8}")
+    for r in results:
+        cold, warm = r["cold"], r["warm"]
+        print(f"{r['concurrency']:>5} {cold['elapsed_s']:>8.2f} {cold['downloads_per_s'] or 0:>8.1f} "
+              f"{cold['mb_per_s'] or 0:>7.2f} {cold['failed']:>6} {cold['deduplicated']:>6} {r['objects_on_disk']:>7} "
+              f"{warm['elapsed_s']:>8.3f} {warm['hit_rate'] or 0:>8.3f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"fixture": vars(args), "results": results}, indent=4), encoding="utf-8")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--avatars", type=int, default=2_000)
+    parser.add_argument("--variants", type=int, default=500, help="distinct images among the avatars")
+    parser.add_argument("--avatar-latency-ms", type=int, default=40, help="server think time per avatar")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args()
+    asyncio.run(main(args))
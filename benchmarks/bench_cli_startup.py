@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Wall-clock startup of the non-browser CLI commands, each in a fresh interpreter.
+
+Compares `main.py --help`, `analyze` on small synthetic lists and `diff` against an empty history database with
+the bare interpreter and with the imports main.py used to do eagerly (playwright, requests and every scraper
+module) before its first prompt. the eager row is skipped when playwright / requests are not installed.
+
+Run from the repo root:
+  python -m benchmarks.bench_cli_startup --repeat 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from backend.services.instagram_scraper.record_io import write_records
+from backend.services.instagram_scraper.snapshot_store import SnapshotStore
+
+REPO = Path(__file__).resolve().parent.parent
+
+# what main.py imported at the top before it became a CLI
+EAGER_IMPORTS = (
+    "import requests, playwright.async_api;"
+    "import backend.services.instagram_scraper.account_scrape, backend.services.instagram_scraper.cookie_store,"
+    " backend.services.instagram_scraper.follower_analyzer, backend.services.instagram_scraper.lean_profile,"
+    " backend.services.instagram_scraper.snapshot_store"
+)
+
+
+def synthetic(kind: str, n: int):
+    for i in range(n):
+        yield {"username": f"{kind}_{i}" if i % 2 else f"user_{i}", "name": f"User {i}", "profilePic": None,
+               "verified": False}
+
+
+def time_command(argv, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run(argv, cwd=REPO, capture_output=True)
+        samples.append(time.perf_counter() - started)
+        if proc.returncode != 0:
+            return None, proc.stderr.decode("utf-8", "replace").strip().splitlines()[-1:]
+    return samples, None
+
+
+def main(args) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_records(tmp / "followers.json", synthetic("followers", args.records))
+        write_records(tmp / "following.json", synthetic("following", args.records))
+        with SnapshotStore(str(tmp / "snapshots.db")):
+            pass
+
+        commands = {
+            "python -c pass": [sys.executable, "-c", "pass"],
+            "eager imports (old main.py)": [sys.executable, "-c", EAGER_IMPORTS],
+            "main.py --help": [sys.executable, "main.py", "--help"],
+            f"main.py analyze ({args.records} rows)": [
+                sys.executable, "main.py", "analyze", "--followers", str(tmp / "followers.json"),
+                "--following", str(tmp / "following.json"), "--output-dir", str(tmp / "out"),
+            ],
+            "main.py diff": [sys.executable, "main.py", "diff", "nobody", "--report", "snapshots",
+                             "--db", str(tmp / "snapshots.db")],
+        }
+        print(f"{'command':<36} {'median ms':>10} {'min ms':>8}")
+        for name, argv in commands.items():
+            samples, error = time_command(argv, args.repeat)
+            if samples is None:
+                print(f"{name:<36} {'skipped':>10}  {' '.join(error)}")
+                results[name] = None
+                continue
+            results[name] = {"median_ms": round(statistics.median(samples) * 1000, 1),
+                             "min_ms": round(min(samples) * 1000, 1)}
+            print(f"{name:<36} {results[name]['median_ms']:>10.1f} {results[name]['min_ms']:>8.1f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"args": vars(args), "results": results}, indent=4), encoding="utf-8")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--records", type=int, default=1_000, help="rows per synthetic list for analyze")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    main(parser.parse_args())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Memory and throughput of FollowerStore against the json.dumps based dedup the live scraper used before.
+
+Every synthetic row is offered `--passes` times, the way rows already in the modal came back on each re-parse.
+
+Run from the repo root:
+  python -m benchmarks.bench_follower_store --records 1000000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from backend.services.instagram_scraper.follower_analyzer import FollowerAnalyzer
+from backend.services.instagram_scraper.follower_store import FollowerStore
+
+
+def synthetic_rows(n: int):
+    for i in range(n):
+        yield {
+            "username": f"user_{i}",
+            "name": f"User Number {i}",
+            "profilePic": f"https://scontent.cdninstagram.com/v/t51.2885-19/{i}_n.jpg?stp=dst-jpg_s150x150&_nc_ht=x",
+            "verified": i % 50 == 0,
+        }
+
+
+class LegacyDedup:
+    """the previous LiveInstagramFollowerScraper.add_unique_follower"""
+    def __init__(self) -> None:
+        self.follower_list = []
+        self.follower_set = set()
+
+    def add(self, f) -> bool:
+        key = json.dumps(f, sort_keys=True)
+        if key not in self.follower_set:
+            self.follower_set.add(key)
+            self.follower_list.append(f)
+            return True
+        return False
+
+
+def measure(label: str, make, add, n: int, passes: int):
+    # timed without tracemalloc, it slows allocation heavy code down several times over
+    gc.collect()
+    target = make()
+    t0 = time.perf_counter()
+    for _ in range(passes):
+        for row in synthetic_rows(n):
+            add(target, row)
+    elapsed = time.perf_counter() - t0
+    del target
+
+    gc.collect()
+    tracemalloc.start()
+    target = make()
+    for row in synthetic_rows(n):
+        add(target, row)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rows = n * passes
+    print(f"{label:<14} {elapsed:>8.2f} s {rows / elapsed / 1e6:>8.2f} M rows/s "
+          f"{held / 2**20:>9.1f} MiB held {peak / 2**20:>9.1f} MiB peak")
+    return target
+
+
+def main(n: int, passes: int) -> None:
+    print(f"{n:,} records x {passes} passes")
+    measure("json.dumps set", LegacyDedup, LegacyDedup.add, n, passes)
+    store = measure("FollowerStore", FollowerStore, FollowerStore.add, n, passes)
+    assert len(store) == n
+
+    # the analyzer consumes the store directly, without a list of dicts or a username set in between
+    t0 = time.perf_counter()
+    following = FollowerStore(row for i, row in enumerate(synthetic_rows(n)) if i % 3)
+    analyzer = FollowerAnalyzer(store, following)
+    print(f"analyzer: {len(analyzer.compute_they_dont_follow_back())} / "
+          f"{len(analyzer.compute_you_dont_follow_back())} in {time.perf_counter() - t0:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--passes", type=int, default=2)
+    args = parser.parse_args()
+    main(args.records, args.passes)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Bytes transferred and renderer CPU for a follower-modal scroll with the lean scrape profile on and off.
+
+Opens the followers modal of an account with its saved cookies, does the same fixed number of scroll steps
+in both profiles and reports:
+  - bytes received over the network (sum of CDP Network.loadingFinished encodedDataLength)
+  - renderer CPU from CDP Performance.getMetrics (TaskDuration, ScriptDuration, LayoutDuration, RecalcStyleDuration)
+  - rows rendered and profile pic urls present, to check the lean profile loses no data
+
+Run from the repo root (needs a cookie file from instagram_cookie_fetcher.py):
+  python -m benchmarks.bench_lean_profile my_handle --scrolls 60
+  python -m benchmarks.bench_lean_profile my_handle --base-url http://127.0.0.1:8765   # local fixture
+"""
+import argparse
+import asyncio
+import time
+from playwright.async_api import async_playwright
+
+from backend.services.instagram_scraper.account_scrape import open_follow_list, INSTAGRAM_URL
+from backend.services.instagram_scraper.config import ScrapeConfig, Selectors
+from backend.services.instagram_scraper.cookie_store import find_user_cookies, load_cookies
+from backend.services.instagram_scraper.lean_profile import launch_options, apply_lean_routes
+from backend.services.instagram_scraper.scroll_step import ScrollStepper
+
+CPU_METRICS = ("TaskDuration", "ScriptDuration", "LayoutDuration", "RecalcStyleDuration")
+
+
+async def measure(p, username: str, lean: bool, scrolls: int, base_url: str, headless: bool) -> dict:
+    config = ScrapeConfig(lean_profile=lean)
+    options = launch_options(config)
+    if not lean:
+        # compare like for like, only the lean routes and smooth scrolling differ
+        options["headless"] = headless
+    browser = await p.chromium.launch(**options)
+    context = await browser.new_context()
+    if lean:
+        await apply_lean_routes(context)
+    cookie_file = find_user_cookies(username)
+    if cookie_file:
+        await context.add_cookies(load_cookies(cookie_file))
+
+    page = await context.new_page()
+    cdp = await context.new_cdp_session(page)
+    received = {"bytes": 0, "requests": 0, "blocked": 0}
+
+    def on_finished(event):
+        received["bytes"] += event.get("encodedDataLength", 0)
+        received["requests"] += 1
+
+    def on_failed(event):
+        received["blocked"] += 1
+
+    cdp.on("Network.loadingFinished", on_finished)
+    cdp.on("Network.loadingFailed", on_failed)
+    await cdp.send("Network.enable")
+    await cdp.send("Performance.enable")
+
+    sel = Selectors()
+    await open_follow_list(page, username, "followers", base_url, sel)
+    before = {m["name"]: m["value"] for m in (await cdp.send("Performance.getMetrics"))["metrics"]}
+
+    stepper = ScrollStepper(sel, config.step_settle_ms, smooth=not lean)
+    t0 = time.perf_counter()
+    status = None
+    for _ in range(scrolls):
+        status = await stepper.step(page, config.scroll_delta)
+        await asyncio.sleep(config.cooldown_s)
+    wall = time.perf_counter() - t0
+
+    after = {m["name"]: m["value"] for m in (await cdp.send("Performance.getMetrics"))["metrics"]}
+    pics = await page.evaluate(
+        "(sel) => Array.from(document.querySelectorAll(sel)).filter(r => r.querySelector('img')?.src).length",
+        sel.follower_item_css,
+    )
+    await browser.close()
+
+    result = {
+        "profile": "lean" if lean else "default",
+        "wall_s": wall,
+        "rows": status.row_count if status else 0,
+        "rows_with_pic_url": pics,
+        **received,
+    }
+    for name in CPU_METRICS:
+        result[name] = after.get(name, 0) - before.get(name, 0)
+    return result
+
+
+async def main(username: str, scrolls: int, base_url: str, headless: bool) -> None:
+    async with async_playwright() as p:
+        results = [
+            await measure(p, username, False, scrolls, base_url, headless),
+            await measure(p, username, True, scrolls, base_url, headless),
+        ]
+
+    print(f"\n{'':<22}" + "".join(f"{r['profile']:>14}" for r in results))
+    print(f"{'MiB received':<22}" + "".join(f"{r['bytes'] / 2**20:>14.2f}" for r in results))
+    for key in ("requests", "blocked", "rows", "rows_with_pic_url"):
+        print(f"{key:<22}" + "".join(f"{r[key]:>14}" for r in results))
+    for key in CPU_METRICS + ("wall_s",):
+        print(f"{key + ' (s)' if key != 'wall_s' else key:<22}" + "".join(f"{r[key]:>14.2f}" for r in results))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("username")
+    parser.add_argument("--scrolls", type=int, default=60)
+    parser.add_argument("--base-url", default=INSTAGRAM_URL)
+    parser.add_argument("--headed", action="store_true", help="run the default profile headed, like main.py does")
+    args = parser.parse_args()
+    asyncio.run(main(args.username, args.scrolls, args.base_url, not args.headed))
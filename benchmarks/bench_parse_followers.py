@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark of InstagramFollowerScraper._parse_followers against the number of rows in the follower dialog.
+
+Builds a synthetic follower dialog (same Selectors classes as instagram, with a "Suggested for you" section
+and some page chrome around it) and times the old whole-document extractor against the scoped one.
+
+Run from the repo root:
+  python -m benchmarks.bench_parse_followers --rows 1000 5000 20000
+"""
+import argparse
+import asyncio
+import html
+import time
+from playwright.async_api import async_playwright
+
+from backend.services.instagram_scraper.config import Selectors
+from backend.services.instagram_scraper.follower_scraper import InstagramFollowerScraper
+from benchmarks.fixture_server import class_attr
+
+# the extractor _parse_followers used before it was scoped to the dialog, kept here for comparison
+LEGACY_PARSE_JS = """
+({ itemSel, linkSel, nameSel, verifySel }) => {
+    const allEls = Array.from(document.querySelectorAll('*'));
+    const stopIndex = allEls.findIndex(
+        el => el.tagName.toLowerCase() === 'h4' && el.textContent.includes('Suggested for you')
+    );
+    const limit = stopIndex !== -1 ? stopIndex : allEls.length;
+    const beforeSuggested = allEls.slice(0, limit).filter(el => el.matches(itemSel));
+    return beforeSuggested.map(el => {
+        const a = el.querySelector(linkSel);
+        const nameEl = el.querySelector(nameSel);
+        const isVerified = !!el.querySelector(verifySel);
+        const img = a?.querySelector?.('img') ?? el.querySelector('span[role="link"] img') ?? null;
+        let username = null;
+        if (a) {
+            const href = a.getAttribute('href') || "";
+            username = href.replace(/^\\/+|\\/+$/g, '');
+        }
+        return {
+            username,
+            name: nameEl ? nameEl.textContent.trim() : null,
+            profilePic: img ? img.src : null,
+            verified: isVerified
+        };
+    });
+}
+"""
+
+
+def build_dialog_html(rows: int, suggested: int = 30, sel: Selectors = Selectors()) -> str:
+    item_cls = class_attr(sel.follower_item_css)
+    name_cls = class_attr(sel.follower_name_css)
+    row_cls = class_attr(sel.follower_row_css)
+    scroll_cls = class_attr(sel.scroll_container_css)
+
+    def row(i: int) -> str:
+        verified = '<svg aria-label="Verified"></svg>' if i % 17 == 0 else ""
+        # instagram nests every row several levels deep, mimic that so node counts are realistic
+        return (
+            f'<div><div><div class="{item_cls}"><div><div>'
+            f'<a role="link" href="/user_{i}/"><img src="data:image/gif;base64,R0lGODlhAQABAAAAACw="></a>'
+            f'</div><div><div><span><span class="{name_cls}">User {i}</span></span>{verified}</div>'
+            f'<div><span>user_{i}</span></div></div></div></div></div></div>'
+        )
+
+    chrome = "".join(f"<div><span>nav {i}</span></div>" for i in range(200))
+    body = "".join(row(i) for i in range(rows))
+    suggested_rows = "".join(row(rows + i) for i in range(suggested))
+    return (
+        f"<html><body><main>{chrome}</main>"
+        f'<div role="dialog"><input aria-label="Search input">'
+        f'<div class="{scroll_cls}">{body}'
+        f'<div class="{row_cls}"></div>'
+        f"<h4>{html.escape(sel.suggested_heading_text)}</h4>{suggested_rows}</div></div>"
+        f"</body></html>"
+    )
+
+
+async def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+async def main(row_counts, repeat: int) -> None:
+    sel = Selectors()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        scraper = InstagramFollowerScraper(page, selectors=sel)
+        args = {
+            "itemSel": sel.follower_item_css,
+            "linkSel": sel.follower_link_css,
+            "nameSel": sel.follower_name_css,
+            "verifySel": sel.verified_bage_css,
+        }
+
+        print(f"{'rows':>8} {'legacy ms':>10} {'scoped ms':>10} {'speedup':>8}")
+        for n in row_counts:
+            await page.set_content(build_dialog_html(n, sel=sel))
+
+            legacy = await page.evaluate(LEGACY_PARSE_JS, args)
+            scoped = await scraper._parse_followers()
+            assert legacy == scoped, "scoped extractor output differs from the legacy extractor"
+            assert len(scoped) == n
+
+            t_legacy = await _time(lambda: page.evaluate(LEGACY_PARSE_JS, args), repeat)
+            t_scoped = await _time(scraper._parse_followers, repeat)
+            print(f"{n:>8} {t_legacy * 1000:>10.1f} {t_scoped * 1000:>10.1f} {t_legacy / t_scoped:>7.1f}x")
+
+        await browser.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 5_000, 10_000, 20_000, 40_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
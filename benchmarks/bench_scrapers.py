@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+End to end scraper benchmark against the local fixture (benchmarks/fixture_server.py), no instagram account needed.
+
+Every scraper mode scrapes the same synthetic follower list and reports:
+  - wall time and rows/s
+  - page calls (evaluate, query_selector, wait_for_*, ...) per scroll step, each one is at least one CDP round trip
+  - python peak memory (tracemalloc) and the renderer's peak JSHeapUsedSize (sampled over CDP)
+  - rows captured vs rows served, a mode that loses rows is reported as failed
+  - with --json, each run's per-phase timing report from metrics.py
+
+Run from the repo root:
+  python -m benchmarks.bench_scrapers --followers 3000 --latency-ms 120
+  python -m benchmarks.bench_scrapers --modes live+incremental network --virtualize 60 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from pathlib import Path
+from playwright.async_api import async_playwright
+
+from backend.services.instagram_scraper.account_scrape import open_follow_list
+from backend.services.instagram_scraper.config import ScrapeConfig
+from backend.services.instagram_scraper.follower_scraper import InstagramFollowerScraper
+from backend.services.instagram_scraper.follower_scraper_live import LiveInstagramFollowerScraper
+from backend.services.instagram_scraper.follower_scraper_network import NetworkInstagramFollowerScraper
+from backend.services.instagram_scraper.utils_logger import make_logger
+from benchmarks.fixture_server import FixtureServer, FixtureConfig
+
+# mode name -> scraper class and the config switches it turns on
+MODES = {
+    "dom": (InstagramFollowerScraper, {}),
+    "dom+events": (InstagramFollowerScraper, {"event_driven": True}),
+    "live": (LiveInstagramFollowerScraper, {}),
+    "live+incremental": (LiveInstagramFollowerScraper, {"incremental_capture": True}),
+    "live+incremental+events": (LiveInstagramFollowerScraper, {"incremental_capture": True, "event_driven": True}),
+    "network": (NetworkInstagramFollowerScraper, {}),
+    "live+incremental+prune": (
+        LiveInstagramFollowerScraper, {"incremental_capture": True, "prune_captured_rows": True}
+    ),
+    # adaptive pacing next to the fixed delta / cooldown modes it replaces
+    "dom+adaptive": (InstagramFollowerScraper, {"adaptive_pacing": True}),
+    "live+incremental+adaptive": (LiveInstagramFollowerScraper, {"incremental_capture": True, "adaptive_pacing": True}),
+    "live+incremental+events+adaptive": (
+        LiveInstagramFollowerScraper, {"incremental_capture": True, "event_driven": True, "adaptive_pacing": True}
+    ),
+}
+
+COUNTED_CALLS = (
+    "evaluate", "evaluate_handle", "query_selector", "query_selector_all", "wait_for_selector",
+    "wait_for_function", "wait_for_timeout", "expose_binding", "expose_function", "focus", "click",
+)
+
+
+class CountingPage:
+    """wraps a playwright page and counts the calls a scraper makes through it"""
+    def __init__(self, page) -> None:
+        self._page = page
+        self.calls = {}
+
+    def __getattr__(self, name):
+        attr = getattr(self._page, name)
+        if name not in COUNTED_CALLS:
+            return attr
+
+        def counted(*args, **kwargs):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return attr(*args, **kwargs)
+        return counted
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+
+async def _sample_js_heap(session, stop: asyncio.Event, interval_s: float = 0.25) -> float:
+    peak = 0.0
+    while not stop.is_set():
+        metrics = await session.send("Performance.getMetrics")
+        for m in metrics["metrics"]:
+            if m["name"] == "JSHeapUsedSize":
+                peak = max(peak, m["value"])
+        try:
+            await asyncio.wait_for(stop.wait(), interval_s)
+        except asyncio.TimeoutError:
+            pass
+    return peak
+
+
+async def run_mode(browser, base_url: str, mode: str, expected: int, base_config: ScrapeConfig, tmp: Path) -> dict:
+    ScraperClass, switches = MODES[mode]
+    metrics_file = tmp / f"{mode}.metrics.json"
+    config = replace(base_config, write_file=str(tmp / f"{mode}.json"), metrics_file=str(metrics_file), **switches)
+    logger = make_logger(name=f"bench_{mode}", to_console=False, level="WARNING")
+
+    context = await browser.new_context()
+    raw_page = await context.new_page()
+    page = CountingPage(raw_page)
+    session = await context.new_cdp_session(raw_page)
+    await session.send("Performance.enable")
+
+    scraper = ScraperClass(page, config=config, logger=logger)
+    scrolls = 0
+    step = scraper.stepper.step
+
+    async def counted_step(*args, **kwargs):
+        nonlocal scrolls
+        scrolls += 1
+        return await step(*args, **kwargs)
+    scraper.stepper.step = counted_step
+
+    if isinstance(scraper, NetworkInstagramFollowerScraper):
+        scraper.attach()
+    await open_follow_list(page, "bench", "followers", base_url)
+    # only the scrape itself is counted, not opening the modal
+    page.calls.clear()
+
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_js_heap(session, stop))
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    rows = await scraper.run()
+    elapsed = time.perf_counter() - t0
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stop.set()
+    js_peak = await sampler
+    await context.close()
+
+    captured = len({r["username"] for r in rows if r.get("username")})
+    return {
+        "mode": mode,
+        "ok": captured == expected,
+        "rows": captured,
+        "expected": expected,
+        "seconds": round(elapsed, 3),
+        "rows_per_s": round(captured / elapsed, 1) if elapsed else None,
+        "scrolls": scrolls,
+        "scrolls_per_row": round(scrolls / captured, 3) if captured else None,
+        "page_calls": page.total_calls,
+        "calls_per_scroll": round(page.total_calls / scrolls, 2) if scrolls else None,
+        "call_breakdown": dict(page.calls),
+        "py_peak_mib": round(py_peak / 2**20, 2),
+        "js_heap_peak_mib": round(js_peak / 2**20, 2),
+        "metrics": json.loads(metrics_file.read_text(encoding="utf-8")) if metrics_file.exists() else None,
+    }
+
+
+async def main(args) -> list:
+    fixture = FixtureConfig(
+        followers=args.followers, batch=args.batch, latency_ms=args.latency_ms, virtualize=args.virtualize,
+    )
+    # a short quiet window keeps the tail of every run small, the fixture answers well within it
+    base_config = ScrapeConfig(quiet_ms=args.quiet_ms, log_level="WARNING")
+    results = []
+    with FixtureServer(fixture) as server, tempfile.TemporaryDirectory() as tmp:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=not args.headed)
+            for mode in args.modes:
+                for _ in range(args.repeat):
+                    results.append(await run_mode(browser, server.base_url, mode, args.followers, base_config, Path(tmp)))
+            await browser.close()
+
+    print(f"{'mode':<34} {'ok':<3} {'rows':>6} {'s':>7} {'rows/s':>8} {'scrolls':>7} {'scroll/row':>10} "
+          f"{'calls/scroll':>12} {'py MiB':>7} {'js MiB':>7}")
+    for r in results:
+        print(f"{r['mode']:<34} {'y' if r['ok'] else 'n':<3} {r['rows']:>6} {r['seconds']:>7.2f} {r['rows_per_s']:>8.1f} "
+              f"{r['scrolls']:>7} {r['scrolls_per_row'] or 0:>10.3f} {r['calls_per_scroll'] or 0:>12.2f} "
+              f"{r['py_peak_mib']:>7.2f} {r['js_heap_peak_mib']:>7.2f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"fixture": vars(args), "results": results}, indent=4), encoding="utf-8")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--followers", type=int, default=2_000)
+    parser.add_argument("--batch", type=int, default=12, help="rows per lazy-loaded page")
+    parser.add_argument("--latency-ms", type=int, default=150, help="server think time per page")
+    parser.add_argument("--virtualize", type=int, default=0, help="keep only the newest N rows in the DOM")
+    parser.add_argument("--quiet-ms", type=int, default=1_500)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args()
+    asyncio.run(main(args))
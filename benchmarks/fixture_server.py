@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an instagram profile and its follower / following dialog, for offline benchmarks.
+
+The markup uses the same Selectors classes the scrapers look for: the scroll container, the loading-state row,
+the "Search input" anchor, follower rows and a "Suggested for you" section below the list. rows are lazy loaded
+when the list is wheeled / scrolled near its bottom: the loading graphic is shown, the page waits `latency_ms`,
+then fetches the next page from /api/v1/friendships/<id>/<kind>/ (the same paginated JSON the network scraper
+decodes) and renders it. with `virtualize` only the newest N rows stay in the DOM.
+
+  python -m benchmarks.fixture_server --followers 5000 --batch 12 --latency-ms 150
+  # then point any scraper at http://127.0.0.1:8765/<any username>
+
+`recorded_dir` replays recorded API pages (page_0.json, page_1.json, ... in the order they were captured, per kind
+in recorded_dir/<kind>/ or shared in recorded_dir/) instead of generating users. instagram's cursors are opaque,
+so each page is found by the next_max_id of the page before it, an unknown cursor is a 404.
+
+Profiles also carry a follow button for the unfollow executor. its state comes from the username:
+gone_* -> page not available, requested_* -> "Requested", fan_* -> "Follow Back", anything else -> "Following"
+until unfollowed through the confirm dialog. with `block_after` the server answers every unfollow after the
+first N with 429 and the page shows instagram's "Try Again Later" dialog. with `logged_in=False` every page
+looks logged out: the home page is a login form and profiles show "Follow" next to a "Log in" link.
+"""
+import argparse
+import html
+import json
+import threading
+import time
+import zlib
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Optional, Dict
+from urllib.parse import urlparse, parse_qs
+
+from backend.services.instagram_scraper.config import Selectors
+
+# 1x1 gif, avatars are served as real responses so blocked / transferred bytes can be measured
+_AVATAR = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b") * 40
+
+
+def class_attr(css: str) -> str:
+    """turns '.a.b' or '[class="a b"]' into the plain class attribute value"""
+    if css.startswith('[class="'):
+        return css[len('[class="'):-2]
+    return " ".join(part for part in css.split(".") if part)
+
+
+@dataclass
+class FixtureConfig:
+    followers: int = 2_000
+    following: int = 1_500
+    batch: int = 12
+    latency_ms: int = 150
+    virtualize: int = 0
+    suggested: int = 10
+    # how close to the bottom (px) a scroll has to get before the next page is requested
+    threshold_px: int = 400
+    recorded_dir: Optional[str] = None
+    # unfollows accepted before every further one is rate limited, 0 = never
+    block_after: int = 0
+    # False serves every page the way instagram shows it to a visitor without a session
+    logged_in: bool = True
+    # avatars come in this many distinct byte strings (1 = every avatar is the same image),
+    # each answered after avatar_latency_ms like a slow CDN
+    avatar_variants: int = 1
+    avatar_latency_ms: int = 0
+
+
+def make_user(kind: str, i: int) -> dict:
+    return {
+        "pk": str(1_000_000 + i if kind == "followers" else 2_000_000 + i),
+        "username": f"{kind}_user_{i}",
+        "full_name": f"{kind.title()} User {i}",
+        "profile_pic_url": f"/avatars/{kind}_{i}.gif",
+        "is_verified": i % 17 == 0,
+    }
+
+
+@lru_cache(maxsize=None)
+def recorded_pages(recorded_dir: str, kind: str) -> Dict[str, Path]:
+    """cursor -> recorded page file. the first page answers a request without a cursor (or the fixture's "0")"""
+    folder = Path(recorded_dir) / kind
+    if not folder.is_dir():
+        folder = Path(recorded_dir)
+    pages, cursor, index = {}, "", 0
+    while (folder / f"page_{index}.json").exists():
+        path = folder / f"page_{index}.json"
+        pages[cursor] = path
+        cursor = json.loads(path.read_text(encoding="utf-8")).get("next_max_id")
+        if not cursor:
+            break
+        index += 1
+    if "" in pages:
+        pages["0"] = pages[""]
+    return pages
+
+
+def api_page(config: FixtureConfig, kind: str, max_id: str, count: int) -> Optional[dict]:
+    """one page of the list starting at cursor max_id, None for a cursor the fixture never handed out"""
+    if config.recorded_dir:
+        path = recorded_pages(config.recorded_dir, kind).get(max_id)
+        return json.loads(path.read_text(encoding="utf-8")) if path else None
+    if not max_id:
+        max_id = "0"
+    if not max_id.isdigit():
+        return None
+    max_id = int(max_id)
+    total = config.followers if kind == "followers" else config.following
+    end = min(total, max_id + count)
+    return {
+        "users": [make_user(kind, i) for i in range(max_id, end)],
+        "next_max_id": str(end) if end < total else None,
+        "big_list": end < total,
+        "status": "ok",
+    }
+
+
+def follow_state(username: str, unfollowed) -> Optional[str]:
+    """text of the profile's follow button, None for an account that does not exist"""
+    if username.startswith("gone_"):
+        return None
+    if username in unfollowed:
+        return "Follow"
+    if username.startswith("requested_"):
+        return "Requested"
+    if username.startswith("fan_"):
+        return "Follow Back"
+    return "Following"
+
+
+HOME_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Instagram</title></head>
+<body><main><h2>Home</h2></main></body></html>
+"""
+
+LOGIN_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Login</title></head>
+<body><main><form><input name="username"><input name="password" type="password">
+<button type="submit">Log in</button></form></main></body></html>
+"""
+
+NOT_FOUND_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Page not found</title></head>
+<body><main><h2>Sorry, this page isn't available.</h2></main></body></html>
+"""
+
+
+def profile_html(config: FixtureConfig, username: str, sel: Selectors = Selectors(),
+                 follow_button: str = "Following") -> str:
+    js_config = {
+        **asdict(config),
+        "scrollCls": class_attr(sel.scroll_container_css),
+        "loadingRowCls": class_attr(sel.follower_row_css),
+        "itemCls": class_attr(sel.follower_item_css),
+        "nameCls": class_attr(sel.follower_name_css),
+        "suggestedText": sel.suggested_heading_text,
+    }
+    return """<!doctype html>
+<html><head><meta charset="utf-8"><title>@%(username)s</title>
+<style>
+  body { font-family: sans-serif; margin: 0; }
+  [role="dialog"] { position: fixed; top: 40px; left: 50%%; width: 400px; margin-left: -200px; background: #fff;
+                    border: 1px solid #ccc; }
+  .row { height: 60px; display: flex; align-items: center; gap: 8px; padding: 0 12px; }
+  .row img { width: 44px; height: 44px; border-radius: 50%%; }
+</style></head>
+<body>
+<header>
+  <h2>%(username)s</h2>
+  <button id="follow-btn" type="button">%(follow_button)s</button>
+  %(login_link)s
+  <a href="/%(username)s/followers/">followers</a>
+  <a href="/%(username)s/following/">following</a>
+</header>
+<div id="modal-root"></div>
+<script>
+const CFG = %(config)s;
+const USERNAME = %(username_js)s;
+const sleep = (ms) => new Promise(r => setTimeout(r, ms));
+let state = null;
+
+const renderRow = (u) => `
+  <div class="row"><div class="${CFG.itemCls}"><div><div>
+    <a role="link" href="/${u.username}/"><img src="${u.profile_pic_url}" alt=""></a>
+  </div><div><div><span><span class="${CFG.nameCls}">${u.full_name}</span></span>
+    ${u.is_verified ? '<svg aria-label="Verified" width="12" height="12"></svg>' : ''}</div>
+  <div><span>${u.username}</span></div></div></div></div></div>`;
+
+function openList(kind) {
+  document.getElementById('modal-root').innerHTML = `
+    <div role="dialog">
+      <div><input aria-label="Search input" placeholder="Search"></div>
+      <div class="${CFG.scrollCls}" style="height: 600px; overflow-y: auto">
+        <div id="spacer" style="height: 0px"></div>
+        <div id="rows"></div>
+        <div class="${CFG.loadingRowCls}" id="loading-row"></div>
+        <div id="suggested"><h4>${CFG.suggestedText}</h4></div>
+      </div>
+    </div>`;
+  const scroller = document.querySelector('.' + CFG.scrollCls.split(' ').join('.'));
+  state = {
+    kind, cursor: '0', done: false, loading: false, scroller,
+    rows: document.getElementById('rows'),
+    spacer: document.getElementById('spacer'),
+    loadingRow: document.getElementById('loading-row'),
+    search: document.querySelector('[aria-label="Search input"]'),
+  };
+  const suggested = [];
+  for (let i = 0; i < CFG.suggested; i++) {
+    suggested.push(renderRow({username: `suggested_${i}`, full_name: `Suggested ${i}`,
+                              profile_pic_url: `/avatars/suggested_${i}.gif`, is_verified: false}));
+  }
+  document.getElementById('suggested').insertAdjacentHTML('beforeend', suggested.join(''));
+  scroller.addEventListener('wheel', maybeLoad, {passive: true});
+  scroller.addEventListener('scroll', maybeLoad, {passive: true});
+  loadMore();
+}
+
+function maybeLoad() {
+  if (!state || state.loading || state.done) return;
+  const s = state.scroller;
+  if (s.scrollTop + s.clientHeight >= state.rows.offsetTop + state.rows.offsetHeight - CFG.threshold_px) loadMore();
+}
+
+async function loadMore() {
+  state.loading = true;
+  // same signals instagram gives: the loading graphic row and activity on the search area
+  state.loadingRow.innerHTML = '<div data-visualcompletion="loading-state"><svg width="18" height="18"></svg></div>';
+  state.search.setAttribute('data-loading', 'true');
+  await sleep(CFG.latency_ms);
+  const resp = await fetch(`/api/v1/friendships/1/${state.kind}/?count=${CFG.batch}&max_id=${encodeURIComponent(state.cursor)}`);
+  const page = await resp.json();
+  state.rows.insertAdjacentHTML('beforeend', page.users.map(renderRow).join(''));
+  if (CFG.virtualize > 0) {
+    // keep the scroll height stable, removed rows are replaced by spacer height
+    while (state.rows.children.length > CFG.virtualize) {
+      const first = state.rows.firstElementChild;
+      state.spacer.style.height = (parseFloat(state.spacer.style.height) + first.offsetHeight) + 'px';
+      first.remove();
+    }
+  }
+  state.loadingRow.innerHTML = '';
+  state.search.removeAttribute('data-loading');
+  state.cursor = page.next_max_id;
+  state.done = !page.next_max_id;
+  state.loading = false;
+}
+
+const followBtn = document.getElementById('follow-btn');
+followBtn.addEventListener('click', () => {
+  if (followBtn.innerText.trim() !== 'Following') return;
+  const modal = document.getElementById('modal-root');
+  modal.innerHTML = `
+    <div role="dialog">
+      <button type="button" id="confirm-unfollow">Unfollow</button>
+      <button type="button" id="cancel-unfollow">Cancel</button>
+    </div>`;
+  document.getElementById('cancel-unfollow').addEventListener('click', () => { modal.innerHTML = ''; });
+  document.getElementById('confirm-unfollow').addEventListener('click', async () => {
+    await sleep(CFG.latency_ms);
+    const resp = await fetch(`/api/v1/friendships/destroy/${USERNAME}/`, {method: 'POST'});
+    if (resp.status === 429) {
+      modal.innerHTML = '<div role="dialog"><h3>Try Again Later</h3><p>We limit how often you can do certain things.</p></div>';
+      return;
+    }
+    followBtn.innerText = 'Follow';
+    modal.innerHTML = '';
+  });
+});
+
+for (const a of document.querySelectorAll('header a')) {
+  a.addEventListener('click', (e) => {
+    e.preventDefault();
+    openList(a.getAttribute('href').includes('following') ? 'following' : 'followers');
+  });
+}
+</script>
+</body></html>
+""" % {
+        "username": html.escape(username),
+        "username_js": json.dumps(username),
+        "follow_button": follow_button,
+        "login_link": "" if config.logged_in else '<a href="/accounts/login/">Log in</a>',
+        "config": json.dumps(js_config),
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive, every response carries a Content-Length so pooled clients can reuse their connections
+    protocol_version = "HTTP/1.1"
+    config: FixtureConfig = FixtureConfig()
+    # per server: usernames unfollowed through the fixture so far
+    unfollowed: set = set()
+    lock = threading.Lock()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if url.path.startswith("/api/v1/friendships/") and len(parts) >= 5:
+            query = parse_qs(url.query)
+            kind = parts[4]
+            max_id = (query.get("max_id") or [""])[0]
+            count = int((query.get("count") or [self.config.batch])[0])
+            page = api_page(self.config, kind, max_id, count)
+            if page is None:
+                return self._send(404, json.dumps({"status": "fail", "message": "unknown max_id"}).encode(), "application/json")
+            return self._send(200, json.dumps(page).encode("utf-8"), "application/json")
+        if parts and parts[0] == "avatars":
+            if self.config.avatar_latency_ms:
+                time.sleep(self.config.avatar_latency_ms / 1000)
+            variant = zlib.crc32(url.path.encode("utf-8")) % max(1, self.config.avatar_variants)
+            # bytes after the gif trailer are ignored by decoders, enough to give every variant its own hash
+            return self._send(200, _AVATAR + variant.to_bytes(4, "big") if variant else _AVATAR, "image/gif")
+        if not parts or parts[0] == "accounts":
+            page = HOME_HTML if self.config.logged_in and not parts else LOGIN_HTML
+            return self._send(200, page.encode("utf-8"), "text/html; charset=utf-8")
+        if len(parts) >= 1:
+            state = follow_state(parts[0], self.unfollowed)
+            if state is None:
+                return self._send(404, NOT_FOUND_HTML.encode("utf-8"), "text/html; charset=utf-8")
+            if not self.config.logged_in:
+                # a visitor is never following anyone
+                state = "Follow"
+            body = profile_html(self.config, parts[0], follow_button=state).encode("utf-8")
+            return self._send(200, body, "text/html; charset=utf-8")
+        return self._send(404, b"not found", "text/plain")
+
+    def do_POST(self) -> None:
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        # /api/v1/friendships/destroy/<username>/
+        if parts[:4] != ["api", "v1", "friendships", "destroy"] or len(parts) < 5:
+            return self._send(404, b"not found", "text/plain")
+        if not self.config.logged_in:
+            return self._send(403, json.dumps({"status": "fail", "message": "login_required"}).encode(), "application/json")
+        with self.lock:
+            if self.config.block_after and len(self.unfollowed) >= self.config.block_after:
+                return self._send(429, json.dumps({"status": "fail", "message": "Please wait a few minutes"}).encode(), "application/json")
+            self.unfollowed.add(parts[4])
+        return self._send(200, json.dumps({"status": "ok"}).encode("utf-8"), "application/json")
+
+
+class FixtureServer:
+    """serves the fixture on a background thread: with FixtureServer(config) as server: server.base_url"""
+    def __init__(self, config: Optional[FixtureConfig] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        handler = type("FixtureHandler", (_Handler,), {
+            "config": config or FixtureConfig(), "unfollowed": set(), "lock": threading.Lock(),
+        })
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--followers", type=int, default=2_000)
+    parser.add_argument("--following", type=int, default=1_500)
+    parser.add_argument("--batch", type=int, default=12)
+    parser.add_argument("--latency-ms", type=int, default=150)
+    parser.add_argument("--virtualize", type=int, default=0, help="keep only the newest N rows in the DOM")
+    parser.add_argument("--recorded-dir", default=None, help="replay recorded API pages instead of generating users")
+    parser.add_argument("--block-after", type=int, default=0, help="rate limit unfollows after this many (0 = never)")
+    args = parser.parse_args()
+    config = FixtureConfig(
+        followers=args.followers, following=args.following, batch=args.batch, latency_ms=args.latency_ms,
+        virtualize=args.virtualize, recorded_dir=args.recorded_dir, block_after=args.block_after,
+    )
+    server = FixtureServer(config, port=args.port)
+    print(f"fixture listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
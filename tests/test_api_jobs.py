@@ -0,0 +1,148 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("requests")
+
+from fastapi.testclient import TestClient
+
+from backend.api import app as app_module
+from backend.api import jobs as jobs_module
+from backend.services.instagram_scraper.batch_orchestrator import JobResult
+from backend.services.instagram_scraper.record_io import with_format, write_records
+
+
+class StubPool:
+    """stands in for BrowserPool, the stub orchestrator never asks it for a context"""
+    lean = False
+    size = 2
+
+
+class StubOrchestrator:
+    """writes small lists instead of scraping. usernames starting with "slow" wait until cancelled"""
+    def __init__(self, pool, output_format="json", **kwargs):
+        self.output_format = output_format
+
+    async def run_job(self, username, out_dir):
+        if username.startswith("slow"):
+            await asyncio.Event().wait()
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        followers = [{"username": f"user_{i}"} for i in range(250)]
+        following = [{"username": f"user_{i}"} for i in range(100, 150)]
+        write_records(with_format(out_dir / "followers.json", self.output_format), followers, self.output_format)
+        write_records(with_format(out_dir / "following.json", self.output_format), following, self.output_format)
+        return JobResult(username=username, ok=True, followers=len(followers), following=len(following))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs_module, "BatchOrchestrator", StubOrchestrator)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        manager = jobs_module.JobManager(StubPool(), workers=2, output_root=str(tmp_path / "runs"),
+                                         input_root=str(tmp_path / "inputs"))
+        await manager.start()
+        app.state.manager = manager
+        try:
+            yield
+        finally:
+            await manager.close()
+
+    monkeypatch.setattr(app_module.app.router, "lifespan_context", lifespan)
+    with TestClient(app_module.app) as client:
+        yield client
+
+
+def _wait(client, job_id, status="succeeded"):
+    for _ in range(200):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.01)
+    assert job["status"] == status, job
+    return job
+
+
+def test_submit_status_and_list(client):
+    resp = client.post("/jobs", json={"username": "alice", "output_format": "ndjson"})
+    assert resp.status_code == 202
+    job = resp.json()
+    assert job["status"] == "queued"
+
+    job = _wait(client, job["id"])
+    assert job["counts"] == {"followers": 250, "following": 50}
+    assert job["results"] == ["followers", "following"]
+
+    listed = client.get("/jobs").json()
+    assert listed["total"] == 1
+    assert [j["id"] for j in listed["items"]] == [job["id"]]
+    assert client.get("/jobs/nope").status_code == 404
+
+
+def test_results_paging(client):
+    job = _wait(client, client.post("/jobs", json={"username": "alice"}).json()["id"])
+
+    seen, offset = [], 0
+    while offset is not None:
+        page = client.get(f"/jobs/{job['id']}/results/followers", params={"offset": offset, "limit": 100}).json()
+        assert page["total"] == 250
+        seen += [row["username"] for row in page["items"]]
+        offset = page["next_offset"]
+    assert seen == [f"user_{i}" for i in range(250)]
+
+    assert client.get(f"/jobs/{job['id']}/results/they_dont_follow_back").status_code == 409
+    assert client.get(f"/jobs/{job['id']}/results/secrets").status_code == 404
+    assert client.get(f"/jobs/{job['id']}/results/followers", params={"limit": 5000}).status_code == 422
+
+
+def test_cancel(client):
+    job = client.post("/jobs", json={"username": "slow_account"}).json()
+    assert client.get(f"/jobs/{job['id']}").json()["status"] in ("queued", "running")
+
+    assert client.post(f"/jobs/{job['id']}/cancel").status_code == 200
+    job = _wait(client, job["id"], status="cancelled")
+    assert job["results"] == []
+    assert client.get(f"/jobs/{job['id']}/results/followers").status_code == 409
+
+
+def test_rejects_unsafe_requests(client, tmp_path):
+    assert client.post("/jobs", json={"username": "../../etc"}).status_code == 422
+    assert client.post("/jobs", json={"username": "alice", "kind": "delete"}).status_code == 422
+    # the target host is server config, a request can't choose it
+    job = client.post("/jobs", json={"username": "alice", "base_url": "http://169.254.169.254"}).json()
+    assert job["base_url"] == jobs_module.INSTAGRAM_URL
+
+    outside = tmp_path / "elsewhere.json"
+    write_records(outside, [{"username": "x"}])
+    resp = client.post("/jobs", json={"username": "alice", "kind": "analyze", "followers_path": str(outside),
+                                      "following_path": str(outside)})
+    assert resp.status_code == 422
+
+
+def test_analyze_earlier_job_outputs(client):
+    scrape = _wait(client, client.post("/jobs", json={"username": "alice"}).json()["id"])
+    out_dir = Path(scrape["output_dir"])
+    job = client.post("/jobs", json={
+        "username": "alice", "kind": "analyze",
+        "followers_path": str(out_dir / "followers.json"), "following_path": str(out_dir / "following.json"),
+    }).json()
+    job = _wait(client, job["id"])
+    assert job["counts"] == {"they_dont_follow_back": 0, "you_dont_follow_back": 200}
+
+
+@pytest.mark.parametrize("output_format", ["json", "ndjson", "csv"])
+def test_results_paging_seeks(client, monkeypatch, output_format):
+    # small strides so the pages below start in the middle of several of them
+    monkeypatch.setattr(jobs_module, "PAGE_STRIDE", 16)
+    job = client.post("/jobs", json={"username": "alice", "output_format": output_format}).json()
+    job = _wait(client, job["id"])
+
+    for offset, limit in [(0, 1), (15, 2), (16, 16), (37, 100), (249, 10), (250, 10), (1000, 10)]:
+        page = client.get(f"/jobs/{job['id']}/results/followers", params={"offset": offset, "limit": limit}).json()
+        assert [row["username"] for row in page["items"]] == [f"user_{i}" for i in range(offset, min(offset + limit, 250))]
@@ -0,0 +1,49 @@
+import asyncio
+import logging
+
+from backend.services.instagram_scraper.avatar_cache import AvatarCache
+from benchmarks.fixture_server import FixtureConfig, FixtureServer
+
+
+def _logger() -> logging.Logger:
+    log = logging.getLogger("test_avatar_cache")
+    log.addHandler(logging.NullHandler())
+    log.propagate = False
+    return log
+
+
+def _records(n: int, signature: str):
+    # instagram re-signs its cdn urls between scrapes, only the query string changes
+    return [{"username": f"user_{i}", "profilePic": f"/avatars/followers_{i}.gif?oe={signature}"} for i in range(n)]
+
+
+def _fetch(cache_dir, base_url, records):
+    cache = AvatarCache(str(cache_dir), concurrency=4, retries=0, base_url=base_url, logger=_logger())
+    return asyncio.run(cache.fetch_all(records))
+
+
+def _objects(cache_dir):
+    return sorted(p for p in (cache_dir / "objects").rglob("*") if p.is_file())
+
+
+def test_downloads_dedups_and_hits(tmp_path):
+    cache_dir = tmp_path / "cache"
+    with FixtureServer(FixtureConfig(avatar_variants=5)) as server:
+        records = _records(20, "first")
+        # listed twice, and one picture the cdn no longer has
+        records += records[:3] + ["/gone_avatar.gif"]
+        cold = _fetch(cache_dir, server.base_url, records)
+        assert (cold["urls"], cold["hits"], cold["downloaded"], cold["failed"]) == (21, 0, 20, 1)
+        # 20 avatars, 5 distinct images
+        assert cold["deduplicated"] == 15
+        assert len(_objects(cache_dir)) == cold["objects"] == 5
+
+        # a new process with re-signed urls downloads nothing but the failed one again
+        warm = _fetch(cache_dir, server.base_url, _records(20, "resigned") + ["/gone_avatar.gif"])
+        assert (warm["urls"], warm["hits"], warm["downloaded"], warm["failed"]) == (21, 20, 0, 1)
+
+        # a deleted object is a miss for every url that pointed at it
+        _objects(cache_dir)[0].unlink()
+        repaired = _fetch(cache_dir, server.base_url, _records(20, "third"))
+        assert repaired["downloaded"] == 20 - repaired["hits"] > 0
+        assert len(_objects(cache_dir)) == 5
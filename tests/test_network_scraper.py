@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+from urllib.request import urlopen
+
+import pytest
+
+from backend.services.instagram_scraper.config import ScrapeConfig
+from backend.services.instagram_scraper.follower_scraper_network import (
+    NetworkInstagramFollowerScraper, decode_follower_page,
+)
+from backend.services.instagram_scraper.record_io import iter_records
+from benchmarks.fixture_server import FixtureConfig, FixtureServer, make_user
+
+
+def _logger() -> logging.Logger:
+    log = logging.getLogger("test_network_scraper")
+    log.addHandler(logging.NullHandler())
+    log.propagate = False
+    return log
+
+
+def _usernames(kind: str, n: int):
+    return [make_user(kind, i)["username"] for i in range(n)]
+
+
+# --------------------------
+# decoding, over http from the fixture
+# --------------------------
+
+def test_decodes_rest_pages_until_the_last(tmp_path):
+    with FixtureServer(FixtureConfig(followers=30, batch=12, latency_ms=0)) as server:
+        rows, cursor, pages = [], "", []
+        while True:
+            with urlopen(f"{server.base_url}/api/v1/friendships/1/followers/?count=12&max_id={cursor}") as resp:
+                payload = json.loads(resp.read())
+            users, has_more = decode_follower_page(payload)
+            rows += users
+            pages.append(has_more)
+            if not has_more:
+                break
+            cursor = payload["next_max_id"]
+
+    assert pages == [True, True, False]
+    assert [record["username"] for _, record in rows] == _usernames("followers", 30)
+    user_id, record = rows[0]
+    assert user_id == make_user("followers", 0)["pk"]
+    assert record == {"username": "followers_user_0", "name": "Followers User 0",
+                      "profilePic": "/avatars/followers_0.gif", "verified": True}
+
+
+def test_decodes_graphql_pages():
+    node = {"id": 7, "username": "gq", "full_name": "Graph Q", "profile_pic_url": "p", "is_verified": False}
+    payload = {"data": {"user": {"edge_follow": {"page_info": {"has_next_page": True}, "edges": [{"node": node}]}}}}
+    assert decode_follower_page(payload) == ([("7", {"username": "gq", "name": "Graph Q", "profilePic": "p",
+                                                     "verified": False})], True)
+
+    payload["data"]["user"]["edge_follow"]["page_info"]["has_next_page"] = False
+    assert decode_follower_page(payload)[1] is False
+
+
+@pytest.mark.parametrize("payload", [None, [], {"data": {"viewer": {}}}, {"status": "ok"}])
+def test_other_responses_are_not_pages(payload):
+    assert decode_follower_page(payload) is None
+
+
+def test_add_users_dedups_by_id_and_username():
+    scraper = NetworkInstagramFollowerScraper(None, logger=_logger())
+    added = scraper.add_users([
+        ("1", {"username": "a"}),
+        # renamed account, same id
+        ("1", {"username": "a_renamed"}),
+        # seeded from the DOM, no id
+        (None, {"username": "b"}),
+        ("2", {"username": "b"}),
+        (None, {"username": None}),
+    ])
+    assert added == 2
+    assert [r["username"] for r in scraper.follower_list] == ["a", "b"]
+
+
+# --------------------------
+# end to end, needs chromium
+# --------------------------
+
+def _scrape(fixture: FixtureConfig, config: ScrapeConfig):
+    playwright = pytest.importorskip("playwright.async_api")
+    from backend.services.instagram_scraper.account_scrape import open_follow_list
+
+    async def run():
+        async with playwright.async_playwright() as p:
+            try:
+                browser = await p.chromium.launch()
+            except playwright.Error as e:
+                pytest.skip(f"chromium is not available: {e.message.splitlines()[0]}")
+            try:
+                page = await browser.new_page()
+                scraper = NetworkInstagramFollowerScraper(page, config=config, logger=_logger())
+                scraper.attach()
+                await open_follow_list(page, "me", "followers", server.base_url)
+                rows = await scraper.run()
+                return scraper, rows
+            finally:
+                await browser.close()
+
+    with FixtureServer(fixture) as server:
+        return asyncio.run(run())
+
+
+def test_scrapes_until_instagram_reports_the_last_page(tmp_path):
+    config = ScrapeConfig(quiet_ms=2_000, cooldown_s=0.5, write_file=str(tmp_path / "followers.ndjson"),
+                          output_format="ndjson")
+    scraper, rows = _scrape(FixtureConfig(followers=60, batch=12, latency_ms=0), config)
+
+    assert scraper.exhausted
+    assert scraper.pages_seen == 5
+    assert [r["username"] for r in rows] == _usernames("followers", 60)
+    assert list(iter_records(tmp_path / "followers.ndjson")) == rows
+
+
+def test_stops_once_the_dom_is_stable_without_a_last_page(tmp_path):
+    # two recorded pages, the second points at a cursor the fixture answers with a 404
+    recorded = tmp_path / "recorded"
+    recorded.mkdir()
+    for index, (start, cursor) in enumerate([(0, "c1"), (12, "never_recorded")]):
+        page = {"users": [make_user("followers", i) for i in range(start, start + 12)], "next_max_id": cursor}
+        (recorded / f"page_{index}.json").write_text(json.dumps(page), encoding="utf-8")
+
+    config = ScrapeConfig(quiet_ms=500, cooldown_s=0.2, max_scrolls=200, write_file=None)
+    scraper, rows = _scrape(FixtureConfig(recorded_dir=str(recorded), latency_ms=0), config)
+
+    assert not scraper.exhausted
+    assert scraper.pages_seen == 2
+    assert [r["username"] for r in rows] == _usernames("followers", 24)
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from backend.services.instagram_scraper.record_io import (
+    OUTPUT_FORMATS, iter_json_array, iter_records, sniff_format, with_format, write_records,
+)
+
+RECORDS = [
+    {"username": "plain", "name": "Plain User", "profilePic": "https://cdn.example/a.jpg?oe=1", "verified": True},
+    {"username": "nulls", "name": None, "profilePic": None, "verified": False},
+    {"username": "empty", "name": "", "profilePic": None, "verified": None},
+    {"username": "formula", "name": "=HYPERLINK(\"x\")", "profilePic": "+1", "verified": False},
+    {"username": "quotes", "name": "'", "profilePic": "'=already escaped", "verified": False},
+    {"username": "quoted_text", "name": "'tis me", "profilePic": "''", "verified": False},
+    {"username": "unicode", "name": "Zoë 🌙, \"quoted\"\nnew line", "profilePic": "-", "verified": True},
+]
+
+
+@pytest.mark.parametrize("output_format", OUTPUT_FORMATS)
+def test_round_trip(tmp_path, output_format):
+    path = with_format(tmp_path / "followers.json", output_format)
+    write_records(path, RECORDS, output_format)
+
+    assert sniff_format(path) == output_format
+    assert list(iter_records(path)) == RECORDS
+
+
+@pytest.mark.parametrize("output_format", OUTPUT_FORMATS)
+def test_empty_file(tmp_path, output_format):
+    path = with_format(tmp_path / "followers.json", output_format)
+    write_records(path, [], output_format)
+
+    assert list(iter_records(path, output_format)) == []
+
+
+def test_format_is_sniffed_not_taken_from_the_name(tmp_path):
+    path = tmp_path / "followers.json"
+    write_records(path, RECORDS, "ndjson.gz")
+
+    assert list(iter_records(path)) == RECORDS
+
+
+def test_csv_formula_cells_are_escaped(tmp_path):
+    path = tmp_path / "followers.csv"
+    write_records(path, RECORDS, "csv")
+    text = path.read_text(encoding="utf-8")
+
+    assert "'=HYPERLINK" in text
+    assert ",'+1," in text
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 16])
+def test_iter_json_array_across_chunks(tmp_path, chunk_size):
+    values = RECORDS + [12345, -1.5e3, "a string with ] and , inside", [1, [2, 3]], {}, None, True]
+    path = tmp_path / "array.json"
+    path.write_text(json.dumps(values, indent=4, ensure_ascii=False), encoding="utf-8")
+
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == values
+
+
+def test_iter_json_array_rejects_other_documents(tmp_path):
+    path = tmp_path / "object.json"
+    path.write_text('{"username": "x"}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json_array(path))
+
+    path.write_text('[{"username": "x"}, ', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json_array(path, chunk_size=4))
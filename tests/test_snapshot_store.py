@@ -0,0 +1,48 @@
+import sqlite3
+
+from backend.services.instagram_scraper.snapshot_store import SnapshotStore
+
+
+def _user(username: str) -> dict:
+    return {"username": username, "name": username.title(), "profilePic": None, "verified": False}
+
+
+def test_latest_snapshot_keeps_scraped_order(tmp_path):
+    newest_first = ["zoe", "adam", "mia", "bob"]
+    with SnapshotStore(tmp_path / "snapshots.db") as snapshots:
+        snapshots.record_snapshot("me", "followers", [_user(u) for u in newest_first])
+        assert [r["username"] for r in snapshots.latest_snapshot("me", "followers")] == newest_first
+        assert snapshots.latest_snapshot("me", "following") is None
+
+
+def test_old_database_gets_position_column(tmp_path):
+    path = tmp_path / "snapshots.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE snapshot_members (
+            snapshot_id INTEGER NOT NULL, user_id INTEGER NOT NULL, PRIMARY KEY (snapshot_id, user_id)
+        ) WITHOUT ROWID;
+        """
+    )
+    conn.close()
+
+    with SnapshotStore(path) as snapshots:
+        snapshots.record_snapshot("me", "followers", [_user("b"), _user("a")])
+        assert [r["username"] for r in snapshots.latest_snapshot("me", "followers")] == ["b", "a"]
+
+
+def test_diff_needs_both_snapshots(tmp_path):
+    with SnapshotStore(tmp_path / "snapshots.db") as snapshots:
+        snapshots.record_snapshot("me", "followers", [_user("a"), _user("b")], taken_at="2024-02-01")
+        # one scrape only, nothing is new or lost yet
+        assert snapshots.new_followers("me") == []
+        assert snapshots.lost_followers("me") == []
+        # since before the first scrape
+        assert snapshots.new_followers("me", since="2024-01-01") == []
+        assert snapshots.lost_followers("me", since="2024-01-01") == []
+
+        snapshots.record_snapshot("me", "followers", [_user("b"), _user("c")], taken_at="2024-03-01")
+        assert [r["username"] for r in snapshots.new_followers("me")] == ["c"]
+        assert [r["username"] for r in snapshots.lost_followers("me")] == ["a"]
+        assert [r["username"] for r in snapshots.lost_followers("me", since="2024-02-15")] == ["a"]
@@ -0,0 +1,78 @@
+import pytest
+
+from backend.services.instagram_scraper.record_io import OUTPUT_FORMATS, iter_records, with_format, write_records
+from backend.services.instagram_scraper.streaming_analyzer import StreamingFollowerAnalyzer
+
+
+def _rows(prefix: str, n: int):
+    rows = [{"username": f"{prefix}_{i}" if i % 3 else f"shared_{i}", "name": f"User {i}", "profilePic": None,
+             "verified": i % 7 == 0} for i in range(n)]
+    # rows instagram sometimes hands back without a username
+    rows.insert(5, {"username": None, "name": "ghost", "profilePic": None, "verified": False})
+    rows.insert(9, {"name": "no key", "profilePic": None, "verified": False})
+    rows.append({"username": "", "name": "empty", "profilePic": None, "verified": False})
+    return rows
+
+
+def _run(tmp_path, name: str, memory_cap_mb: float, output_format: str):
+    analyzer = StreamingFollowerAnalyzer(
+        tmp_path / "followers.json", tmp_path / "following.json", tmp_path / name,
+        memory_cap_mb=memory_cap_mb, output_format=output_format,
+    )
+    (tmp_path / name).mkdir()
+    analyzer.compute_they_dont_follow_back()
+    analyzer.compute_you_dont_follow_back()
+    return {
+        result: list(iter_records(with_format(tmp_path / name / f"{result}.json", output_format)))
+        for result in ("they_dont_follow_back", "you_dont_follow_back")
+    }
+
+
+@pytest.mark.parametrize("output_format", OUTPUT_FORMATS)
+def test_partitioned_matches_in_memory(tmp_path, output_format):
+    write_records(tmp_path / "followers.json", _rows("follower", 300))
+    write_records(tmp_path / "following.json", _rows("following", 200))
+
+    in_memory = _run(tmp_path, "in_memory", memory_cap_mb=256, output_format=output_format)
+    # a cap of a few bytes forces one partition per couple of records
+    partitioned = _run(tmp_path, "partitioned", memory_cap_mb=0.001, output_format=output_format)
+
+    assert partitioned == in_memory
+    for records in in_memory.values():
+        assert records
+        assert all(record["username"] for record in records)
+    assert [r["username"] for r in in_memory["you_dont_follow_back"]][:2] == ["follower_1", "follower_2"]
+
+
+def test_open_files_stay_bounded(tmp_path, monkeypatch):
+    import builtins
+    from backend.services.instagram_scraper import streaming_analyzer
+
+    write_records(tmp_path / "followers.json", _rows("follower", 3000))
+    write_records(tmp_path / "following.json", _rows("following", 2000))
+    in_memory = _run(tmp_path, "in_memory", memory_cap_mb=256, output_format="json")
+
+    # every file the analyzer opens itself, counted while it is open
+    state = {"open": 0, "peak": 0}
+
+    def tracking_open(*args, **kwargs):
+        fh = builtins.open(*args, **kwargs)
+        state["open"] += 1
+        state["peak"] = max(state["peak"], state["open"])
+        close = fh.close
+
+        def tracked_close():
+            if not fh.closed:
+                state["open"] -= 1
+            close()
+        fh.close = tracked_close
+        return fh
+
+    monkeypatch.setattr(streaming_analyzer, "open", tracking_open, raising=False)
+    monkeypatch.setattr(streaming_analyzer, "_MAX_OPEN_FILES", 4)
+    # hundreds of partitions, merged in several passes
+    partitioned = _run(tmp_path, "partitioned", memory_cap_mb=0.0005, output_format="json")
+
+    assert partitioned == in_memory
+    assert 0 < state["peak"] <= 4
+    assert state["open"] == 0
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from playwright.async_api import async_playwright, Error as PlaywrightError
+
+from backend.services.instagram_scraper.config import UnfollowConfig
+from backend.services.instagram_scraper.unfollow_executor import UnfollowExecutor
+from benchmarks.fixture_server import FixtureConfig, FixtureServer
+
+# one target per follow-button state the fixture serves (see fixture_server.follow_state)
+TARGETS = ["alice", "gone_bob", "requested_carol", "fan_dave", "erin", "frank"]
+
+
+def _config(tmp_path, **overrides) -> UnfollowConfig:
+    options = dict(
+        max_per_hour=360_000, burst=100, daily_cap=100, jitter_s=0,
+        ledger_file=str(tmp_path / "ledger_{account}.ndjson"), report_file=None, action_timeout_ms=3_000,
+    )
+    options.update(overrides)
+    return UnfollowConfig(**options)
+
+
+def _run(fixture: FixtureConfig, config: UnfollowConfig, targets=TARGETS, account="me", server=None):
+    async def run():
+        async with async_playwright() as p:
+            try:
+                browser = await p.chromium.launch()
+            except PlaywrightError as e:
+                pytest.skip(f"chromium is not available: {e.message.splitlines()[0]}")
+            try:
+                page = await browser.new_page()
+                return await UnfollowExecutor(page, account, config, base_url=server.base_url).run(targets)
+            finally:
+                await browser.close()
+
+    if server is not None:
+        return asyncio.run(run())
+    with FixtureServer(fixture) as server:
+        return asyncio.run(run())
+
+
+def _ledger(tmp_path, account="me"):
+    lines = (tmp_path / f"ledger_{account}.ndjson").read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def test_states_and_resume(tmp_path):
+    fixture = FixtureConfig(latency_ms=0)
+    with FixtureServer(fixture) as server:
+        report = _run(fixture, _config(tmp_path), server=server)
+        assert report["stop_reason"] == "done"
+        assert (report["unfollowed"], report["not_found"], report["not_following"]) == (3, 1, 2)
+        statuses = {e["username"]: e["status"] for e in _ledger(tmp_path)}
+        assert statuses == {"alice": "unfollowed", "gone_bob": "not_found", "requested_carol": "not_following",
+                            "fan_dave": "not_following", "erin": "unfollowed", "frank": "unfollowed"}
+        assert {e["account"] for e in _ledger(tmp_path)} == {"me"}
+
+        # a restart skips everything in the ledger
+        report = _run(fixture, _config(tmp_path), server=server)
+        assert report["unfollowed"] == report["not_found"] == report["not_following"] == 0
+        assert len(_ledger(tmp_path)) == len(TARGETS)
+
+        # another account's ledger is its own
+        report = _run(fixture, _config(tmp_path), targets=["gone_zed"], account="other", server=server)
+        assert report["not_found"] == 1
+        assert [e["account"] for e in _ledger(tmp_path, "other")] == ["other"]
+
+
+def test_daily_cap(tmp_path):
+    fixture = FixtureConfig(latency_ms=0)
+    with FixtureServer(fixture) as server:
+        report = _run(fixture, _config(tmp_path, daily_cap=2), server=server)
+        assert report["stop_reason"] == "daily_cap"
+        assert report["unfollowed"] == 2
+        assert report["remaining"] == 1
+
+        # today's unfollows in the ledger count against the cap of the next run
+        report = _run(fixture, _config(tmp_path, daily_cap=2), server=server)
+        assert report["stop_reason"] == "daily_cap"
+        assert report["unfollowed"] == 0
+        assert report["unfollowed_today"] == 2
+
+
+def test_action_block_stops_the_run(tmp_path):
+    report = _run(FixtureConfig(latency_ms=0, block_after=1), _config(tmp_path))
+    assert report["stop_reason"] == "action_blocked"
+    assert report["unfollowed"] == 1
+    unfinished = [e for e in _ledger(tmp_path) if e["status"] not in ("unfollowed", "not_found", "not_following")]
+    assert unfinished == []
+
+
+def test_refuses_a_logged_out_page(tmp_path):
+    report = _run(FixtureConfig(latency_ms=0, logged_in=False), _config(tmp_path))
+    assert report["stop_reason"] == "logged_out"
+    assert report["remaining"] == len(TARGETS)
+    # "Follow" on a logged out profile must never be recorded as not_following
+    assert not (tmp_path / "ledger_me.ndjson").exists()